@@ -12,6 +12,7 @@
 Base settings for the Timeseries Frontend project.
 """
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 from .security_settings import *
@@ -147,6 +148,89 @@ else:
 # Timeout for requests made to the backend Timeseries API
 API_TIMEOUT_SECONDS = int(os.environ.get("API_TIMEOUT_SECONDS", 60))
 
+# Parse run_pipeline responses incrementally, filling columnar data arrays as the body streams in
+PIPELINE_STREAM_PARSE = os.environ.get("PIPELINE_STREAM_PARSE", "True").lower() in ('true', '1', 'yes')
+PIPELINE_STREAM_CHUNK_BYTES = int(os.environ.get("PIPELINE_STREAM_CHUNK_BYTES", 64 * 1024))
+
+# Maximum points drawn per trace in series plots; longer series are downsampled (LTTB)
+PLOT_MAX_POINTS_PER_TRACE = int(os.environ.get("PLOT_MAX_POINTS_PER_TRACE", 2000))
+
+# Figures with more scatter points than this are drawn with WebGL (scattergl); 0 disables the switch
+PLOT_WEBGL_POINT_THRESHOLD = int(os.environ.get("PLOT_WEBGL_POINT_THRESHOLD", 20000))
+
+# Precision of stored results: "float64" (full) or "float32", which rounds the session payloads and
+# stage cache to float32 (relative error <= 2**-23) and defaults plot arrays to f4 (see timeseries/precision.py)
+RESULT_FLOAT_PRECISION = os.environ.get("RESULT_FLOAT_PRECISION", "float64")
+
+# Encoding of numeric plot data: "f8" or "f4" base64 typed arrays, or "text" for plain JSON numbers
+PLOT_ARRAY_DTYPE = os.environ.get("PLOT_ARRAY_DTYPE", "f4" if RESULT_FLOAT_PRECISION == "float32" else "f8")
+
+# Memory budget of the prefix-sum correlation index; with more symbols prefixes are stored every few
+# rows instead of every row (see timeseries/correlation_index.py)
+CORRELATION_INDEX_MAX_BYTES = int(os.environ.get("CORRELATION_INDEX_MAX_BYTES", 32 * 1024 * 1024))
+# Rolling correlation plot: window in rows and the number of symbol pairs drawn
+ROLLING_CORRELATION_WINDOW = int(os.environ.get("ROLLING_CORRELATION_WINDOW", 63))
+ROLLING_CORRELATION_MAX_PAIRS = int(os.environ.get("ROLLING_CORRELATION_MAX_PAIRS", 10))
+# Rolling realized volatility windows in rows, comma-separated; windows longer than half the
+# sample are shortened to it
+ROLLING_VOLATILITY_WINDOWS = tuple(int(window) for window in os.environ.get("ROLLING_VOLATILITY_WINDOWS",
+                                                                            "21,63,252").split(",") if window.strip())
+# Longest horizon of the ARIMA forecast slider (forecasts are extended locally from the fitted parameters)
+ARIMA_FORECAST_MAX_STEPS = int(os.environ.get("ARIMA_FORECAST_MAX_STEPS", 250))
+# Longest horizon of the GARCH volatility forecast slider (closed-form forecasts from the fitted parameters)
+GARCH_FORECAST_MAX_STEPS = int(os.environ.get("GARCH_FORECAST_MAX_STEPS", 250))
+# Monte Carlo fan charts: most paths per request (higher for staff users and in DEBUG), paths per
+# process-pool chunk and worker processes of the pool shared by each server process (1 = in process)
+MONTE_CARLO_MAX_PATHS = int(os.environ.get("MONTE_CARLO_MAX_PATHS", 20000))
+MONTE_CARLO_STAFF_MAX_PATHS = int(os.environ.get("MONTE_CARLO_STAFF_MAX_PATHS", 100000))
+MONTE_CARLO_CHUNK_PATHS = int(os.environ.get("MONTE_CARLO_CHUNK_PATHS", 5000))
+MONTE_CARLO_WORKERS = int(os.environ.get("MONTE_CARLO_WORKERS", 2))
+
+# Rolling spillover: most windows per request, concurrent backend requests for uncached windows,
+# seconds per window request, and seconds after which a request starts no more windows (the rest
+# are left for the next request). Budget + window timeout must stay below gunicorn's 180 s timeout.
+ROLLING_SPILLOVER_MAX_WINDOWS = int(os.environ.get("ROLLING_SPILLOVER_MAX_WINDOWS", 100))
+ROLLING_SPILLOVER_WORKERS = int(os.environ.get("ROLLING_SPILLOVER_WORKERS", 4))
+ROLLING_SPILLOVER_WINDOW_TIMEOUT = int(os.environ.get("ROLLING_SPILLOVER_WINDOW_TIMEOUT", 30))
+ROLLING_SPILLOVER_TIME_BUDGET = int(os.environ.get("ROLLING_SPILLOVER_TIME_BUDGET", 120))
+
+# Pair tables (pairwise spillover, Granger tests): rows per page, and the most symbols for which the
+# full N x N pairwise spillover matrix is also rendered
+PAIR_TABLE_PAGE_SIZE = int(os.environ.get("PAIR_TABLE_PAGE_SIZE", 25))
+PAIRWISE_MATRIX_MAX_SYMBOLS = int(os.environ.get("PAIRWISE_MATRIX_MAX_SYMBOLS", 12))
+
+# Trading calendar for forecast axes: numpy weekmask (Mon..Sun) and comma-separated ISO holiday dates
+TRADING_CALENDAR_WEEKMASK = os.environ.get("TRADING_CALENDAR_WEEKMASK", "1111100")
+TRADING_CALENDAR_HOLIDAYS = [day.strip() for day in os.environ.get("TRADING_CALENDAR_HOLIDAYS", "").split(",")
+                             if day.strip()]
+
+# Serialized figure cache, shared by all workers on a host (see timeseries/plot_cache.py)
+PLOT_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.environ.get("PLOT_CACHE_DIR", os.path.join(tempfile.gettempdir(), 'timeseries-plot-cache')),
+    'TIMEOUT': 3600,  # 1 hour default timeout
+    'OPTIONS': {
+        'MAX_ENTRIES': int(os.environ.get("PLOT_CACHE_MAX_ENTRIES", 500)),
+        'CULL_FREQUENCY': 4,  # Evict a quarter of the entries when full
+    }
+}
+# Figures larger than this are rebuilt on every request instead of cached
+PLOT_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("PLOT_CACHE_MAX_ENTRY_BYTES", 5 * 1024 * 1024))
+
+# Stage-level cache of pipeline results (see timeseries/pipeline_stages.py); stages whose
+# parameters did not change are skipped in the backend and merged back from here
+PIPELINE_STAGE_CACHE = os.environ.get("PIPELINE_STAGE_CACHE", "True").lower() in ('true', '1', 'yes')
+PIPELINE_STAGE_CACHE_TIMEOUT = int(os.environ.get("PIPELINE_STAGE_CACHE_TIMEOUT", 3600))
+STAGE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.environ.get("STAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), 'timeseries-stage-cache')),
+    'TIMEOUT': PIPELINE_STAGE_CACHE_TIMEOUT,
+    'OPTIONS': {
+        'MAX_ENTRIES': int(os.environ.get("STAGE_CACHE_MAX_ENTRIES", 300)),
+        'CULL_FREQUENCY': 4,
+    }
+}
+
 # Cache configuration
 CACHES = {
     'default': {
@@ -156,7 +240,9 @@ CACHES = {
         'OPTIONS': {
             'MAX_ENTRIES': 1000,
         }
-    }
+    },
+    'plots': PLOT_CACHE,
+    'stages': STAGE_CACHE,
 }
 
 # Session configuration - Use database backend for persistence
@@ -166,7 +252,12 @@ SESSION_SAVE_EVERY_REQUEST = True
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # Logging configuration
-# Logging configuration
+# Request threads only enqueue records; the 'queue' handler's listener thread
+# writes them as JSON to the console and file handlers. Debug records are
+# sampled and rate limited per call site (see timeseries/logging_utils.py).
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# logs/ is not tracked, so create it for the file handler on a fresh checkout
+(BASE_DIR / 'logs').mkdir(exist_ok=True)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -179,35 +270,53 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'timeseries.logging_utils.JsonFormatter',
+        },
+    },
+    'filters': {
+        'debug_sampling': {
+            '()': 'timeseries.logging_utils.DebugSamplingFilter',
+            'sample_rate': float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", 1.0)),
+            'max_per_second': float(os.environ.get("LOG_DEBUG_MAX_PER_SECOND", 20)),
+            'burst': int(os.environ.get("LOG_DEBUG_BURST", 50)),
+        },
     },
     'handlers': {
         'console': {
-            'level': 'INFO',
+            'level': 'DEBUG',
             'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'formatter': os.environ.get("LOG_CONSOLE_FORMAT", "json"),
         },
         'file': {
-            'level': 'INFO',
+            'level': 'DEBUG',
             'class': 'logging.handlers.TimedRotatingFileHandler',
             'filename': BASE_DIR / 'logs/app.log',
-            'formatter': 'verbose',
+            'formatter': 'json',
             'when': 'midnight',
             'backupCount': 7,
+            'delay': True,
+        },
+        # Must sort after the handlers it references; dictConfig builds handlers by name order
+        'queue': {
+            '()': 'timeseries.logging_utils.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'filters': ['debug_sampling'],
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'timeseries': {
-            'handlers': ['console', 'file'],
-            'level': 'INFO',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
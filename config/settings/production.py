@@ -64,7 +64,9 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-session-cache',
-    }
+    },
+    'plots': PLOT_CACHE,
+    'stages': STAGE_CACHE,
 }
 
 # Use database sessions instead of cache sessions for persistence
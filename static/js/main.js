@@ -0,0 +1,277 @@
+// Plot helpers for the results page
+
+const TimeseriesPlots = {
+    _dataset: null,
+    _columns: {},
+    _indices: {},
+
+    /**
+     * The series shared by all plots on the page, shipped once in the
+     * #plot-dataset script tag: a timestamp axis, one array of values per
+     * (data type, symbol), the axis positions of the columns that do not
+     * cover the whole axis, and the shared layout template.
+     */
+    dataset() {
+        if (this._dataset === null) {
+            const element = document.getElementById('plot-dataset');
+            this._dataset = element
+                ? JSON.parse(element.textContent)
+                : { timestamps: [], columns: {}, indices: {}, template: undefined };
+        }
+        return this._dataset;
+    },
+
+    /**
+     * Decode a shipped array (a plain list or a typed-array payload).
+     */
+    decode(array, ArrayType) {
+        if (Array.isArray(array)) {
+            return ArrayType.from(array, (v) => (v === null ? NaN : v));
+        }
+        const bytes = Uint8Array.from(atob(array.bdata), (c) => c.charCodeAt(0));
+        const types = { f4: Float32Array, f8: Float64Array, i4: Int32Array };
+        return new types[array.dtype](bytes.buffer);
+    },
+
+    /**
+     * Decode one dataset column into a typed array of its values.
+     */
+    column(dataType, symbol) {
+        const key = `${dataType}/${symbol}`;
+        if (!(key in this._columns)) {
+            const column = (this.dataset().columns[dataType] || {})[symbol];
+            this._columns[key] = column ? this.decode(column, Float64Array) : new Float64Array(0);
+        }
+        return this._columns[key];
+    },
+
+    /**
+     * Axis positions of one column's values, or null when it covers the whole axis.
+     */
+    index(dataType, symbol) {
+        const key = `${dataType}/${symbol}`;
+        if (!(key in this._indices)) {
+            const index = ((this.dataset().indices || {})[dataType] || {})[symbol];
+            this._indices[key] = index ? this.decode(index, Int32Array) : null;
+        }
+        return this._indices[key];
+    },
+
+    /**
+     * Assemble a figure from a declarative spec. Traces with a `source`
+     * ([dataType, symbol]) take their points from the shared dataset,
+     * skipping any missing values.
+     */
+    buildFigure(spec) {
+        const dataset = this.dataset();
+        const axis = dataset.timestamps;
+        const data = spec.data.map((trace) => {
+            if (!trace.source) {
+                return trace;
+            }
+            const { source, ...rest } = trace;
+            const values = this.column(source[0], source[1]);
+            const index = this.index(source[0], source[1]);
+            const x = [];
+            const y = [];
+            for (let i = 0; i < values.length; i++) {
+                if (!Number.isNaN(values[i])) {
+                    x.push(axis[index === null ? i : index[i]]);
+                    y.push(values[i]);
+                }
+            }
+            return { ...rest, x, y };
+        });
+        return { data, layout: { template: dataset.template, ...spec.layout } };
+    },
+
+    /**
+     * Refetch points for the visible x range whenever a plot is zoomed or panned.
+     * Server-side plots are downsampled to a point budget; zooming in swaps in
+     * the full-resolution points for the window, and resetting the axes
+     * restores the downsampled overview.
+     */
+    enableRangeRefinement(plotId, rangeUrl) {
+        const plotElement = document.getElementById(plotId);
+        if (!plotElement || !rangeUrl) {
+            return;
+        }
+
+        let pending = null;
+        plotElement.on('plotly_relayout', (eventData) => {
+            const range = this.xRange(eventData);
+            if (range === null) {
+                return; // Not an x-axis change
+            }
+            const [start, end] = range;
+
+            if (pending) {
+                pending.abort();
+            }
+            pending = new AbortController();
+
+            // rangeUrl may already carry a query (e.g. ?freq=M)
+            const url = new URL(rangeUrl, window.location.origin);
+            if (start !== null) {
+                url.searchParams.set('start', start);
+                url.searchParams.set('end', end);
+            }
+
+            fetch(url, { signal: pending.signal })
+                .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+                .then((payload) => this.replaceTraceData(plotElement, payload.traces))
+                .catch((error) => {
+                    if (error && error.name === 'AbortError') {
+                        return;
+                    }
+                    console.error(`Error refining plot range for ${plotId}:`, error);
+                });
+        });
+    },
+
+    /**
+     * The [start, end] x range of a plotly_relayout event: [null, null] when
+     * the axes were reset, null when the event is not an x-axis change.
+     */
+    xRange(eventData) {
+        if (eventData['xaxis.range[0]'] !== undefined) {
+            return [eventData['xaxis.range[0]'], eventData['xaxis.range[1]']];
+        }
+        if (Array.isArray(eventData['xaxis.range'])) {
+            return eventData['xaxis.range'];
+        }
+        return eventData['xaxis.autorange'] ? [null, null] : null;
+    },
+
+    /**
+     * Keep a correlation heatmap in step with the x range of a series plot:
+     * zooming or panning the series shows the correlation matrix of the
+     * visible window, resetting the axes restores the full period.
+     */
+    linkWindowCorrelation(sourceId, heatmapId, windowUrl) {
+        const source = document.getElementById(sourceId);
+        const heatmap = document.getElementById(heatmapId);
+        if (!source || !heatmap || !windowUrl) {
+            return;
+        }
+
+        let pending = null;
+        source.on('plotly_relayout', (eventData) => {
+            const range = this.xRange(eventData);
+            if (range === null) {
+                return;
+            }
+            const [start, end] = range;
+
+            if (pending) {
+                pending.abort();
+            }
+            pending = new AbortController();
+
+            const url = new URL(windowUrl, window.location.origin);
+            if (start !== null) {
+                url.searchParams.set('start', start);
+                url.searchParams.set('end', end);
+            }
+
+            fetch(url, { signal: pending.signal })
+                .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+                .then((payload) => {
+                    Plotly.restyle(heatmap, { z: [payload.matrix] }, [0]);
+                    if (payload.start) {
+                        Plotly.relayout(heatmap, {
+                            'title.text': `Return Correlation (${payload.start.slice(0, 10)} to ${payload.end.slice(0, 10)})`,
+                        });
+                    }
+                })
+                .catch((error) => {
+                    if (error && error.name === 'AbortError') {
+                        return;
+                    }
+                    console.error(`Error updating window correlation for ${heatmapId}:`, error);
+                });
+        });
+    },
+
+    /**
+     * Drive forecast traces from a horizon slider: each change fetches the
+     * forecasts extended to the new horizon ({plots: {plotId: traces}}),
+     * swaps them into the plots by trace name and rescales the plots to show
+     * them. Traces a plot was drawn without (e.g. a confidence band) are added.
+     */
+    linkForecastHorizon(sliderId, labelId, forecastUrl) {
+        const slider = document.getElementById(sliderId);
+        const label = document.getElementById(labelId);
+        if (!slider || !forecastUrl) {
+            return;
+        }
+
+        let pending = null;
+        slider.addEventListener('input', () => {
+            if (label) {
+                label.textContent = slider.value;
+            }
+        });
+        slider.addEventListener('change', () => {
+            if (pending) {
+                pending.abort();
+            }
+            pending = new AbortController();
+
+            const url = new URL(forecastUrl, window.location.origin);
+            url.searchParams.set('steps', slider.value);
+
+            fetch(url, { signal: pending.signal })
+                .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+                .then((payload) => {
+                    Object.entries(payload.plots || {}).forEach(([plotId, traces]) => {
+                        const plotElement = document.getElementById(plotId);
+                        if (plotElement && plotElement.data) {
+                            const names = new Set(plotElement.data.map((trace) => trace.name));
+                            const missing = traces.filter((trace) => !names.has(trace.name));
+                            this.replaceTraceData(plotElement, traces);
+                            if (missing.length > 0) {
+                                Plotly.addTraces(plotElement, missing);
+                            }
+                            Plotly.relayout(plotElement, { 'xaxis.autorange': true, 'yaxis.autorange': true });
+                        }
+                    });
+                })
+                .catch((error) => {
+                    if (error && error.name === 'AbortError') {
+                        return;
+                    }
+                    console.error('Error extending the ARIMA forecasts:', error);
+                });
+        });
+    },
+
+    /**
+     * Swap the x/y data of existing traces, matched by trace name, keeping the
+     * current axis ranges.
+     */
+    replaceTraceData(plotElement, traces) {
+        const indexByName = {};
+        plotElement.data.forEach((trace, i) => {
+            indexByName[trace.name] = i;
+        });
+
+        const xs = [];
+        const ys = [];
+        const indices = [];
+        (traces || []).forEach((trace) => {
+            if (indexByName[trace.name] !== undefined) {
+                xs.push(trace.x);
+                ys.push(trace.y);
+                indices.push(indexByName[trace.name]);
+            }
+        });
+
+        if (indices.length > 0) {
+            Plotly.restyle(plotElement, { x: xs, y: ys }, indices);
+        }
+    }
+};
+
+// Global instance for easy access
+window.TimeseriesPlots = TimeseriesPlots;
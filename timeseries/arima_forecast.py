@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/arima_forecast.py
+
+"""
+Local ARIMA forecasts to any horizon from the fitted parameters.
+The backend returns each symbol's ARIMA(p, d, q) parameters (ar.L*, ma.L*,
+sigma2) and in-sample fitted values and residuals, whose sum is the modelled
+series. The forecaster rebuilds the model in state-space form, runs the
+Kalman filter over the differenced series to recover the state at the end of
+the sample, and projects the state and its covariance forward, which gives
+the point forecasts and confidence intervals the backend's statsmodels fit
+would give for the same horizon. Symbols with the same order and sample
+length are filtered and forecast together as one batch of matrices.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# Longest horizon offered by the forecast slider
+DEFAULT_MAX_STEPS = 250
+
+# Largest difference from the backend's forecasts that still counts as a match;
+# the backend rounds its parameters and series to 6 decimals
+CROSS_CHECK_TOLERANCE = 1e-4
+
+_ORDER = re.compile(r'\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)')
+
+
+def parse_order(specification: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    """(p, d, q) of a model specification such as "ARIMA(1,1,1)"."""
+    match = _ORDER.search(specification or '')
+    return tuple(int(n) for n in match.groups()) if match else None
+
+
+@dataclass(slots=True)
+class ArimaModel:
+    """The fitted parameters and modelled series of one symbol."""
+    symbol: str
+    order: Tuple[int, int, int]
+    ar: np.ndarray
+    ma: np.ndarray
+    sigma2: float
+    const: float
+    y: np.ndarray
+    last_timestamp: Optional[str]
+
+
+def model_from(symbol: str, result: Any) -> Optional[ArimaModel]:
+    """
+    Build the model of one result_model.ArimaResult.
+
+    Returns:
+        None when the result lacks the order, sigma2 or the in-sample series
+    """
+    summary = result.summary
+    order = parse_order(summary.model_specification or result.forecast.model_specification)
+    params = summary.parameters or {}
+    if order is None or params.get('sigma2') is None or not summary.fitted_values:
+        return None
+    p, d, q = order
+    fitted = summary.fitted_values
+    residuals = summary.residuals
+    y = np.array([np.nan if value is None else value for value in fitted.values], dtype=np.float64) \
+        + np.array([np.nan if residuals.get(key) is None else residuals.get(key) for key in fitted.index],
+                   dtype=np.float64)
+    return ArimaModel(
+        symbol=symbol,
+        order=order,
+        ar=np.array([params.get(f'ar.L{k}', 0.0) for k in range(1, p + 1)], dtype=np.float64),
+        ma=np.array([params.get(f'ma.L{k}', 0.0) for k in range(1, q + 1)], dtype=np.float64),
+        sigma2=float(params['sigma2']),
+        # A constant is the process mean only without differencing
+        const=float(params.get('const', 0.0) or 0.0) if d == 0 else 0.0,
+        y=y,
+        last_timestamp=list(fitted.index)[-1] if fitted.index else None,
+    )
+
+
+def _arma_system(models: List[ArimaModel]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Batched (S, r, r) transitions, (S, r) shock loadings and (S, r, r) state covariances of the ARMA parts."""
+    p, _, q = models[0].order
+    r = max(p, q + 1)
+    transition = np.zeros((len(models), r, r))
+    selection = np.zeros((len(models), r))
+    selection[:, 0] = 1.0
+    for s, model in enumerate(models):
+        transition[s, :p, 0] = model.ar
+        selection[s, 1:q + 1] = model.ma
+    transition[:, :-1, 1:] += np.eye(r - 1)
+    sigma2 = np.array([model.sigma2 for model in models])
+    state_cov = sigma2[:, None, None] * selection[:, :, None] * selection[:, None, :]
+    return transition, selection, state_cov
+
+
+def _stationary_cov(transition: np.ndarray, state_cov: np.ndarray) -> np.ndarray:
+    """Solve P = T P T' + Q for every batch member (the unconditional state covariance)."""
+    batch, r, _ = transition.shape
+    kron = np.einsum('sij,skl->sikjl', transition, transition).reshape(batch, r * r, r * r)
+    system = np.eye(r * r) - kron
+    solved = np.linalg.solve(system, state_cov.reshape(batch, r * r, 1))
+    return solved.reshape(batch, r, r)
+
+
+def differenced(models: List[ArimaModel]) -> np.ndarray:
+    """The (S, T - d) ARMA part of models sharing order and length: differenced, less the constant."""
+    w = np.stack([model.y for model in models])
+    for _ in range(models[0].order[1]):
+        w = np.diff(w, axis=1)
+    return w - np.array([model.const for model in models])[:, None]
+
+
+def levels(models: List[ArimaModel]) -> np.ndarray:
+    """(S, d) last values of y, dy, ..., d^(d-1)y, the integration states at the end of the sample."""
+    d = models[0].order[1]
+    difference = np.stack([model.y for model in models])
+    last = []
+    for _ in range(d):
+        last.append(difference[:, -1])
+        difference = np.diff(difference, axis=1)
+    return np.stack(last, axis=1) if d else np.zeros((len(models), 0))
+
+
+def filtered_states(models: List[ArimaModel]) -> Dict[str, np.ndarray]:
+    """
+    Kalman filter the ARMA part of models sharing order and length.
+
+    Returns:
+        'transition', 'selection', 'state_cov' (the system) and 'state',
+        'cov' (batched), the state at the last observation given all of them
+    """
+    w = differenced(models)
+    transition, selection, state_cov = _arma_system(models)
+    batch, r, _ = transition.shape
+    state = np.zeros((batch, r))
+    cov = _stationary_cov(transition, state_cov)
+    # Kalman filter in predicted form; a missing value only propagates the state
+    for t in range(w.shape[1]):
+        observed = ~np.isnan(w[:, t])
+        variance = cov[:, 0, 0]
+        innovation = np.where(observed, w[:, t] - state[:, 0], 0.0)
+        gain = np.where(observed[:, None], cov[:, :, 0] / variance[:, None], 0.0)
+        # Updated with observation t, then predicted for t + 1 (except after the last one)
+        state = state + gain * innovation[:, None]
+        cov = cov - gain[:, :, None] * cov[:, None, 0, :]
+        if t < w.shape[1] - 1:
+            state = (transition @ state[:, :, None])[:, :, 0]
+            cov = transition @ cov @ transition.transpose(0, 2, 1) + state_cov
+    return {'transition': transition, 'selection': selection, 'state_cov': state_cov, 'state': state, 'cov': cov}
+
+
+def _forecast_batch(models: List[ArimaModel], steps: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Point forecasts and forecast error variances (S, steps) of models sharing order and length."""
+    _, d, _ = models[0].order
+    batch = len(models)
+    filtered = filtered_states(models)
+    transition, state_cov = filtered['transition'], filtered['state_cov']
+    r = transition.shape[1]
+    state = (transition @ filtered['state'][:, :, None])[:, :, 0]
+    cov = transition @ filtered['cov'] @ transition.transpose(0, 2, 1) + state_cov
+
+    # Forecast with the d integration states (the last levels of y, dy, ...) in front of the ARMA state
+    m = d + r
+    aug_transition = np.zeros((batch, m, m))
+    aug_transition[:, :d, :d] = np.triu(np.ones((d, d)))
+    aug_transition[:, :d, d] = 1.0
+    aug_transition[:, d:, d:] = transition
+    aug_cov = np.zeros((batch, m, m))
+    aug_cov[:, d:, d:] = cov
+    aug_state_cov = np.zeros((batch, m, m))
+    aug_state_cov[:, d:, d:] = state_cov
+    aug_state = np.concatenate([levels(models), state], axis=1)
+    design = np.zeros(m)
+    design[:d] = 1.0
+    design[d] = 1.0
+
+    means = np.empty((batch, steps))
+    variances = np.empty((batch, steps))
+    const = np.array([model.const for model in models])
+    for h in range(steps):
+        means[:, h] = aug_state @ design + const
+        variances[:, h] = np.einsum('i,sij,j->s', design, aug_cov, design)
+        aug_state = (aug_transition @ aug_state[:, :, None])[:, :, 0]
+        aug_cov = aug_transition @ aug_cov @ aug_transition.transpose(0, 2, 1) + aug_state_cov
+    return means, variances
+
+
+def batches(models: List[ArimaModel]) -> List[List[ArimaModel]]:
+    """Models grouped by order and sample length, the unit the filter runs on; too short samples are left out."""
+    grouped: Dict[Tuple[Tuple[int, int, int], int], List[ArimaModel]] = {}
+    for model in models:
+        grouped.setdefault((model.order, len(model.y)), []).append(model)
+    return [batch for (order, length), batch in grouped.items() if length > order[1] + 1]
+
+
+def forecast(models: List[ArimaModel], steps: int, confidence: float = 0.95) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Point forecasts and confidence intervals of every model.
+
+    Args:
+        models: Models built with model_from
+        steps: Forecast horizon
+        confidence: Coverage of the (normal) confidence interval
+
+    Returns:
+        {symbol: {'point', 'lower', 'upper'}}
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    forecasts = {}
+    for batch in batches(models):
+        try:
+            means, variances = _forecast_batch(batch, steps)
+        except (np.linalg.LinAlgError, FloatingPointError) as e:
+            logger.warning(f"Local ARIMA forecast failed for {[m.symbol for m in batch]}: {e}")
+            continue
+        half_width = z * np.sqrt(np.maximum(variances, 0.0))
+        for s, model in enumerate(batch):
+            forecasts[model.symbol] = {
+                'point': means[s].tolist(),
+                'lower': (means[s] - half_width[s]).tolist(),
+                'upper': (means[s] + half_width[s]).tolist(),
+            }
+    return forecasts
+
+
+def backend_bounds(result: Any) -> Tuple[List[float], List[float]]:
+    """The backend's (lower, upper) confidence bounds: the forecast's, else the summary's."""
+    forecast_result = result.forecast
+    if forecast_result.lower and forecast_result.upper:
+        return forecast_result.lower, forecast_result.upper
+    intervals = result.summary.forecasting.confidence_intervals or {}
+    return intervals.get('lower_bound') or [], intervals.get('upper_bound') or []
+
+
+def cross_check(models: List[ArimaModel], arima_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compare the local forecasts over the backend's horizon with the backend's.
+
+    Point forecasts and, where returned, the confidence bounds are compared.
+
+    Returns:
+        {'max_difference', 'matches', 'differences': {symbol: max difference}},
+        or None when the backend returned no forecasts
+    """
+    steps = max((len(result.forecast.point_forecasts or []) for result in arima_results.values()), default=0)
+    if not steps:
+        return None
+    differences = {}
+    for symbol, local in forecast(models, steps).items():
+        backend = arima_results[symbol].forecast
+        lower, upper = backend_bounds(arima_results[symbol])
+        pairs = [(local['point'], backend.point_forecasts), (local['lower'], lower), (local['upper'], upper)]
+        gaps = [np.abs(np.array(ours[:len(theirs)], dtype=np.float64) - np.array(theirs, dtype=np.float64))
+                for ours, theirs in pairs if theirs]
+        gaps = np.concatenate(gaps) if gaps else np.array([])
+        gaps = gaps[~np.isnan(gaps)]
+        if len(gaps):
+            differences[symbol] = float(gaps.max())
+    if not differences:
+        return None
+    max_difference = max(differences.values())
+    return {'max_difference': max_difference, 'matches': max_difference <= CROSS_CHECK_TOLERANCE,
+            'differences': differences}
+
+
+def extend(arima_results: Dict[str, Any], steps: int, confidence: float = 0.95) -> Dict[str, Dict[str, Any]]:
+    """
+    Forecast traces of every symbol for the ARIMA plots, steps ahead.
+
+    Returns:
+        {symbol: {'x', 'point', 'lower', 'upper'}}, x continuing the fitted
+        dates on the trading calendar
+    """
+    models = [model for model in (model_from(symbol, result) for symbol, result in arima_results.items()) if model]
+    forecasts = forecast(models, steps, confidence)
+    extended = {}
+    for model in models:
+        if model.symbol not in forecasts:
+            continue
+        try:
+            x = trading_calendar.forecast_axis(model.last_timestamp, steps)
+        except ValueError:
+            x = [f"Forecast_{j+1}" for j in range(steps)]
+        extended[model.symbol] = {'x': x, **forecasts[model.symbol]}
+    return extended
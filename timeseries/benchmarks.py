@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/benchmarks.py
+
+"""
+Plot payload and response parsing benchmarks.
+Builds synthetic multi-symbol figures and measures how each plot encoding
+affects payload size and server-side serialization time. Browser-side parse
+and render times, for each encoding and for SVG versus WebGL traces, are
+measured by the plot benchmark page. Also compares peak
+memory of loading a pipeline response whole versus streaming it, the
+memory held by the analysis sections as dicts versus the typed result model,
+and what the float32 precision mode saves in memory, storage and transfer.
+"""
+
+import gzip
+import json
+import logging
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import figure_builder, precision, result_model
+from .streaming import DATA_ARRAY_KEYS, parse_pipeline_response
+
+logger = logging.getLogger(__name__)
+
+# Encoding label -> typed-array dtype passed to figure_builder.to_json (None = decimal text)
+ENCODINGS = {
+    'text': None,
+    'f8': 'f8',
+    'f4': 'f4',
+}
+
+
+def synthetic_figure(points: int, traces: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a returns-style line chart of random walks on a business-day axis.
+
+    Args:
+        points: Number of points per trace
+        traces: Number of traces (symbols)
+        seed: Random seed, so repeated runs compare identical payloads
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2000-01-03', periods=points).strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    values = rng.standard_normal((traces, points)).cumsum(axis=1) * 0.01
+    series = [(f'SYM{i + 1}', dates, values[i].tolist()) for i in range(traces)]
+    return figure_builder.series_figure(
+        series,
+        title_text=f'Synthetic Returns - {traces} x {points:,} points',
+        yaxis_title='Return',
+        value_label='Return',
+        value_format='.6f',
+        zero_line=True,
+    )
+
+
+def max_relative_error(fig: Dict[str, Any], dtype: Optional[str]) -> float:
+    """Largest relative error introduced by storing the figure's y values as dtype."""
+    if dtype is None:
+        return 0.0
+    worst = 0.0
+    for trace in fig['data']:
+        y = np.asarray(trace['y'], dtype=np.float64)
+        stored = y.astype(dtype).astype(np.float64)
+        scale = np.maximum(np.abs(y), np.finfo(np.float64).tiny)
+        worst = max(worst, float(np.max(np.abs(stored - y) / scale)))
+    return worst
+
+
+def encoding_benchmark(points: int, traces: int, repeats: int = 3) -> List[Dict[str, Any]]:
+    """
+    Serialize the same synthetic figure with every encoding.
+
+    Returns:
+        One row per encoding with the JSON payload, its size, the best-of-repeats
+        server encode time and the worst-case relative precision loss
+    """
+    fig = synthetic_figure(points, traces)
+    rows = []
+    for label, dtype in ENCODINGS.items():
+        best = float('inf')
+        payload = ''
+        for _ in range(max(1, repeats)):
+            started = time.perf_counter()
+            payload = figure_builder.to_json(fig, dtype=dtype)
+            best = min(best, time.perf_counter() - started)
+        rows.append({
+            'encoding': label,
+            'payload': payload,
+            'bytes': len(payload.encode('utf-8')),
+            'encode_ms': best * 1000,
+            'max_relative_error': max_relative_error(fig, dtype),
+        })
+
+    baseline = rows[0]['bytes']
+    for row in rows:
+        row['size_ratio'] = row['bytes'] / baseline if baseline else 1.0
+    logger.info(f"Plot encoding benchmark ({traces} x {points} points): " +
+                ', '.join(f"{row['encoding']}={row['bytes']}B" for row in rows))
+    return rows
+
+
+def renderer_benchmark(points: int, traces: int) -> List[Dict[str, Any]]:
+    """
+    Serialize the same synthetic figure with SVG and with WebGL scatter traces.
+
+    Both use the default typed-array encoding so only the trace type differs;
+    the plot benchmark page times Plotly.newPlot for each in the browser.
+    'auto' marks the renderer the configured threshold picks at this size.
+    """
+    fig = synthetic_figure(points, traces)
+    threshold = figure_builder.default_webgl_threshold()
+    auto = 'webgl' if threshold is not None and figure_builder.scatter_points(fig) > threshold else 'svg'
+    rows = []
+    for label, webgl_threshold in (('svg', None), ('webgl', 0)):
+        payload = figure_builder.to_json(fig, webgl_threshold=webgl_threshold)
+        rows.append({
+            'renderer': label,
+            'trace_type': 'scattergl' if webgl_threshold is not None else 'scatter',
+            'payload': payload,
+            'bytes': len(payload.encode('utf-8')),
+            'auto': label == auto,
+        })
+    return rows
+
+
+def synthetic_pipeline_response(size_mb: float, symbols: int = 5, seed: int = 0) -> bytes:
+    """
+    Build a run_pipeline-shaped response body of roughly size_mb megabytes.
+
+    Every data array gets the same number of rows on a minute axis (large
+    sizes would run past the end of a daily calendar).
+    """
+    rng = np.random.default_rng(seed)
+    names = [f'SYM{i + 1}' for i in range(symbols)]
+    # ~22 bytes per value plus the timestamp, per row and data array
+    row_bytes = 40 + 22 * symbols
+    rows = max(1, int(size_mb * 1024 * 1024 / (row_bytes * len(DATA_ARRAY_KEYS))))
+    dates = pd.date_range('2000-01-03', periods=rows, freq='min').strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    body = {}
+    for key in DATA_ARRAY_KEYS:
+        values = rng.standard_normal((rows, symbols)).tolist()
+        body[key] = [dict(Date=date, **dict(zip(names, row))) for date, row in zip(dates, values)]
+    return json.dumps(body).encode('utf-8')
+
+
+def _columns_from_rows(raw_results: Dict[str, Any]) -> Dict[str, Any]:
+    # What ResultsProcessor does with a json.loads result
+    data_arrays = {}
+    for key in DATA_ARRAY_KEYS:
+        rows = raw_results.get(key, [])
+        data_arrays[key] = {
+            'timestamps': [row.get('Date') for row in rows],
+            'symbol_data': {name: [row.get(name) for row in rows]
+                            for name in (rows[0] if rows else {}) if name != 'Date'},
+        }
+    return data_arrays
+
+
+def parse_memory_benchmark(size_mb: float = 20.0, chunk_bytes: int = 64 * 1024) -> List[Dict[str, Any]]:
+    """
+    Peak Python memory (tracemalloc) and time to turn a response body into data arrays.
+
+    'loads' reads the whole body, decodes it with json.loads and builds the
+    columns from the row dicts; 'stream' feeds the body in chunk_bytes pieces
+    to parse_pipeline_response. The body itself is not counted for either.
+    """
+    body = synthetic_pipeline_response(size_mb)
+
+    def loads():
+        return _columns_from_rows(json.loads(body.decode('utf-8')))
+
+    def stream():
+        chunks = (body[i:i + chunk_bytes] for i in range(0, len(body), chunk_bytes))
+        return parse_pipeline_response(chunks)[1]
+
+    rows = []
+    for label, parse in (('loads', loads), ('stream', stream)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = parse()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        retained = sum(array['count'] if 'count' in array else len(array['timestamps'])
+                       for array in result.values())
+        del result
+        rows.append({
+            'method': label,
+            'body_bytes': len(body),
+            'peak_bytes': peak,
+            'seconds': elapsed,
+            'rows': retained,
+        })
+    logger.info(f"Parse memory benchmark ({len(body)} B body): " +
+                ', '.join(f"{row['method']} peak={row['peak_bytes']}B" for row in rows))
+    return rows
+
+
+def result_model_memory_benchmark(raw_results: Dict[str, Any], copies: int = 20) -> List[Dict[str, Any]]:
+    """
+    Memory retained by the analysis sections of a response, as dicts and as the typed model.
+
+    Each representation is built copies times from the same JSON text (like
+    several results held by one worker); only what stays referenced counts.
+    """
+    sections = {key: raw_results[key] for key in result_model.SECTION_NAMES if key in raw_results}
+    text = json.dumps(sections)
+
+    def dicts():
+        return json.loads(text)
+
+    def model():
+        return result_model.decode(json.loads(text))
+
+    rows = []
+    for label, build in (('dict', dicts), ('model', model)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        held = [build() for _ in range(max(1, copies))]
+        elapsed = time.perf_counter() - started
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        rows.append({
+            'representation': label,
+            'retained_bytes': retained,
+            'bytes_per_result': retained / max(1, copies),
+            'build_ms_per_result': elapsed * 1000 / max(1, copies),
+        })
+    logger.info("Result model memory benchmark: " +
+                ', '.join(f"{row['representation']}={row['bytes_per_result']:.0f}B/result" for row in rows))
+    return rows
+
+
+def precision_benchmark(raw_results: Dict[str, Any], size_mb: float = 5.0,
+                        symbols: int = 5) -> List[Dict[str, Any]]:
+    """
+    Compare full and float32 precision for one run, from processing to the page.
+
+    The analysis sections of raw_results are combined with synthetic data
+    arrays of about size_mb megabytes, processed as the pipeline view does,
+    and measured in each mode:
+
+    - session_bytes: JSON text of the raw and processed results as stored
+    - transfer_bytes: gzip size of the plot payloads sent to the browser
+    - max_relative_error: worst error of a stored data-array value, next to
+      the documented bound
+    """
+    from django.test.utils import override_settings
+    from .results_processor import ResultsProcessor
+
+    raw = {key: value for key, value in raw_results.items() if key not in DATA_ARRAY_KEYS}
+    raw.update(json.loads(synthetic_pipeline_response(size_mb, symbols)))
+
+    rows = []
+    for mode, dtype in (('float64', 'f8'), ('float32', 'f4')):
+        with override_settings(RESULT_FLOAT_PRECISION=mode, PLOT_ARRAY_DTYPE=dtype):
+            processor = ResultsProcessor(raw)
+            processed = processor.process_all()
+            started = time.perf_counter()
+            stored_raw = precision.for_storage(raw)
+            stored = precision.for_storage(processed)
+            store_ms = (time.perf_counter() - started) * 1000
+
+        worst = 0.0
+        values = 0
+        for data_type, data_info in processed['data_arrays'].items():
+            for symbol, column in data_info['symbol_data'].items():
+                original = np.array(column, dtype=np.float64)
+                kept = np.array(stored['data_arrays'][data_type]['symbol_data'][symbol], dtype=np.float64)
+                scale = np.maximum(np.abs(original), np.finfo(np.float64).tiny)
+                worst = max(worst, float(np.nanmax(np.abs(kept - original) / scale, initial=0.0)))
+                values += len(column)
+
+        page_payload = json.dumps({'plots': stored['plots'], 'plot_dataset': stored['plot_dataset']})
+        rows.append({
+            'mode': mode,
+            'values': values,
+            'session_bytes': len(json.dumps(stored_raw)) + len(json.dumps(stored)),
+            'transfer_bytes': len(gzip.compress(page_payload.encode('utf-8'))),
+            'store_ms': store_ms,
+            'max_relative_error': worst,
+            'error_bound': precision.FLOAT32_MAX_RELATIVE_ERROR if mode == 'float32' else 0.0,
+        })
+    logger.info("Precision benchmark: " + ', '.join(
+        f"{row['mode']} session={row['session_bytes']}B transfer={row['transfer_bytes']}B" for row in rows))
+    return rows
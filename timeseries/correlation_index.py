@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/correlation_index.py
+
+"""
+Prefix-sum index for correlations over arbitrary windows of the returns.
+For every symbol pair the index holds running sums of the pairwise-complete
+moments (count, sum x, sum x^2, sum xy), so the sums over a window are the
+difference of two prefixes and the correlation of any window, and of every
+step of a rolling window, follows in constant time per pair.
+
+Prefixes are kept as N x N matrices at every block_size-th row. With few
+symbols block_size is 1 and every window is two lookups; with hundreds of
+symbols the block size grows so the index stays within
+settings.CORRELATION_INDEX_MAX_BYTES, and the at most 2 * block_size rows at
+the window edges are summed directly. Series are centered on their mean
+before summing, which keeps the prefix differences accurate.
+"""
+
+import logging
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from . import plot_cache
+from .downsampling import to_epoch, window_bounds
+
+logger = logging.getLogger(__name__)
+
+# Bump when the index layout changes so indexes cached by older code are not reused
+CORRELATION_INDEX_VERSION = 1
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Moments stacked along the second axis of the prefix array
+_COUNT, _SUM, _SQUARES, _PRODUCTS = range(4)
+
+
+def _block_size(rows: int, symbols: int, max_bytes: int) -> int:
+    """Smallest block size whose (rows / block + 1) prefixes of 4 N x N float64 fit in max_bytes."""
+    prefix_bytes = 4 * symbols * symbols * 8
+    checkpoints = max(2, max_bytes // max(prefix_bytes, 1))
+    return max(1, math.ceil(rows / (checkpoints - 1)))
+
+
+def _moments(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pairwise moments (4, N, N) of centered rows x, where mask marks the present values."""
+    return np.stack([mask.T @ mask, x.T @ mask, (x * x).T @ mask, x.T @ x])
+
+
+def correlation_from_moments(moments: np.ndarray) -> np.ndarray:
+    """
+    Pairwise-complete Pearson correlation from summed moments.
+
+    Element [i, j] uses the rows where both i and j are present; pairs with
+    fewer than two such rows or a constant series are NaN.
+    """
+    n, sx, sxx, sxy = moments
+    sy, syy = sx.T, sxx.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        r = cov / np.sqrt(var_x * var_y)
+    r = np.where((n >= 2) & (var_x > 0) & (var_y > 0), r, np.nan)
+    return np.clip(r, -1.0, 1.0)
+
+
+class CorrelationIndex:
+    """Block prefix sums of the pairwise moments of columnar return series."""
+
+    def __init__(self, timestamps: Sequence[Any], symbol_data: Dict[str, Sequence[Any]],
+                 symbols: Sequence[str], block_size: Optional[int] = None):
+        """
+        Build the index.
+
+        Args:
+            timestamps: Shared, sorted timestamp axis
+            symbol_data: Symbol -> values aligned with timestamps (None for missing)
+            symbols: Symbols in display order
+            block_size: Rows between stored prefixes; by default the smallest
+                that fits settings.CORRELATION_INDEX_MAX_BYTES
+        """
+        self.timestamps = list(timestamps)
+        self.symbols = list(symbols)
+        rows = len(self.timestamps)
+        values = np.full((rows, len(self.symbols)), np.nan)
+        for j, symbol in enumerate(self.symbols):
+            column = np.array((symbol_data.get(symbol) or [])[:rows], dtype=np.float64)
+            values[:len(column), j] = column
+
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        center = filled.sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        self._x = np.where(present, filled - center, 0.0)
+        self._mask = present.astype(np.float64)
+        self._epoch = to_epoch(self.timestamps) if rows else np.array([], dtype=np.int64)
+
+        max_bytes = getattr(settings, 'CORRELATION_INDEX_MAX_BYTES', DEFAULT_MAX_BYTES)
+        self.block_size = block_size or _block_size(rows, len(self.symbols), max_bytes)
+        blocks = rows // self.block_size
+        size = blocks * self.block_size
+        shape = (blocks, self.block_size, len(self.symbols))
+        x = self._x[:size].reshape(shape)
+        mask = self._mask[:size].reshape(shape)
+        # One batched matrix product per moment over all full blocks
+        per_block = np.stack([
+            mask.transpose(0, 2, 1) @ mask,
+            x.transpose(0, 2, 1) @ mask,
+            (x * x).transpose(0, 2, 1) @ mask,
+            x.transpose(0, 2, 1) @ x,
+        ], axis=1)
+        self._prefix = np.concatenate([np.zeros((1, 4, len(self.symbols), len(self.symbols))),
+                                       np.cumsum(per_block, axis=0)])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored prefixes."""
+        return self._prefix.nbytes
+
+    def moments(self, lo: int, hi: int) -> np.ndarray:
+        """Summed pairwise moments (4, N, N) of rows [lo, hi)."""
+        block = self.block_size
+        first = -(-lo // block)
+        last = hi // block
+        if first >= last:
+            return _moments(self._x[lo:hi], self._mask[lo:hi])
+        total = self._prefix[last] - self._prefix[first]
+        if lo < first * block:
+            total = total + _moments(self._x[lo:first * block], self._mask[lo:first * block])
+        if last * block < hi:
+            total = total + _moments(self._x[last * block:hi], self._mask[last * block:hi])
+        return total
+
+    def window(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Correlation matrix of the rows inside [start, end].
+
+        Returns:
+            Dict with the symbols, the matrix (None where undefined), the
+            number of pairwise-complete observations and the window bounds
+            actually covered
+        """
+        lo, hi = window_bounds(self._epoch, start, end)
+        moments = self.moments(lo, hi)
+        matrix = correlation_from_moments(moments)
+        return {
+            'symbols': self.symbols,
+            'matrix': np.where(np.isnan(matrix), None, matrix).tolist(),
+            'observations': moments[_COUNT].astype(np.int64).tolist(),
+            'start': self.timestamps[lo] if hi > lo else None,
+            'end': self.timestamps[hi - 1] if hi > lo else None,
+        }
+
+    def rolling(self, pairs: Sequence[Tuple[str, str]], window: int,
+                min_periods: Optional[int] = None) -> Tuple[List[Any], Dict[str, List[Any]]]:
+        """
+        Rolling correlation of symbol pairs over the last window rows.
+
+        Uses per-pair prefix sums over all rows, so every step is a constant
+        number of subtractions whatever the window length.
+
+        Args:
+            pairs: (symbol, symbol) pairs
+            window: Window length in rows
+            min_periods: Pairwise-complete rows required for a value;
+                defaults to window, as in pandas
+
+        Returns:
+            (timestamps of the window ends, {'A / B': values with None where undefined})
+        """
+        rows = len(self.timestamps)
+        if window < 2 or rows < window or not pairs:
+            return [], {f'{a} / {b}': [] for a, b in pairs}
+        index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        i = np.array([index[a] for a, _ in pairs])
+        j = np.array([index[b] for _, b in pairs])
+        xi, xj = self._x[:, i], self._x[:, j]
+        mi, mj = self._mask[:, i], self._mask[:, j]
+        # (moment, row, pair) prefix sums with a leading zero row
+        sums = np.stack([mi * mj, xi * mj, xj * mi, xi * xi * mj, xj * xj * mi, xi * xj])
+        prefix = np.concatenate([np.zeros((6, 1, len(pairs))), np.cumsum(sums, axis=1)], axis=1)
+        n, sx, sy, sxx, syy, sxy = prefix[:, window:] - prefix[:, :-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var_x = n * sxx - sx * sx
+            var_y = n * syy - sy * sy
+            r = (n * sxy - sx * sy) / np.sqrt(var_x * var_y)
+        valid = (n >= max(2, min_periods or window)) & (var_x > 0) & (var_y > 0)
+        r = np.clip(np.where(valid, r, np.nan), -1.0, 1.0)
+        values = np.where(np.isnan(r), None, r).T.tolist()
+        return self.timestamps[window - 1:], {f'{a} / {b}': column for (a, b), column in zip(pairs, values)}
+
+
+def symbol_pairs(symbols: Sequence[str], limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Every (a, b) pair of distinct symbols in display order, optionally the first limit."""
+    pairs = [(a, b) for k, a in enumerate(symbols) for b in symbols[k + 1:]]
+    return pairs[:limit] if limit else pairs
+
+
+def cached(data_hash: str, data_arrays: Dict[str, Any], symbols: Sequence[str]) -> CorrelationIndex:
+    """The index of the returns data, cached per dataset under the hash of its data arrays."""
+    key = f'corr_index:v{CORRELATION_INDEX_VERSION}:{data_hash}:{plot_cache.content_hash(list(symbols))}'
+    index = cache.get(key)
+    if index is None:
+        returns = data_arrays.get('returns_data', {})
+        index = CorrelationIndex(returns.get('timestamps', []), returns.get('symbol_data', {}), symbols)
+        try:
+            cache.set(key, index)
+        except Exception as e:
+            logger.warning(f"Could not cache the correlation index: {e}")
+    return index
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/descriptive_stats.py
+
+"""
+Descriptive statistics for every symbol of every data array.
+The columnar arrays are stacked into one (data type, observation, symbol)
+array padded with NaN, and all statistics are reductions over the
+observation axis of that array, so the whole result takes a single pass per
+statistic regardless of the number of series. Conventions follow pandas:
+sample standard deviation, bias-adjusted skewness and excess kurtosis.
+Results are cached per dataset by content hash.
+"""
+
+import logging
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core.cache import cache
+
+from . import plot_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the statistics change so results cached by older code are not reused
+STATS_CACHE_VERSION = 1
+
+DATA_TYPE_LABELS = {
+    'original_data': 'Original prices',
+    'returns_data': 'Returns',
+    'scaled_data': 'Scaled',
+    'pre_garch_data': 'Pre-GARCH',
+    'post_garch_data': 'Post-GARCH',
+}
+
+QUANTILES = (('q05', 0.05), ('q25', 0.25), ('median', 0.5), ('q75', 0.75), ('q95', 0.95))
+
+STATISTICS = ('count', 'missing', 'mean', 'std', 'min', *(name for name, _ in QUANTILES),
+              'max', 'skew', 'kurt')
+
+
+def _stack(data_arrays: Dict[str, Any], symbols: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Stack the data arrays into a (type, observation, symbol) float array.
+
+    Returns:
+        Tuple of (data types, values with None and padding as NaN, number of
+        rows of each data type)
+    """
+    data_types = [data_type for data_type in DATA_TYPE_LABELS
+                  if data_arrays.get(data_type, {}).get('symbol_data')]
+    lengths = np.array([len(data_arrays[t].get('timestamps', [])) for t in data_types], dtype=np.int64)
+    values = np.full((len(data_types), int(lengths.max(initial=0)), len(symbols)), np.nan)
+    for i, data_type in enumerate(data_types):
+        symbol_data = data_arrays[data_type]['symbol_data']
+        for j, symbol in enumerate(symbols):
+            column = symbol_data.get(symbol) or []
+            column = np.array(column[:lengths[i]], dtype=np.float64)
+            values[i, :len(column), j] = column
+    return data_types, values, lengths
+
+
+def compute(data_arrays: Dict[str, Any], symbols: Sequence[str]) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """
+    Compute the statistics of every symbol of every data array.
+
+    Args:
+        data_arrays: ResultsProcessor data arrays ({type: {'timestamps',
+            'symbol_data'}})
+        symbols: Symbols in display order
+
+    Returns:
+        {data type: {symbol: {statistic: value}}}; undefined statistics
+        (e.g. skew of fewer than three values) are None
+    """
+    data_types, x, lengths = _stack(data_arrays, symbols)
+    if not data_types or not symbols:
+        return {}
+
+    present = ~np.isnan(x)
+    n = present.sum(axis=1).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.where(present, x, 0.0).sum(axis=1) / n
+        d = np.where(present, x - mean[:, None, :], 0.0)
+        d2 = d * d
+        m2 = d2.sum(axis=1)
+        m3 = (d2 * d).sum(axis=1)
+        m4 = (d2 * d2).sum(axis=1)
+
+        std = np.sqrt(m2 / (n - 1))
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+        kurt = (n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2)
+                - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+        # Undefined for too few values or constant series, as in pandas
+        skew = np.where((n >= 3) & (m2 > 0), skew, np.nan)
+        kurt = np.where((n >= 4) & (m2 > 0), kurt, np.nan)
+
+        quantiles = np.nanquantile(x, [q for _, q in QUANTILES], axis=1)
+        columns = {
+            'count': n,
+            'missing': lengths[:, None] - n,
+            'mean': mean,
+            'std': std,
+            'min': np.fmin.reduce(x, axis=1),
+            **{name: quantiles[k] for k, (name, _) in enumerate(QUANTILES)},
+            'max': np.fmax.reduce(x, axis=1),
+            'skew': skew,
+            'kurt': kurt,
+        }
+
+    # One (type, symbol, statistic) array converted to Python values at once
+    table = np.stack([columns[name] for name in STATISTICS], axis=-1)
+    table = np.where(np.isfinite(table), table, None).tolist()
+    return {
+        data_type: {
+            symbol: {name: (int(value) if name in ('count', 'missing') and value is not None else value)
+                     for name, value in zip(STATISTICS, table[i][j])}
+            for j, symbol in enumerate(symbols)
+        }
+        for i, data_type in enumerate(data_types)
+    }
+
+
+def cached(result_hash: str, data_arrays: Dict[str, Any], symbols: Sequence[str]) -> Dict[str, Any]:
+    """compute(), cached per dataset under the hash of its results."""
+    key = f'stats:v{STATS_CACHE_VERSION}:{result_hash}:{plot_cache.content_hash(list(symbols))}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute(data_arrays, symbols)
+        cache.set(key, stats)
+    return stats
+
+
+def table(stats: Dict[str, Dict[str, Dict[str, Any]]]) -> Tuple[List[str], List[List[Any]]]:
+    """Header and rows of all statistics, one row per data type and symbol (CSV export)."""
+    header = ['Series', 'Symbol', *STATISTICS]
+    rows = [[DATA_TYPE_LABELS.get(data_type, data_type), symbol, *(values.get(name) for name in STATISTICS)]
+            for data_type, by_symbol in stats.items() for symbol, values in by_symbol.items()]
+    return header, rows
+
+
+def table_rows(stats: Dict[str, Dict[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """The rows of table() as dicts for the results template."""
+    return [{'series': DATA_TYPE_LABELS.get(data_type, data_type), 'symbol': symbol, **values}
+            for data_type, by_symbol in stats.items() for symbol, values in by_symbol.items()]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/diagnostics.py
+
+"""
+Residual diagnostics: autocorrelation (ACF), partial autocorrelation (PACF)
+and Ljung-Box statistics for many series in one batched call.
+Every series (each symbol's ARIMA residuals and post-GARCH series) is
+demeaned and zero-padded into one (series, time) array, so a single real FFT
+gives all autocovariances in O(n log n); the PACF follows from the ACF by the
+Durbin-Levinson recursion (the Yule-Walker PACF), run on all series at once,
+and the Ljung-Box p-values use the closed-form chi-square tail for integer
+degrees of freedom, so nothing beyond numpy is needed.
+"""
+
+import logging
+import math
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the statistics change so diagnostics cached by older code are not reused
+DIAGNOSTICS_CACHE_VERSION = 1
+
+DEFAULT_MAX_LAGS = 20
+
+# Lags whose Ljung-Box statistics are listed next to the plots (plus the last lag computed)
+LJUNG_BOX_REPORT_LAGS = (5, 10)
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def chi2_sf(x: Any, df: Any) -> np.ndarray:
+    """
+    Chi-square survival function P(X > x) for integer degrees of freedom.
+
+    Uses the finite series of the regularized upper incomplete gamma function
+    for integer and half-integer shape (Abramowitz & Stegun 26.4.4-5).
+    """
+    x, df = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(df, dtype=np.int64))
+    t = np.maximum(x, 0.0) / 2
+    odd = df % 2 == 1
+    terms = df // 2
+    log_t = np.log(np.where(t > 0, t, 1.0))
+    total = np.where(odd, np.asarray(_erfc(np.sqrt(t)), dtype=np.float64), 0.0)
+    for i in range(int(terms.max(initial=0)) + 1):
+        # Even df: t^i / i!, i < df / 2; odd df: t^(i - 1/2) / Gamma(i + 1/2), 1 <= i <= (df - 1) / 2
+        even_term = np.exp(i * log_t - math.lgamma(i + 1) - t) if i else np.exp(-t)
+        odd_term = np.exp((i - 0.5) * log_t - math.lgamma(i + 0.5) - t) if i else 0.0
+        total = total + np.where(odd, np.where((i >= 1) & (i <= terms), odd_term, 0.0),
+                                 np.where(i < terms, even_term, 0.0))
+    return np.where(t > 0, np.clip(total, 0.0, 1.0), 1.0)
+
+
+def acf(values: np.ndarray, lengths: np.ndarray, nlags: int) -> np.ndarray:
+    """
+    Sample autocorrelations of the rows of a zero-padded (series, time) array.
+
+    Args:
+        values: Demeaned series, each followed by zeros up to the common width
+        lengths: Number of observations of each series
+        nlags: Highest lag
+
+    Returns:
+        (series, nlags + 1) autocorrelations, lag 0 first
+    """
+    size = 1 << int(2 * values.shape[1] - 1).bit_length()
+    spectrum = np.fft.rfft(values, n=size, axis=1)
+    autocov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=1)[:, :nlags + 1] / lengths[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return autocov / autocov[:, :1]
+
+
+def pacf(correlations: np.ndarray) -> np.ndarray:
+    """Partial autocorrelations (series, nlags + 1) from autocorrelations by Durbin-Levinson."""
+    series, width = correlations.shape
+    partial = np.ones((series, width))
+    phi = np.zeros((series, width))
+    variance = np.ones(series)
+    for k in range(1, width):
+        previous = phi[:, 1:k]
+        reflection = (correlations[:, k] - np.einsum('sj,sj->s', previous, correlations[:, k - 1:0:-1])) / variance
+        phi[:, 1:k] = previous - reflection[:, None] * previous[:, ::-1]
+        phi[:, k] = reflection
+        variance = variance * (1 - reflection * reflection)
+        partial[:, k] = reflection
+    return partial
+
+
+def ljung_box(correlations: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Ljung-Box Q and p-value at every lag 1..nlags, each (series, nlags)."""
+    nlags = correlations.shape[1] - 1
+    lags = np.arange(1, nlags + 1)
+    n = lengths[:, None].astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q = n * (n + 2) * np.cumsum(correlations[:, 1:] ** 2 / (n - lags), axis=1)
+    return {'q': q, 'p': chi2_sf(np.nan_to_num(q), np.broadcast_to(lags, q.shape))}
+
+
+def compute(series: Dict[str, Dict[str, Sequence[Any]]], max_lags: int = DEFAULT_MAX_LAGS) -> Dict[str, Any]:
+    """
+    ACF, PACF and Ljung-Box statistics of every series in one batch.
+
+    Args:
+        series: Group (e.g. 'arima') -> symbol -> values (None/NaN for missing;
+            missing values are dropped)
+        max_lags: Highest lag; a series of n observations gets at most n // 2
+
+    Returns:
+        Group -> symbol -> {'observations', 'bound' (the 95% band of a white
+        noise ACF), 'lags', 'acf', 'pacf', 'ljung_box_q', 'ljung_box_p'}
+    """
+    keys, columns = [], []
+    for group, by_symbol in series.items():
+        for symbol, values in by_symbol.items():
+            column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            column = column[~np.isnan(column)]
+            if len(column) >= 4:
+                keys.append((group, symbol))
+                columns.append(column)
+    results: Dict[str, Any] = {group: {} for group in series}
+    if not columns:
+        return results
+
+    lengths = np.array([len(column) for column in columns])
+    values = np.zeros((len(columns), lengths.max()))
+    for i, column in enumerate(columns):
+        values[i, :len(column)] = column - column.mean()
+    nlags = int(min(max_lags, lengths.max() // 2))
+    correlations = acf(values, lengths, nlags)
+    partial = pacf(np.nan_to_num(correlations))
+    tests = ljung_box(correlations, lengths)
+
+    for i, (group, symbol) in enumerate(keys):
+        lags = int(min(nlags, lengths[i] // 2))
+        results[group][symbol] = {
+            'observations': int(lengths[i]),
+            'bound': 1.959964 / math.sqrt(lengths[i]),
+            'lags': list(range(1, lags + 1)),
+            'acf': correlations[i, 1:lags + 1].tolist(),
+            'pacf': partial[i, 1:lags + 1].tolist(),
+            'ljung_box_q': tests['q'][i, :lags].tolist(),
+            'ljung_box_p': tests['p'][i, :lags].tolist(),
+        }
+    return results
+
+
+def ljung_box_summary(diagnostics: Dict[str, Any]) -> Dict[str, Any]:
+    """Group -> symbol -> [{'lag', 'q', 'p'}] at LJUNG_BOX_REPORT_LAGS and the last lag, for the templates."""
+    summary: Dict[str, Any] = {}
+    for group, by_symbol in diagnostics.items():
+        summary[group] = {}
+        for symbol, result in by_symbol.items():
+            lags = result['lags']
+            report = sorted({lag for lag in LJUNG_BOX_REPORT_LAGS if lag in lags} | set(lags[-1:]))
+            summary[group][symbol] = [{'lag': lag, 'q': result['ljung_box_q'][lag - 1],
+                                       'p': result['ljung_box_p'][lag - 1]} for lag in report]
+    return summary
+
+
+def cached(result_hash: str, series: Dict[str, Dict[str, Sequence[Any]]]) -> Dict[str, Any]:
+    """compute(), cached per result under the hash of the raw results."""
+    key = f'residual_diagnostics:v{DIAGNOSTICS_CACHE_VERSION}:{result_hash}'
+    diagnostics = cache.get(key)
+    if diagnostics is None:
+        diagnostics = compute(series)
+        cache.set(key, diagnostics)
+    return diagnostics
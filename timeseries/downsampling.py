@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/downsampling.py
+
+"""
+Downsampling of long time series for plotting.
+Implements Largest-Triangle-Three-Buckets (LTTB) over columnar arrays, so that
+every symbol sharing a timestamp axis is reduced in one pass.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .trading_calendar import to_datetime64
+
+logger = logging.getLogger(__name__)
+
+# Used when settings.PLOT_MAX_POINTS_PER_TRACE is not configured
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select the indices of the points kept by LTTB.
+
+    Args:
+        x: Monotonic x values, shape (n,)
+        y: Values, shape (n,) or (k, n) for k series sharing the x axis.
+            All values must be finite.
+        threshold: Number of points to keep per series
+
+    Returns:
+        Sorted indices into x, shape (threshold,) or (k, threshold)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    single = y.ndim == 1
+    y2 = np.atleast_2d(y)
+    k, n = y2.shape
+
+    if threshold >= n or threshold < 3:
+        indices = np.broadcast_to(np.arange(n), (k, n)).copy()
+        return indices[0] if single else indices
+
+    # Shift x to keep the triangle areas well-conditioned for epoch timestamps
+    x = x - x[0]
+
+    # The first and last points are always kept; the n - 2 points in between
+    # are split into threshold - 2 buckets of (almost) equal size.
+    n_buckets = threshold - 2
+    every = (n - 2) / n_buckets
+    edges = (np.arange(n_buckets + 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+
+    # Bucket averages from prefix sums, for all series at once
+    csum_x = np.concatenate(([0.0], np.cumsum(x)))
+    csum_y = np.concatenate((np.zeros((k, 1)), np.cumsum(y2, axis=1)), axis=1)
+    counts = np.diff(edges)
+    avg_x = (csum_x[edges[1:]] - csum_x[edges[:-1]]) / counts
+    avg_y = (csum_y[:, edges[1:]] - csum_y[:, edges[:-1]]) / counts
+
+    # Each bucket is scored against the average of the next one; the last
+    # bucket is scored against the final point.
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.concatenate((avg_y[:, 1:], y2[:, -1:]), axis=1)
+
+    indices = np.empty((k, threshold), dtype=np.int64)
+    indices[:, 0] = 0
+    indices[:, -1] = n - 1
+    rows = np.arange(k)
+    a = np.zeros(k, dtype=np.int64)
+    for i in range(n_buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax = x[a][:, None]
+        ay = y2[rows, a][:, None]
+        area = np.abs(
+            (ax - next_x[i]) * (y2[:, lo:hi] - ay)
+            - (ax - x[lo:hi][None, :]) * (next_y[:, i:i + 1] - ay)
+        )
+        a = lo + np.argmax(area, axis=1)
+        indices[:, i + 1] = a
+
+    return indices[0] if single else indices
+
+
+def to_epoch(timestamps: Sequence[Any]) -> np.ndarray:
+    """Convert timestamp strings to int64 nanoseconds since the epoch."""
+    return to_datetime64(timestamps).view('int64')
+
+
+def window_bounds(epoch: np.ndarray, start: Optional[str] = None,
+                  end: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Find the slice of a sorted epoch array that falls inside [start, end].
+
+    Returns:
+        (lo, hi) slice bounds; the full range when start/end are not given
+    """
+    lo, hi = 0, len(epoch)
+    if start:
+        lo = int(np.searchsorted(epoch, pd.Timestamp(start).value, side='left'))
+    if end:
+        hi = int(np.searchsorted(epoch, pd.Timestamp(end).value, side='right'))
+    return lo, max(lo, hi)
+
+
+def downsample_columns(timestamps: Sequence[Any], columns: Dict[str, Sequence[Any]],
+                       max_points: int, start: Optional[str] = None,
+                       end: Optional[str] = None) -> List[Tuple[str, List[Any], List[Any]]]:
+    """
+    Reduce columnar series that share a timestamp axis to a point budget.
+
+    Missing values (None) are dropped per series. Series with no missing
+    values in the window are downsampled together in one vectorized pass.
+
+    Args:
+        timestamps: Shared, sorted timestamp axis
+        columns: Series name -> values aligned with timestamps
+        max_points: Maximum number of points kept per series
+        start: Optional inclusive lower bound of the visible window
+        end: Optional inclusive upper bound of the visible window
+
+    Returns:
+        List of (name, x values, y values), in the order of columns
+    """
+    if not timestamps:
+        return [(name, [], []) for name in columns]
+
+    if start or end:
+        epoch = to_epoch(timestamps)
+        lo, hi = window_bounds(epoch, start, end)
+    else:
+        epoch = None
+        lo, hi = 0, len(timestamps)
+    n = hi - lo
+
+    names = list(columns)
+    values = np.full((len(names), n), np.nan)
+    for row, name in enumerate(names):
+        column = columns[name][lo:hi]
+        values[row, :len(column)] = [np.nan if v is None else v for v in column]
+    finite = np.isfinite(values)
+
+    def pick(name: str, positions: np.ndarray) -> Tuple[str, List[Any], List[Any]]:
+        column = columns[name]
+        return (name, [timestamps[lo + p] for p in positions], [column[lo + p] for p in positions])
+
+    if n <= max_points:
+        return [pick(name, np.flatnonzero(finite[row])) for row, name in enumerate(names)]
+
+    if epoch is None:
+        epoch = to_epoch(timestamps)
+    x = epoch[lo:hi]
+
+    series: Dict[str, Tuple[str, List[Any], List[Any]]] = {}
+    complete = finite.all(axis=1)
+    if complete.any():
+        batch = lttb_indices(x, values[complete], max_points)
+        for positions, row in zip(batch, np.flatnonzero(complete)):
+            series[names[row]] = pick(names[row], positions)
+    for row in np.flatnonzero(~complete):
+        kept = np.flatnonzero(finite[row])
+        positions = kept[lttb_indices(x[kept], values[row, kept], max_points)]
+        series[names[row]] = pick(names[row], positions)
+
+    logger.debug(f"Downsampled {len(names)} series from {n} to at most {max_points} points")
+    return [series[name] for name in names]
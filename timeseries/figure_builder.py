@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/figure_builder.py
+
+"""
+Lightweight figure-spec builder for Plotly.js.
+Emits plain dicts and lists in the JSON shape Plotly.js expects, skipping the
+property validation and template resolution done by plotly.graph_objects.
+"""
+
+import base64
+import json
+import logging
+from contextlib import contextmanager
+from numbers import Real
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import plotly.colors
+import plotly.io as pio
+import plotly.utils
+from django.conf import settings
+
+from .downsampling import to_epoch
+
+logger = logging.getLogger(__name__)
+
+
+def _to_plain(obj: Any) -> Any:
+    """Round-trip a plotly object through JSON to get plain Python types."""
+    return json.loads(json.dumps(obj, cls=plotly.utils.PlotlyJSONEncoder))
+
+
+# Shared layout defaults, resolved once at import instead of once per figure
+PLOTLY_WHITE_TEMPLATE = _to_plain(pio.templates['plotly_white'].to_plotly_json())
+COLOR_PALETTE = list(plotly.colors.qualitative.Set2)
+HORIZONTAL_LEGEND = {
+    'orientation': 'h',
+    'yanchor': 'bottom',
+    'y': 1.02,
+    'xanchor': 'right',
+    'x': 1,
+}
+# Fill of forecast confidence bands
+CONFIDENCE_BAND_FILL = 'rgba(100,100,200,0.15)'
+
+# Default of arguments that fall back to a setting, where None has its own meaning
+_DEFAULT: Any = object()
+
+_COLORSCALE_CACHE: Dict[str, List[List[Any]]] = {}
+
+
+def colorscale(name: str) -> List[List[Any]]:
+    """
+    Resolve a named Plotly colorscale (e.g. 'RdBu', 'RdYlBu_r') to its explicit stops.
+
+    Plotly.js has no '_r' names, so the stops are resolved server-side once per
+    name using the same validator graph_objects uses.
+    """
+    if name not in _COLORSCALE_CACHE:
+        import plotly.graph_objects as go
+        _COLORSCALE_CACHE[name] = _to_plain(go.Heatmap(colorscale=name).colorscale)
+    return _COLORSCALE_CACHE[name]
+
+
+def palette_color(i: int) -> str:
+    """Return the i-th series color, cycling through the shared palette."""
+    return COLOR_PALETTE[i % len(COLOR_PALETTE)]
+
+
+def rgba(hex_color: str, alpha: float) -> str:
+    """Convert a hex color to an rgba() string, falling back to gray."""
+    try:
+        r, g, b = plotly.colors.hex_to_rgb(hex_color)
+        return f'rgba({r}, {g}, {b}, {alpha})'
+    except Exception:
+        return f'rgba(128, 128, 128, {alpha})'  # fallback color
+
+
+def _compact(d: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset (None) properties so they don't appear in the JSON."""
+    return {k: v for k, v in d.items() if v is not None}
+
+
+def line_trace(x: Sequence, y: Sequence, name: str, color: Optional[str] = None,
+               width: Optional[float] = None, dash: Optional[str] = None,
+               mode: str = 'lines', hovertemplate: Optional[str] = None,
+               showlegend: Optional[bool] = None, marker_size: Optional[float] = None,
+               **extra: Any) -> Dict[str, Any]:
+    """Build a scatter trace drawn as a line."""
+    line = _compact({'color': color, 'width': width, 'dash': dash})
+    trace = _compact({
+        'x': x,
+        'y': y,
+        'mode': mode,
+        'name': name,
+        'line': line or None,
+        'marker': {'size': marker_size} if marker_size is not None else None,
+        'showlegend': showlegend,
+        'hovertemplate': hovertemplate,
+        'type': 'scatter',
+    })
+    trace.update(extra)
+    return trace
+
+
+def band_trace(x: Sequence, upper: Sequence, lower: Sequence, name: str,
+               fillcolor: str, showlegend: Optional[bool] = None,
+               hoverinfo: Optional[str] = None) -> Dict[str, Any]:
+    """Build a filled confidence band from upper and lower bounds."""
+    x = list(x)
+    return _compact({
+        'x': x + x[::-1],
+        'y': list(upper) + list(lower)[::-1],
+        'fill': 'toself',
+        'fillcolor': fillcolor,
+        'line': {'color': 'rgba(255,255,255,0)'},
+        'hoverinfo': hoverinfo,
+        'name': name,
+        'showlegend': showlegend,
+        'type': 'scatter',
+    })
+
+
+def bar_trace(x: Sequence, y: Sequence, name: str, marker_color: Any = None,
+              hovertemplate: Optional[str] = None) -> Dict[str, Any]:
+    """Build a bar trace."""
+    return _compact({
+        'x': x,
+        'y': y,
+        'name': name,
+        'marker': {'color': marker_color} if marker_color is not None else None,
+        'hovertemplate': hovertemplate,
+        'type': 'bar',
+    })
+
+
+def heatmap_trace(z: Any, x: Sequence, y: Sequence, colorscale_name: str,
+                  colorbar_title: Optional[str] = None,
+                  hovertemplate: Optional[str] = None,
+                  zmid: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+    """Build a heatmap trace with a resolved colorscale."""
+    trace = _compact({
+        'z': z,
+        'x': x,
+        'y': y,
+        'colorscale': colorscale(colorscale_name),
+        'zmid': zmid,
+        'showscale': True,
+        'colorbar': {'title': {'text': colorbar_title}} if colorbar_title else None,
+        'hovertemplate': hovertemplate,
+        'type': 'heatmap',
+    })
+    trace.update(extra)
+    return trace
+
+
+def hline_shape(y: float, color: str, dash: Optional[str] = None,
+                opacity: Optional[float] = None, axis: str = '') -> Dict[str, Any]:
+    """Build a horizontal reference line spanning the full x domain."""
+    return _compact({
+        'line': _compact({'color': color, 'dash': dash}),
+        'opacity': opacity,
+        'type': 'line',
+        'x0': 0,
+        'x1': 1,
+        'xref': f'x{axis} domain',
+        'y0': y,
+        'y1': y,
+        'yref': f'y{axis}',
+    })
+
+
+def hline_annotation(y: float, text: str, axis: str = '') -> Dict[str, Any]:
+    """Build the label that accompanies a horizontal reference line."""
+    return {
+        'showarrow': False,
+        'text': text,
+        'x': 1,
+        'xanchor': 'right',
+        'xref': f'x{axis} domain',
+        'y': y,
+        'yanchor': 'bottom',
+        'yref': f'y{axis}',
+    }
+
+
+def title(text: str, size: int = 20) -> Dict[str, Any]:
+    """Build a centered figure title."""
+    return {'text': text, 'x': 0.5, 'font': {'size': size}}
+
+
+def margin(l: int = 50, r: int = 50, t: int = 80, b: int = 50) -> Dict[str, int]:
+    """Build a layout margin dict."""
+    return {'l': l, 'r': r, 't': t, 'b': b}
+
+
+def layout(title_text: str, height: int, title_size: int = 20,
+           layout_margin: Optional[Dict[str, int]] = None,
+           xaxis_title: Optional[str] = None, yaxis_title: Optional[str] = None,
+           **extra: Any) -> Dict[str, Any]:
+    """
+    Build a figure layout on top of the precomputed plotly_white template.
+
+    Extra keyword arguments are copied verbatim into the layout.
+    """
+    result: Dict[str, Any] = {
+        'template': PLOTLY_WHITE_TEMPLATE,
+        'title': title(title_text, title_size),
+        'height': height,
+        'margin': layout_margin or margin(),
+    }
+    if xaxis_title is not None:
+        result['xaxis'] = {'title': {'text': xaxis_title}}
+    if yaxis_title is not None:
+        result['yaxis'] = {'title': {'text': yaxis_title}}
+    for key, value in extra.items():
+        if key in ('xaxis', 'yaxis') and key in result:
+            result[key] = {**result[key], **value}
+        else:
+            result[key] = value
+    return result
+
+
+def subplot_grid(rows: int, cols: int, subplot_titles: Sequence[str],
+                 vertical_spacing: Optional[float] = None,
+                 horizontal_spacing: Optional[float] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compute axis domains and subplot title annotations for a rows x cols grid.
+
+    Mirrors the geometry of plotly.subplots.make_subplots (top-down rows).
+
+    Returns:
+        Tuple of (layout fragment, list of axis suffixes in row-major order)
+    """
+    if rows < 1 or cols < 1:
+        raise ValueError("Subplot grid needs at least one row and one column.")
+    if horizontal_spacing is None:
+        horizontal_spacing = 0.2 / cols
+    if vertical_spacing is None:
+        vertical_spacing = 0.3 / rows
+
+    widths = [(1.0 - horizontal_spacing * (cols - 1)) / cols] * cols
+    heights = [(1.0 - vertical_spacing * (rows - 1)) / rows] * rows
+
+    fragment: Dict[str, Any] = {}
+    annotations = []
+    suffixes = []
+    for r in range(rows):
+        # Row 0 is drawn at the top of the figure
+        grid_row = rows - 1 - r
+        y_start = sum(heights[:grid_row]) + grid_row * vertical_spacing
+        y_domain = [max(0.0, y_start), min(1.0, y_start + heights[-1 - r])]
+        for c in range(cols):
+            x_start = sum(widths[:c]) + c * horizontal_spacing
+            x_domain = [max(0.0, x_start), min(1.0, x_start + widths[c])]
+
+            n = r * cols + c + 1
+            suffix = '' if n == 1 else str(n)
+            suffixes.append(suffix)
+            fragment[f'xaxis{suffix}'] = {'anchor': f'y{suffix}', 'domain': x_domain}
+            fragment[f'yaxis{suffix}'] = {'anchor': f'x{suffix}', 'domain': y_domain}
+
+            if n <= len(subplot_titles) and subplot_titles[n - 1]:
+                annotations.append({
+                    'font': {'size': 16},
+                    'showarrow': False,
+                    'text': subplot_titles[n - 1],
+                    'x': sum(x_domain) / 2.0,
+                    'xanchor': 'center',
+                    'xref': 'paper',
+                    'y': y_domain[1],
+                    'yanchor': 'bottom',
+                    'yref': 'paper',
+                })
+    fragment['annotations'] = annotations
+    return fragment, suffixes
+
+
+def on_axes(trace: Dict[str, Any], suffix: str) -> Dict[str, Any]:
+    """Attach a trace to the subplot identified by an axis suffix."""
+    trace['xaxis'] = f'x{suffix}'
+    trace['yaxis'] = f'y{suffix}'
+    return trace
+
+
+def figure(data: List[Dict[str, Any]], fig_layout: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble traces and layout into a figure dict."""
+    return {'data': data, 'layout': fig_layout}
+
+
+def series_figure(series: Iterable[Tuple[str, Sequence, Sequence]], title_text: str,
+                  yaxis_title: str, value_label: str, value_format: str = '.4f',
+                  xaxis_title: str = 'Date', height: int = 500, title_size: int = 20,
+                  line_width: float = 1.5, zero_line: bool = False,
+                  layout_margin: Optional[Dict[str, int]] = None,
+                  **layout_extra: Any) -> Dict[str, Any]:
+    """
+    Build a multi-symbol line chart, one colored trace per (name, x, y) series.
+
+    Args:
+        series: Iterable of (symbol, x values, y values); the index in the
+            iterable selects the palette color
+        title_text: Figure title
+        yaxis_title: Y axis label
+        value_label: Label used for the value in the hover template
+        value_format: d3 format for the value in the hover template
+        zero_line: Draw a dashed horizontal line at y=0
+
+    Returns:
+        Figure dict ready for serialization
+    """
+    data = []
+    for i, (name, x, y) in enumerate(series):
+        if not len(x) or not len(y):
+            continue
+        data.append(line_trace(
+            x, y, name,
+            color=palette_color(i),
+            width=line_width,
+            hovertemplate=f'<b>{name}</b><br>' +
+                          'Date: %{x}<br>' +
+                          f'{value_label}: %{{y:{value_format}}}<br>' +
+                          '<extra></extra>',
+        ))
+
+    fig_layout = layout(
+        title_text, height, title_size=title_size, layout_margin=layout_margin,
+        xaxis_title=xaxis_title, yaxis_title=yaxis_title,
+        hovermode='x unified', showlegend=True, legend=HORIZONTAL_LEGEND,
+        **layout_extra,
+    )
+    if zero_line:
+        fig_layout['shapes'] = [hline_shape(0, 'gray', dash='dash', opacity=0.5)]
+    return figure(data, fig_layout)
+
+
+# Trace types with a WebGL counterpart that keeps their styling and hover templates
+WEBGL_TRACE_TYPES = {'scatter': 'scattergl'}
+# Default point count above which a figure's scatter traces are drawn with WebGL
+DEFAULT_WEBGL_THRESHOLD = 20000
+
+
+def default_webgl_threshold() -> Optional[int]:
+    """
+    Return the configured WebGL point threshold (settings.PLOT_WEBGL_POINT_THRESHOLD).
+
+    0 or a negative value keeps every figure on SVG traces.
+    """
+    threshold = getattr(settings, 'PLOT_WEBGL_POINT_THRESHOLD', DEFAULT_WEBGL_THRESHOLD)
+    return threshold if threshold and threshold > 0 else None
+
+
+def scatter_points(fig: Dict[str, Any]) -> int:
+    """Total number of points in a figure's scatter traces."""
+    total = 0
+    for trace in fig.get('data', []):
+        if trace.get('type', 'scatter') in WEBGL_TRACE_TYPES:
+            values = trace.get('y') if trace.get('y') is not None else trace.get('x')
+            total += len(values) if values is not None else 0
+    return total
+
+
+def use_webgl(fig: Dict[str, Any], threshold: Optional[int] = _DEFAULT) -> Dict[str, Any]:
+    """
+    Draw a figure's scatter traces with scattergl when it has more than threshold points.
+
+    All other trace properties are kept. Spline-shaped lines, which scattergl
+    cannot draw, stay on SVG.
+
+    Args:
+        fig: Figure dict (traces still carrying their x/y data)
+        threshold: Point threshold; defaults to settings.PLOT_WEBGL_POINT_THRESHOLD,
+            None never switches
+
+    Returns:
+        fig itself when nothing changes, otherwise a copy with switched traces
+    """
+    if threshold is _DEFAULT:
+        threshold = default_webgl_threshold()
+    if threshold is None or scatter_points(fig) <= threshold:
+        return fig
+    data = []
+    for trace in fig['data']:
+        trace_type = trace.get('type', 'scatter')
+        if trace_type in WEBGL_TRACE_TYPES and (trace.get('line') or {}).get('shape') != 'spline':
+            trace = {**trace, 'type': WEBGL_TRACE_TYPES[trace_type]}
+        data.append(trace)
+    return {**fig, 'data': data}
+
+
+# Plotly.js typed-array dtypes offered for numeric trace data
+TYPED_ARRAY_DTYPES = ('f8', 'f4')
+TYPED_ARRAY_KEYS = ('x', 'y', 'z')
+# Typed-array dtype of the axis positions of PlotDataset columns
+INDEX_DTYPE = 'i4'
+
+
+def default_array_dtype() -> Optional[str]:
+    """
+    Return the configured typed-array dtype (settings.PLOT_ARRAY_DTYPE).
+
+    'f8' keeps full precision, 'f4' halves the payload; any other value
+    (e.g. 'text') turns typed arrays off and writes numbers as decimal text.
+    """
+    dtype = getattr(settings, 'PLOT_ARRAY_DTYPE', 'f8')
+    return dtype if dtype in TYPED_ARRAY_DTYPES else None
+
+
+def _is_number(value: Any) -> bool:
+    return value is None or (isinstance(value, Real) and not isinstance(value, bool))
+
+
+def _numeric_array(values: Any) -> Optional[np.ndarray]:
+    """Return values as a float64 array if they are a 1D or 2D numeric array, else None."""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False) if values.dtype.kind in 'fiu' else None
+    if not isinstance(values, (list, tuple)) or not values:
+        return None
+    if isinstance(values[0], (list, tuple)):
+        width = len(values[0])
+        if not all(isinstance(row, (list, tuple)) and len(row) == width and all(map(_is_number, row))
+                   for row in values):
+            return None
+    elif not all(map(_is_number, values)):
+        return None
+    # None becomes NaN, which Plotly.js draws as a gap like a null
+    return np.array(values, dtype=np.float64)
+
+
+def typed_array(values: Any, dtype: str = 'f8') -> Optional[Dict[str, str]]:
+    """
+    Encode numeric values in Plotly.js's typed-array format.
+
+    Args:
+        values: List, nested list (2D) or NumPy array of numbers
+        dtype: 'f8' (float64), 'f4' (float32) or 'i4' (int32)
+
+    Returns:
+        {'dtype', 'bdata'[, 'shape']} dict, or None if values are not numeric
+    """
+    array = _numeric_array(values)
+    if array is None or array.ndim > 2:
+        return None
+    buffer = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder('<'))
+    encoded = {'dtype': dtype, 'bdata': base64.b64encode(buffer.tobytes()).decode('ascii')}
+    if array.ndim == 2:
+        encoded['shape'] = f'{array.shape[0]}, {array.shape[1]}'
+    return encoded
+
+
+def encode_arrays(fig: Dict[str, Any], dtype: Optional[str]) -> Dict[str, Any]:
+    """Return a copy of the figure with numeric x/y/z trace data as typed arrays."""
+    if dtype is None:
+        return fig
+    data = []
+    for trace in fig.get('data', []):
+        trace = dict(trace)
+        for key in TYPED_ARRAY_KEYS:
+            if key in trace:
+                encoded = typed_array(trace[key], dtype)
+                if encoded is not None:
+                    trace[key] = encoded
+        data.append(trace)
+    return {**fig, 'data': data}
+
+
+class PlotDataset:
+    """
+    Columnar series shared by several figures, shipped to the browser once.
+
+    Figures reference a column by (data_type, symbol) instead of embedding
+    its points; static/js/main.js (TimeseriesPlots.buildFigure) resolves the
+    references against a single shared timestamp axis. Each column holds
+    only its own points, with their positions on the axis when it does not
+    cover the whole axis (downsampled series keep different timestamps).
+    """
+
+    def __init__(self):
+        self._columns: Dict[Tuple[str, str], Tuple[Sequence, Sequence]] = {}
+        self._recordings: List[list] = []
+
+    def add(self, data_type: str, symbol: str, x: Sequence, y: Sequence) -> List[str]:
+        """Register the points of one series and return the reference used by trace specs."""
+        self._columns[(data_type, symbol)] = (x, y)
+        for recording in self._recordings:
+            recording.append((data_type, symbol, x, y))
+        return [data_type, symbol]
+
+    @contextmanager
+    def record(self):
+        """Collect the columns added inside the block, e.g. to cache them with a figure."""
+        added: list = []
+        self._recordings.append(added)
+        try:
+            yield added
+        finally:
+            self._recordings.remove(added)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._columns
+
+    def axis(self) -> List[Any]:
+        """Sorted union of the x values of every column."""
+        timestamps = list(dict.fromkeys(t for x, _ in self._columns.values() for t in x))
+        try:
+            order = np.argsort(to_epoch(timestamps), kind='stable')
+            return [timestamps[i] for i in order]
+        except (ValueError, TypeError):
+            return sorted(timestamps, key=str)
+
+    def to_dict(self, dtype: Optional[str] = _DEFAULT) -> Dict[str, Any]:
+        """
+        Build the shipped dataset: the shared axis, one array of values per
+        column and, for columns that do not cover the whole axis, the axis
+        positions of their values.
+
+        Missing points (None/NaN) are left out of a column rather than padded.
+
+        Args:
+            dtype: Typed-array dtype of the values ('f8' or 'f4'), None for
+                plain lists; defaults to settings.PLOT_ARRAY_DTYPE
+        """
+        if dtype is _DEFAULT:
+            dtype = default_array_dtype()
+        axis = self.axis()
+        position = {t: i for i, t in enumerate(axis)}
+        columns: Dict[str, Dict[str, Any]] = {}
+        indices: Dict[str, Dict[str, Any]] = {}
+        for (data_type, symbol), (x, y) in self._columns.items():
+            values = np.array(y, dtype=np.float64)
+            index = np.array([position[t] for t in x], dtype=np.int64)
+            present = ~np.isnan(values)
+            values, index = values[present], index[present]
+            columns.setdefault(data_type, {})[symbol] = values.tolist() if dtype is None else typed_array(values, dtype)
+            if not np.array_equal(index, np.arange(len(axis))):
+                indices.setdefault(data_type, {})[symbol] = (index.tolist() if dtype is None
+                                                             else typed_array(index, INDEX_DTYPE))
+        return {'timestamps': axis, 'columns': columns, 'indices': indices, 'template': PLOTLY_WHITE_TEMPLATE}
+
+    def to_json(self, dtype: Optional[str] = _DEFAULT) -> str:
+        """Serialize the dataset for embedding in a template."""
+        return json.dumps(self.to_dict(dtype), default=_json_default)
+
+
+def figure_spec(fig: Dict[str, Any], sources: Sequence[Optional[List[str]]]) -> Dict[str, Any]:
+    """
+    Turn a figure into a declarative spec that references a PlotDataset.
+
+    Args:
+        fig: Figure dict built with the functions above
+        sources: One PlotDataset reference per trace in fig['data'], or None
+            for traces that keep their own (small) x/y data
+
+    Returns:
+        Figure dict without the shared template, with x/y replaced by 'source'
+        (and scatter traces switched to WebGL above the point threshold)
+    """
+    fig = use_webgl(fig)
+    data = []
+    for trace, source in zip(fig['data'], sources):
+        if source is not None:
+            trace = {k: v for k, v in trace.items() if k not in ('x', 'y')}
+            trace['source'] = source
+        data.append(trace)
+    fig_layout = {k: v for k, v in fig['layout'].items() if k != 'template'}
+    return figure(data, fig_layout)
+
+
+def _decode_column(column: Any, dtype: Any = np.float64) -> np.ndarray:
+    if isinstance(column, dict):
+        return np.frombuffer(base64.b64decode(column['bdata']), dtype=np.dtype(column['dtype']).newbyteorder('<'))
+    return np.array([np.nan if v is None else v for v in column], dtype=dtype)
+
+
+def assemble_figure(spec: Dict[str, Any], dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve a figure spec against a shipped dataset into a full figure.
+
+    Python counterpart of TimeseriesPlots.buildFigure in static/js/main.js.
+    """
+    axis = dataset['timestamps']
+    data = []
+    for trace in spec['data']:
+        if 'source' in trace:
+            data_type, symbol = trace['source']
+            values = _decode_column(dataset['columns'][data_type][symbol])
+            index = dataset.get('indices', {}).get(data_type, {}).get(symbol)
+            positions = np.arange(len(values)) if index is None else _decode_column(index, np.int64)
+            kept = ~np.isnan(values)
+            trace = {k: v for k, v in trace.items() if k != 'source'}
+            trace['x'] = [axis[i] for i in positions[kept]]
+            trace['y'] = values[kept].astype(np.float64).tolist()
+        data.append(trace)
+    return figure(data, {'template': dataset['template'], **spec['layout']})
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback for NumPy values that may appear in figure specs."""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            return np.where(np.isfinite(obj), obj, None).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def to_json(fig: Dict[str, Any], dtype: Optional[str] = _DEFAULT, webgl_threshold: Optional[int] = _DEFAULT) -> str:
+    """
+    Serialize a figure dict for embedding in a template.
+
+    Args:
+        fig: Figure dict
+        dtype: Typed-array dtype for numeric trace data ('f8' or 'f4'), None
+            for plain decimal text; defaults to settings.PLOT_ARRAY_DTYPE
+        webgl_threshold: Point count above which scatter traces become
+            scattergl (see use_webgl); defaults to settings.PLOT_WEBGL_POINT_THRESHOLD
+    """
+    if dtype is _DEFAULT:
+        dtype = default_array_dtype()
+    return json.dumps(encode_arrays(use_webgl(fig, webgl_threshold), dtype), default=_json_default)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/garch_forecast.py
+
+"""
+Local GARCH volatility forecasts to any horizon from the fitted parameters.
+The backend returns a few steps of each symbol's volatility forecast and the
+arch model summary, whose parameter tables give omega, alpha[1], beta[1]
+(gamma[1] for GJR models) and the distribution's shape parameters. For a
+GARCH(1,1)-type model the h-step variance forecast has the closed form
+
+    sigma2[h] = phi^(h-1) * sigma2[1] + omega * (1 - phi^(h-1)) / (1 - phi)
+
+with persistence phi = alpha + beta + gamma * P(shock < 0), anchored on the
+backend's one-step forecast. Innovations are standardized, so the
+distribution only enters through P(shock < 0), which is 1/2 for the
+symmetric ones; every symbol is forecast at once as one (symbol, step)
+array.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# Initial horizon of the volatility forecast plot and the slider maximum
+DEFAULT_STEPS = 20
+DEFAULT_MAX_STEPS = 250
+
+# Largest relative difference from the backend's forecasts that still counts as
+# a match; the summary tables print the parameters to 4-5 significant digits
+CROSS_CHECK_TOLERANCE = 1e-3
+
+# Distributions whose standardized shocks are negative half the time
+SYMMETRIC_DISTRIBUTIONS = ('Normal', "Standardized Student's t", 'Generalized Error Distribution')
+
+_SECTION = re.compile(r'^\s*(Mean Model|Volatility Model|Distribution)\s*$')
+_COEFFICIENT = re.compile(r'^(\w+(?:\[\d+\])?)\s+(-?\d[\d.]*(?:e[-+]?\d+)?)\s')
+_HEADER = re.compile(r'^(Vol Model|Distribution|Mean Model):\s+(.+?)(?:\s{2,}|$)')
+
+
+@dataclass(slots=True)
+class GarchModel:
+    """The fitted volatility parameters of one symbol."""
+    symbol: str
+    omega: float
+    alpha: float
+    beta: float
+    gamma: float = 0.0
+    distribution: str = 'Normal'
+    shape: Dict[str, float] = field(default_factory=dict)
+    first_variance: float = 0.0
+
+    @property
+    def persistence(self) -> float:
+        return self.alpha + self.beta + 0.5 * self.gamma
+
+
+def parse_summary(text: Optional[str]) -> Dict[str, Any]:
+    """
+    Parameters of an arch model summary.
+
+    Returns:
+        {'mean_model', 'vol_model', 'distribution', 'mean': {...},
+        'volatility': {...}, 'shape': {...}}, coefficients by name (e.g. 'alpha[1]')
+    """
+    parsed = {'mean_model': None, 'vol_model': None, 'distribution': None,
+              'mean': {}, 'volatility': {}, 'shape': {}}
+    headers = {'Mean Model': 'mean_model', 'Vol Model': 'vol_model', 'Distribution': 'distribution'}
+    tables = {'Mean Model': 'mean', 'Volatility Model': 'volatility', 'Distribution': 'shape'}
+    table = None
+    for line in (text or '').splitlines():
+        header = _HEADER.match(line)
+        if header:
+            parsed[headers[header.group(1)]] = header.group(2).strip()
+            continue
+        section = _SECTION.match(line)
+        if section:
+            table = tables[section.group(1)]
+            continue
+        coefficient = _COEFFICIENT.match(line)
+        if table and coefficient:
+            parsed[table][coefficient.group(1)] = float(coefficient.group(2))
+    return parsed
+
+
+def model_from(symbol: str, result: Any) -> Optional[GarchModel]:
+    """
+    Build the model of one result_model.GarchResult.
+
+    Returns:
+        None without a one-step forecast, for models with more than one lag
+        of a term, and for asymmetric models under a skewed distribution
+    """
+    parsed = parse_summary(result.summary if isinstance(result.summary, str) else None)
+    volatility = parsed['volatility']
+    if not result.forecast or not {'omega', 'alpha[1]', 'beta[1]'} <= set(volatility):
+        return None
+    if any(name.endswith('[2]') for name in volatility):
+        logger.info(f"Skipping the local volatility forecast of {symbol}: only one lag per term is supported")
+        return None
+    distribution = parsed['distribution'] or 'Normal'
+    gamma = volatility.get('gamma[1]', 0.0)
+    if gamma and distribution not in SYMMETRIC_DISTRIBUTIONS:
+        logger.info(f"Skipping the local volatility forecast of {symbol}: asymmetric model under {distribution}")
+        return None
+    return GarchModel(
+        symbol=symbol,
+        omega=volatility['omega'],
+        alpha=volatility['alpha[1]'],
+        beta=volatility['beta[1]'],
+        gamma=gamma,
+        distribution=distribution,
+        shape=parsed['shape'],
+        first_variance=float(result.forecast[0]) ** 2,
+    )
+
+
+def variance_forecast(models: Sequence[GarchModel], steps: int) -> np.ndarray:
+    """Closed-form variance forecasts, shape (symbol, step), of every model at once."""
+    omega = np.array([model.omega for model in models])[:, None]
+    phi = np.array([model.persistence for model in models])[:, None]
+    first = np.array([model.first_variance for model in models])[:, None]
+    lags = np.arange(steps)[None, :]
+    decay = phi ** lags
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Geometric sum 1 + phi + ... + phi^(h-2); h - 1 for an integrated model
+        accumulated = np.where(np.isclose(phi, 1.0), lags, (1.0 - decay) / (1.0 - phi))
+    return decay * first + omega * accumulated
+
+
+def forecast(models: Sequence[GarchModel], steps: int) -> Dict[str, List[float]]:
+    """Volatility (standard deviation) forecasts, {symbol: values}."""
+    if not models:
+        return {}
+    volatility = np.sqrt(np.maximum(variance_forecast(models, steps), 0.0))
+    return {model.symbol: volatility[s].tolist() for s, model in enumerate(models)}
+
+
+def cross_check(models: Sequence[GarchModel], garch_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compare the local forecasts over the backend's horizon with the backend's.
+
+    Returns:
+        {'max_difference' (relative), 'matches', 'differences': {symbol: ...}},
+        or None when the backend returned fewer than two steps to compare
+    """
+    steps = max((len(garch_results[model.symbol].forecast) for model in models), default=0)
+    if steps < 2:
+        return None
+    differences = {}
+    for symbol, local in forecast(models, steps).items():
+        backend = np.array(garch_results[symbol].forecast, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gaps = np.abs(np.array(local[:len(backend)]) - backend) / np.abs(backend)
+        gaps = gaps[np.isfinite(gaps)]
+        if len(gaps):
+            differences[symbol] = float(gaps.max())
+    if not differences:
+        return None
+    max_difference = max(differences.values())
+    return {'max_difference': max_difference, 'matches': max_difference <= CROSS_CHECK_TOLERANCE,
+            'differences': differences}
+
+
+def models_from(garch_results: Dict[str, Any]) -> List[GarchModel]:
+    """The models of every symbol that has a usable summary."""
+    return [model for model in (model_from(symbol, result) for symbol, result in garch_results.items()) if model]
+
+
+def extend(garch_results: Dict[str, Any], steps: int, last_timestamp: Any = None) -> Dict[str, Any]:
+    """
+    Volatility forecasts of every symbol, steps ahead.
+
+    Returns:
+        {'x': forecast dates continuing last_timestamp on the trading calendar
+        (step numbers without one), 'volatility': {symbol: values}}
+    """
+    try:
+        x = trading_calendar.forecast_axis(last_timestamp, steps)
+    except ValueError:
+        x = list(range(1, steps + 1))
+    return {'x': x, 'volatility': forecast(models_from(garch_results), steps)}
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/logging_utils.py
+
+"""
+Logging building blocks referenced from settings.LOGGING.
+Request threads only put records on an in-memory queue; a background
+QueueListener formats them as JSON and does the (blocking) console and file
+I/O. Debug events are sampled and rate limited before they are queued.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Formats tracebacks before records are queued (see QueueListenerHandler.prepare)
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line, including extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'process': record.process,
+            'thread': record.thread,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        # Records from QueueListenerHandler arrive with the traceback already in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Sample and rate limit DEBUG records; higher levels always pass.
+
+    Each call site (file and line) gets its own token bucket, so one chatty
+    loop cannot crowd out other debug output. The number of records dropped
+    at a call site is reported on its next record that gets through.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_per_second: float = 20.0, burst: int = 50):
+        """
+        Args:
+            sample_rate: Fraction of debug records kept before rate limiting
+            max_per_second: Sustained debug records per second per call site
+            burst: Records a call site may emit at once before being limited
+        """
+        super().__init__()
+        self.sample_rate = float(sample_rate)
+        self.max_per_second = float(max_per_second)
+        self.burst = int(burst)
+        self._buckets: Dict[Tuple[str, int], List[float]] = {}
+        self._dropped: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+
+        site = (record.pathname, record.lineno)
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self._dropped[site] = self._dropped.get(site, 0) + 1
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(site, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.max_per_second)
+            if tokens < 1.0:
+                self._buckets[site] = [tokens, now]
+                self._dropped[site] = self._dropped.get(site, 0) + 1
+                return False
+            self._buckets[site] = [tokens - 1.0, now]
+            dropped = self._dropped.pop(site, 0)
+        if dropped:
+            record.dropped_since_last = dropped
+        return True
+
+
+class QueueListenerHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that owns the QueueListener draining it into real handlers.
+
+    Configured through the '()' factory key so it behaves the same on every
+    Python version; target handlers are given as cfg://handlers.<name>.
+    The listener is restarted in forked children (gunicorn preload_app).
+    """
+
+    def __init__(self, handlers: List[logging.Handler], respect_handler_level: bool = True,
+                 queue_size: int = -1):
+        super().__init__(queue.Queue(queue_size))
+        # Indexing a ConvertingList resolves the cfg:// references
+        self._targets = [handlers[i] for i in range(len(handlers))]
+        self._respect_handler_level = respect_handler_level
+        self._start()
+        atexit.register(self._stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def _start(self) -> None:
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *self._targets, respect_handler_level=self._respect_handler_level)
+        self.listener.start()
+
+    def _stop(self) -> None:
+        listener = getattr(self, 'listener', None)
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+
+    def _restart_in_child(self) -> None:
+        # The listener thread does not survive fork(); records queued but not
+        # yet written belong to the parent and are dropped from the copy.
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copy of the record for the queue, with its message and traceback rendered.
+
+        The base class merges the traceback into msg and clears exc_info, so
+        the JSON output would lose its 'exception' field. Here the message is
+        kept as logged and the traceback goes to exc_text instead.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # Never block a request on logging
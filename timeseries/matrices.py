@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/matrices.py
+
+"""
+N x N matrix assembly for heatmaps and matrix tables.
+Symbol-keyed results (nested {row: {col: value}} dicts or 'A->B' pair keys)
+are scattered into a NumPy array in one step, and table rows with their cell
+styling are precomputed so templates only iterate.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class MatrixCell:
+    value: Optional[float]
+    css: str
+    diagonal: bool
+
+
+@dataclass(slots=True)
+class MatrixRow:
+    symbol: str
+    cells: List[MatrixCell]
+
+
+def _scatter(rows: List[Any], cols: List[Any], values: List[Any], row_labels: Sequence[str],
+             col_labels: Sequence[str], fill: float) -> np.ndarray:
+    row_index = {label: i for i, label in enumerate(row_labels)}
+    col_index = {label: j for j, label in enumerate(col_labels)}
+    i = np.fromiter((row_index.get(label, -1) for label in rows), dtype=np.int64, count=len(rows))
+    j = np.fromiter((col_index.get(label, -1) for label in cols), dtype=np.int64, count=len(cols))
+    v = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    matrix = np.full((len(row_labels), len(col_labels)), fill, dtype=np.float64)
+    known = (i >= 0) & (j >= 0)
+    matrix[i[known], j[known]] = v[known]
+    return matrix
+
+
+def nested_matrix(nested: Dict[str, Dict[str, Any]], rows: Sequence[str],
+                  cols: Optional[Sequence[str]] = None, fill: float = np.nan) -> np.ndarray:
+    """
+    Assemble matrix[i, j] = nested[rows[i]][cols[j]].
+
+    Args:
+        nested: {row label: {column label: value}}
+        rows: Row labels in display order
+        cols: Column labels; defaults to rows
+        fill: Value of cells missing from nested (None values become NaN)
+    """
+    cols = rows if cols is None else cols
+    entries = [(row, col, value) for row, inner in (nested or {}).items()
+               if isinstance(inner, dict) for col, value in inner.items()]
+    if not entries:
+        return np.full((len(rows), len(cols)), fill, dtype=np.float64)
+    row_keys, col_keys, values = zip(*entries)
+    return _scatter(list(row_keys), list(col_keys), list(values), rows, cols, fill)
+
+
+def pair_matrix(pairs: Dict[str, Any], symbols: Sequence[str], separator: str = '->',
+                fill: float = np.nan) -> np.ndarray:
+    """
+    Assemble matrix[i, j] from pair-keyed values such as {'MSFT->AAPL': p}.
+
+    The part before the separator is the row and the part after it the column.
+    """
+    if not pairs:
+        return np.full((len(symbols), len(symbols)), fill, dtype=np.float64)
+    split = [key.partition(separator) for key in pairs]
+    return _scatter([row for row, _, _ in split], [col for _, _, col in split],
+                    list(pairs.values()), symbols, symbols, fill)
+
+
+def square_matrix(values: Any, size: int) -> Optional[np.ndarray]:
+    """A list-of-lists matrix as a float array, or None if it is not size x size."""
+    try:
+        matrix = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    return matrix if matrix.shape == (size, size) else None
+
+
+def matrix_rows(symbols: Sequence[str], matrix: np.ndarray, levels: Sequence[Tuple[float, str]],
+                default_css: str, diagonal_css: str) -> List[MatrixRow]:
+    """
+    Precompute table rows with one CSS class per cell.
+
+    Args:
+        symbols: Row and column labels
+        matrix: N x N values; NaN cells are shown empty
+        levels: (threshold, css) pairs checked in order; the first threshold
+            the value exceeds wins
+        default_css: Class for values below every threshold
+        diagonal_css: Class for the diagonal
+    """
+    n = len(symbols)
+    css = np.full(matrix.shape, default_css, dtype=object)
+    if levels:
+        css = np.select([matrix > threshold for threshold, _ in levels],
+                        [name for _, name in levels], default=default_css).astype(object)
+    diagonal = np.eye(n, dtype=bool)
+    css[diagonal] = diagonal_css
+    values = np.where(np.isnan(matrix), None, matrix).tolist()
+    css_rows = css.tolist()
+    return [
+        MatrixRow(symbol, [MatrixCell(values[i][j], css_rows[i][j], i == j) for j in range(n)])
+        for i, symbol in enumerate(symbols)
+    ]
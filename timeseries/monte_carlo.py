@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/monte_carlo.py
+
+"""
+Monte Carlo forecast distributions (fan charts) from the fitted ARIMA and
+GARCH parameters. Each symbol's ARIMA model is run forward from its filtered
+end-of-sample state (drawn from the state's distribution) with shocks
+sigma[t] * z[t], where sigma follows the symbol's GARCH(1,1) recursion path
+by path and z is drawn from the GARCH distribution (normal, Student's t,
+Hansen's skew-t or GED, standardized to unit variance). Symbols without a
+GARCH model get constant ARIMA-variance normal shocks.
+
+Paths are simulated as (path, symbol) arrays one step at a time, with the
+shocks of all steps drawn up front as one (path, step, symbol) array and the
+symbols' state spaces zero-padded to a common size. Large
+runs are split into chunks of settings.MONTE_CARLO_CHUNK_PATHS paths, each
+with its own seed from one SeedSequence, that run on one process pool per
+server process: it is started on first use with settings.MONTE_CARLO_WORKERS
+processes and shared by all later requests. Only the
+quantile bands leave a chunk: a single chunk gives the exact sample
+quantiles, several chunks the path-weighted average of their quantiles.
+"""
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from . import arima_forecast, figure_builder, garch_forecast, trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# Bump when the simulation changes so bands cached by older code are not reused
+FAN_CHART_CACHE_VERSION = 1
+
+DEFAULT_PATHS = 2000
+DEFAULT_STEPS = 20
+DEFAULT_SEED = 0
+DEFAULT_MAX_PATHS = 20000
+# Path limit for staff users and in DEBUG
+DEFAULT_STAFF_MAX_PATHS = 100000
+DEFAULT_CHUNK_PATHS = 5000
+DEFAULT_WORKERS = 2
+
+# Observations drawn before the fan
+HISTORY_POINTS = 60
+
+# Quantiles reduced from the paths: the outer and inner fan bands and the median
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# arch summary distribution name -> garch_dist
+DISTRIBUTIONS = {
+    'Normal': 'normal',
+    "Standardized Student's t": 't',
+    "Standardized Skew Student's t": 'skewt',
+    'Generalized Error Distribution': 'ged',
+}
+
+
+@dataclass(slots=True)
+class PathModel:
+    """Everything needed to simulate one symbol's paths; plain arrays so it pickles to worker processes."""
+    symbol: str
+    transition: np.ndarray
+    selection: np.ndarray
+    state: np.ndarray
+    state_cov: np.ndarray
+    levels: np.ndarray
+    const: float
+    sigma2: float
+    garch: Optional[Tuple[float, float, float, float, float]] = None  # omega, alpha, gamma, beta, first variance
+    distribution: str = 'normal'
+    shape: Tuple[float, ...] = ()
+
+
+def standardized_draws(rng: np.random.Generator, distribution: str, shape: Sequence[float],
+                       size: Tuple[int, ...]) -> np.ndarray:
+    """
+    Zero-mean, unit-variance shocks.
+
+    Args:
+        distribution: 'normal', 't' (shape: nu), 'skewt' (shape: eta,
+            lambda; Hansen 1994, the parameterization of arch) or 'ged' (shape: nu)
+    """
+    if distribution == 't':
+        (nu,) = shape
+        return rng.standard_t(nu, size) * math.sqrt((nu - 2) / nu)
+    if distribution == 'skewt':
+        eta, lam = shape
+        c = math.exp(math.lgamma((eta + 1) / 2) - math.lgamma(eta / 2)) / math.sqrt(math.pi * (eta - 2))
+        a = 4 * lam * c * (eta - 2) / (eta - 1)
+        b = math.sqrt(1 + 3 * lam * lam - a * a)
+        # A half standardized t, put left of zero (scaled by 1 - lambda) with probability (1 - lambda) / 2
+        magnitude = np.abs(rng.standard_t(eta, size)) * math.sqrt((eta - 2) / eta)
+        left = rng.random(size) < (1 - lam) / 2
+        x = np.where(left, -(1 - lam) * magnitude, (1 + lam) * magnitude)
+        return (x - a) / b
+    if distribution == 'ged':
+        (nu,) = shape
+        # |z|^nu is Gamma(1/nu) for a density proportional to exp(-|z|^nu)
+        magnitude = rng.gamma(1 / nu, 1.0, size) ** (1 / nu)
+        scale = math.sqrt(math.exp(math.lgamma(3 / nu) - math.lgamma(1 / nu)))
+        return np.where(rng.random(size) < 0.5, -magnitude, magnitude) / scale
+    return rng.standard_normal(size)
+
+
+def _shape(distribution: str, parameters: Dict[str, float]) -> Optional[Tuple[float, ...]]:
+    """Shape parameters of a distribution from the summary's Distribution table."""
+    names = {'t': ('nu',), 'skewt': ('eta', 'lambda'), 'ged': ('nu',), 'normal': ()}.get(distribution)
+    if names is None or not all(name in parameters for name in names):
+        return None
+    return tuple(parameters[name] for name in names)
+
+
+def path_models(model: Any, garch_dist: Optional[str] = None) -> List[PathModel]:
+    """
+    The path models of every symbol with a usable ARIMA fit.
+
+    Args:
+        model: The decoded result_model.AnalysisResults
+        garch_dist: The run's garch_params.dist, used when a summary names no
+            distribution
+    """
+    arima_models = [m for m in (arima_forecast.model_from(symbol, result) for symbol, result in model.arima.items())
+                    if m]
+    garch_models = {m.symbol: m for m in garch_forecast.models_from(model.garch)}
+    path_models = []
+    for batch in arima_forecast.batches(arima_models):
+        filtered = arima_forecast.filtered_states(batch)
+        levels = arima_forecast.levels(batch)
+        for s, arima in enumerate(batch):
+            garch = garch_models.get(arima.symbol)
+            distribution, shape = 'normal', ()
+            if garch:
+                distribution = DISTRIBUTIONS.get(garch.distribution, garch_dist or 'normal')
+                shape = _shape(distribution, garch.shape)
+                if shape is None:
+                    logger.info(f"No shape parameters for {arima.symbol}'s {distribution} shocks; drawing normal ones")
+                    distribution, shape = 'normal', ()
+            path_models.append(PathModel(
+                symbol=arima.symbol,
+                transition=filtered['transition'][s],
+                selection=filtered['selection'][s],
+                state=filtered['state'][s],
+                state_cov=filtered['cov'][s],
+                levels=levels[s],
+                const=arima.const,
+                sigma2=arima.sigma2,
+                garch=(garch.omega, garch.alpha, garch.gamma, garch.beta, garch.first_variance) if garch else None,
+                distribution=distribution,
+                shape=shape,
+            ))
+    return path_models
+
+
+def _cov_root(cov: np.ndarray) -> np.ndarray:
+    """A square root of a (possibly singular) covariance matrix."""
+    values, vectors = np.linalg.eigh((cov + cov.T) / 2)
+    return vectors * np.sqrt(np.maximum(values, 0.0))
+
+
+def _stacked(models: Sequence[PathModel]) -> Dict[str, np.ndarray]:
+    """
+    The path models as (symbol, ...) arrays, state and level dimensions zero-padded to the largest.
+
+    A symbol without GARCH gets omega = sigma2 and alpha = gamma = beta = 0,
+    so the same variance recursion keeps its variance constant.
+    """
+    count = len(models)
+    r = max(len(m.state) for m in models)
+    d = max(len(m.levels) for m in models)
+    stacked = {
+        'transition': np.zeros((count, r, r)),
+        'selection': np.zeros((count, r)),
+        'state': np.zeros((count, r)),
+        'state_root': np.zeros((count, r, r)),
+        'levels': np.zeros((count, d)),
+        'differenced': np.zeros((count, d), dtype=bool),
+        'const': np.array([m.const for m in models]),
+        'garch': np.array([m.garch or (m.sigma2, 0.0, 0.0, 0.0, m.sigma2) for m in models]).T,
+    }
+    for j, m in enumerate(models):
+        k = len(m.state)
+        stacked['transition'][j, :k, :k] = m.transition
+        stacked['selection'][j, :k] = m.selection
+        stacked['state'][j, :k] = m.state
+        stacked['state_root'][j, :k, :k] = _cov_root(m.state_cov)
+        stacked['levels'][j, :len(m.levels)] = m.levels
+        stacked['differenced'][j, :len(m.levels)] = True
+    return stacked
+
+
+def simulate_paths(models: Sequence[PathModel], paths: int, steps: int,
+                   rng: np.random.Generator) -> np.ndarray:
+    """Simulated series, shape (path, step, symbol)."""
+    shocks = np.stack([standardized_draws(rng, m.distribution, m.shape, (paths, steps)) for m in models], axis=2)
+    system = _stacked(models)
+    omega, alpha, gamma, beta, first_variance = system['garch']
+    transition, selection, differenced = system['transition'], system['selection'], system['differenced']
+
+    # (symbol, path, state) arrays so each step is one batched matrix product per symbol
+    state = system['state'][:, None, :] + rng.standard_normal((len(models), paths, transition.shape[1])) \
+        @ system['state_root'].transpose(0, 2, 1)
+    transition_t = transition.transpose(0, 2, 1)
+    selection = selection[:, None, :]
+    levels = np.broadcast_to(system['levels'][:, None, :], (len(models), paths, differenced.shape[1])).copy()
+    variance = np.broadcast_to(first_variance[:, None], (len(models), paths)).copy()
+    omega, alpha, gamma, beta = (value[:, None] for value in (omega, alpha, gamma, beta))
+    const = system['const'][:, None]
+    simulated = np.empty((paths, steps, len(models)))
+    for h in range(steps):
+        shock = np.sqrt(variance) * shocks[:, h, :].T
+        state = state @ transition_t + shock[:, :, None] * selection
+        value = state[:, :, 0] + const
+        # Undo the differencing: each level adds the next higher difference
+        for k in range(levels.shape[2] - 1, -1, -1):
+            mask = differenced[:, k, None]
+            levels[:, :, k] = np.where(mask, levels[:, :, k] + value, levels[:, :, k])
+            value = np.where(mask, levels[:, :, k], value)
+        simulated[:, h, :] = value.T
+        variance = omega + (alpha + gamma * (shock < 0)) * shock * shock + beta * variance
+    return simulated
+
+
+def _simulate_chunk(models: Sequence[PathModel], paths: int, steps: int,
+                    seed: np.random.SeedSequence) -> np.ndarray:
+    """Quantile bands (quantile, step, symbol) of one chunk of paths; runs in a worker process."""
+    simulated = simulate_paths(models, paths, steps, np.random.default_rng(seed))
+    return np.quantile(simulated, QUANTILES, axis=0)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool() -> ProcessPoolExecutor:
+    """The process pool shared by all simulations, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'MONTE_CARLO_WORKERS', DEFAULT_WORKERS)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool (a worker died) so the next simulation starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def simulate(models: Sequence[PathModel], paths: int = DEFAULT_PATHS, steps: int = DEFAULT_STEPS,
+             seed: int = DEFAULT_SEED, chunk_paths: Optional[int] = None,
+             workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Simulate the forecast distribution of every symbol and reduce it to quantile bands.
+
+    Args:
+        models: Path models from path_models
+        paths: Number of simulated paths
+        steps: Forecast horizon
+        seed: Root seed; the same seed and chunking give the same bands
+        chunk_paths: Paths per chunk (default settings.MONTE_CARLO_CHUNK_PATHS)
+        workers: Worker processes (default settings.MONTE_CARLO_WORKERS); 1 or
+            fewer runs in process, more uses the shared pool, whose size is
+            fixed by the setting when it starts
+
+    Returns:
+        {'symbols', 'quantiles', 'bands': array (quantile, step, symbol),
+        'throughput': {'paths', 'steps', 'symbols', 'chunks', 'workers',
+        'seconds', 'paths_per_second', 'draws_per_second'}}
+    """
+    chunk_paths = chunk_paths or getattr(settings, 'MONTE_CARLO_CHUNK_PATHS', DEFAULT_CHUNK_PATHS)
+    workers = workers if workers is not None else getattr(settings, 'MONTE_CARLO_WORKERS', DEFAULT_WORKERS)
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = max(1, min(workers, len(sizes)))
+
+    started = time.perf_counter()
+    bands = None
+    if workers > 1:
+        try:
+            bands = list(_worker_pool().map(_simulate_chunk, [models] * len(sizes), sizes,
+                                            [steps] * len(sizes), seeds))
+        except BrokenProcessPool as e:
+            logger.warning(f"Monte Carlo process pool failed, simulating in process: {e}")
+            _reset_pool()
+            workers = 1
+    if bands is None:
+        bands = [_simulate_chunk(models, size, steps, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    merged = np.average(np.stack(bands), axis=0, weights=sizes)
+    seconds = time.perf_counter() - started
+
+    throughput = {
+        'paths': paths,
+        'steps': steps,
+        'symbols': len(models),
+        'chunks': len(sizes),
+        'workers': workers,
+        'seconds': seconds,
+        'paths_per_second': paths / seconds if seconds else None,
+        'draws_per_second': paths * steps * len(models) / seconds if seconds else None,
+    }
+    logger.info(f"Simulated {paths} paths x {steps} steps x {len(models)} symbols in {seconds:.3f}s "
+                f"({len(sizes)} chunks on {workers} workers)")
+    return {'symbols': [m.symbol for m in models], 'quantiles': list(QUANTILES), 'bands': merged,
+            'throughput': throughput}
+
+
+def fan_chart(model: Any, models_hash: str, paths: int, steps: int, seed: int = DEFAULT_SEED,
+              garch_dist: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Quantile bands per symbol with their forecast dates.
+
+    Cached under models_hash (a hash of the ARIMA and GARCH results) and the
+    simulation parameters; a cached entry keeps the throughput of the run
+    that computed it.
+
+    Returns:
+        {'symbols': {symbol: {'x', 'history_x', 'history', 'bands':
+        {quantile: values}}}, 'throughput': {...}, 'cached': bool}
+    """
+    # The chunking decides which seed draws which paths, so it is part of the key
+    chunk_paths = getattr(settings, 'MONTE_CARLO_CHUNK_PATHS', DEFAULT_CHUNK_PATHS)
+    key = f'fan_chart:v{FAN_CHART_CACHE_VERSION}:{models_hash}:{paths}:{steps}:{seed}:{chunk_paths}'
+    chart = cache.get(key)
+    if chart is not None:
+        return {**chart, 'cached': True}
+
+    models = path_models(model, garch_dist)
+    result = simulate(models, paths, steps, seed, chunk_paths) if models else None
+    symbols = {}
+    for j, symbol in enumerate(result['symbols'] if result else []):
+        fitted = model.arima[symbol].summary.fitted_values
+        history_x = list(fitted.index)[-HISTORY_POINTS:]
+        residuals = model.arima[symbol].summary.residuals
+        history = [None if fitted.get(x) is None or residuals.get(x) is None else fitted.get(x) + residuals.get(x)
+                   for x in history_x]
+        try:
+            x = trading_calendar.forecast_axis(history_x[-1], steps)
+        except ValueError:
+            x = [f"Forecast_{h+1}" for h in range(steps)]
+        symbols[symbol] = {
+            'x': x,
+            'history_x': history_x,
+            'history': history,
+            'bands': {q: result['bands'][i, :, j].tolist() for i, q in enumerate(result['quantiles'])},
+        }
+    chart = {'symbols': symbols, 'throughput': result['throughput'] if result else None}
+    try:
+        cache.set(key, chart)
+    except Exception as e:
+        logger.warning(f"Could not cache the fan chart: {e}")
+    return {**chart, 'cached': False}
+
+
+def fan_figures(chart: Dict[str, Any]) -> Dict[str, str]:
+    """Fan chart figure specs (JSON) per symbol: recent history, the 5-95% and 25-75% bands and the median."""
+    figures = {}
+    for i, (symbol, entry) in enumerate(chart['symbols'].items()):
+        color = figure_builder.palette_color(i)
+        bands = entry['bands']
+        x = entry['x']
+        data = [
+            figure_builder.line_trace(
+                entry['history_x'], entry['history'], f"{symbol} Actual", color=color, width=2,
+                hovertemplate=f'<b>{symbol}</b><br>Date: %{{x}}<br>Value: %{{y:.4f}}<extra></extra>'),
+            figure_builder.band_trace(x, bands[0.95], bands[0.05], "5-95%",
+                                      fillcolor=figure_builder.rgba(color, 0.15), hoverinfo='skip', showlegend=True),
+            figure_builder.band_trace(x, bands[0.75], bands[0.25], "25-75%",
+                                      fillcolor=figure_builder.rgba(color, 0.35), hoverinfo='skip', showlegend=True),
+            figure_builder.line_trace(
+                x, bands[0.5], "Median", color=color, width=2, dash='dash',
+                hovertemplate=f'<b>{symbol} median</b><br>Date: %{{x}}<br>Value: %{{y:.4f}}<extra></extra>'),
+        ]
+        fig_layout = figure_builder.layout(
+            f"Forecast Distribution - {symbol}", 400,
+            xaxis_title="Date",
+            yaxis_title="Value",
+            hovermode='x unified',
+            showlegend=True,
+            legend=figure_builder.HORIZONTAL_LEGEND,
+        )
+        figures[symbol] = figure_builder.to_json(
+            figure_builder.figure_spec(figure_builder.figure(data, fig_layout), [None] * len(data)))
+    return figures
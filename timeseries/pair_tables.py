@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/pair_tables.py
+
+"""
+Server-side sorted, filtered and paginated tables of symbol pairs.
+The pairwise spillovers and the Granger causality tests have one row per
+ordered symbol pair, N^2 rows for N symbols, so the results page shows them
+a page at a time. Each table is held as columns with a precomputed index
+for every sortable column and direction: the row order and, along it, the
+strictly increasing composite key rank * rows + row id, where rank orders
+the column values (missing values last in both directions). A page cursor
+is the composite key of a page's first or last row, so the next or previous
+page starts at one searchsorted in that array (keyset pagination), and
+filters are a boolean mask applied along the order. Tables are cached per
+result section by content hash.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from django.core.cache import cache
+
+from . import plot_cache
+from .matrices import nested_matrix
+from .result_model import PAIRWISE_SPILLOVER_LEVELS, AnalysisResults, decode
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout changes so tables cached by older code are not reused
+PAIR_TABLES_CACHE_VERSION = 1
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+# Table name -> raw results section, sortable columns (name -> header label) and the default sort
+TABLES = {
+    'spillover': {
+        'title': 'Pairwise Spillover',
+        'section': 'spillover_results',
+        'columns': {'source': 'From', 'target': 'To', 'value': 'Spillover (%)'},
+        'sort': 'value',
+        'direction': 'desc',
+    },
+    'granger': {
+        'title': 'Granger Causality Tests',
+        'section': 'granger_causality_results',
+        'columns': {'cause': 'Cause', 'effect': 'Effect', 'min_p_value': 'Min P-Value', 'optimal_lag': 'Optimal Lag'},
+        'sort': 'min_p_value',
+        'direction': 'asc',
+    },
+}
+DIRECTIONS = ('asc', 'desc')
+
+# Granger significance filter -> largest p-value kept
+SIGNIFICANCE_LEVELS = {'5pct': 0.05, '1pct': 0.01}
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Dense ranks of a column in ascending order, with missing values (None/NaN) after all others."""
+    missing = np.array([value is None or value != value for value in values], dtype=bool)
+    ranks = np.full(len(values), len(values), dtype=np.int64)
+    if (~missing).any():
+        present = values[~missing]
+        if present.dtype == object:
+            present = present.astype(type(present[0]) if isinstance(present[0], str) else np.float64)
+        ranks[~missing] = np.unique(present, return_inverse=True)[1]
+    return ranks
+
+
+class PairTable:
+    """The rows of one pair table as columns, with a sorted index per (column, direction)."""
+
+    def __init__(self, name: str, columns: Dict[str, Sequence[Any]], details: Optional[List[Dict[str, Any]]] = None):
+        self.name = name
+        self.columns = {column: np.array(values, dtype=object) for column, values in columns.items()}
+        self.rows = len(next(iter(self.columns.values()), []))
+        self.details = details or [{} for _ in range(self.rows)]
+        self.symbols = sorted(set(self.columns[self._pair[0]]) | set(self.columns[self._pair[1]]))
+        self._index = {}
+        ids = np.arange(self.rows, dtype=np.int64)
+        for column in TABLES[name]['columns']:
+            ranks = _ranks(self.columns[column])
+            present = ranks < self.rows
+            for direction in DIRECTIONS:
+                # Missing values stay last when the order is reversed
+                key = ranks if direction == 'asc' else np.where(present, ranks[present].max(initial=0) - ranks, ranks)
+                order = np.lexsort((ids, key))
+                self._index[column, direction] = (order, key[order] * (self.rows + 1) + ids[order])
+
+    @property
+    def _pair(self) -> tuple:
+        return tuple(TABLES[self.name]['columns'])[:2]
+
+    def mask(self, symbol: Optional[str] = None, significance: Optional[str] = None,
+             min_value: Optional[float] = None) -> np.ndarray:
+        """Rows kept by the filters: pairs involving symbol, significant Granger tests, spillovers >= min_value."""
+        keep = np.ones(self.rows, dtype=bool)
+        if symbol:
+            first, second = self._pair
+            keep &= (self.columns[first] == symbol) | (self.columns[second] == symbol)
+        if significance and self.name == 'granger':
+            p_values = np.array([np.nan if p is None else p for p in self.columns['min_p_value']], dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                keep &= p_values < SIGNIFICANCE_LEVELS[significance]
+        if min_value is not None and self.name == 'spillover':
+            values = np.array([np.nan if v is None else v for v in self.columns['value']], dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                keep &= values >= min_value
+        return keep
+
+    def page(self, sort: str, direction: str, keep: np.ndarray, size: int = DEFAULT_PAGE_SIZE,
+             after: Optional[int] = None, before: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of the kept rows in (sort, direction) order.
+
+        Args:
+            after: Cursor of the last row of the previous page (next page)
+            before: Cursor of the first row of the following page (previous page)
+
+        Returns:
+            {'rows', 'first' (1-based position of the first row among the kept
+            rows), 'last', 'filtered', 'total', 'next' and 'previous' cursors
+            (None at either end)}
+        """
+        order, keys = self._index[sort, direction]
+        kept = keep[order]
+        if before is not None:
+            end = int(np.searchsorted(keys, before, side='left'))
+            positions = np.flatnonzero(kept[:end])[-size:]
+        else:
+            start = int(np.searchsorted(keys, after, side='right')) if after is not None else 0
+            positions = start + np.flatnonzero(kept[start:])[:size]
+        filtered = int(kept.sum())
+        if not len(positions):
+            return {'rows': [], 'first': 0, 'last': 0, 'filtered': filtered, 'total': self.rows,
+                    'next': None, 'previous': None}
+        first = int(kept[:positions[0]].sum()) + 1
+        last = first + len(positions) - 1
+        rows = [{**{column: values[order[p]] for column, values in self.columns.items()}, **self.details[order[p]]}
+                for p in positions]
+        return {
+            'rows': rows,
+            'first': first,
+            'last': last,
+            'filtered': filtered,
+            'total': self.rows,
+            'next': int(keys[positions[-1]]) if last < filtered else None,
+            'previous': int(keys[positions[0]]) if first > 1 else None,
+        }
+
+
+def _spillover_level(value: Optional[float]) -> str:
+    for threshold, css in PAIRWISE_SPILLOVER_LEVELS:
+        if value is not None and value > threshold:
+            return css
+    return 'text-muted'
+
+
+def build(name: str, model: AnalysisResults, symbols: Sequence[str]) -> Optional[PairTable]:
+    """The pair table of one results section, None when the run has no such section."""
+    if name == 'spillover':
+        if not model.spillover or not model.spillover.pairwise_spillover:
+            return None
+        matrix = nested_matrix(model.spillover.pairwise_spillover, symbols)
+        pairs = [(i, j) for i in range(len(symbols)) for j in range(len(symbols)) if i != j]
+        values = [None if np.isnan(matrix[i, j]) else float(matrix[i, j]) for i, j in pairs]
+        return PairTable(name, {
+            'source': [symbols[i] for i, _ in pairs],
+            'target': [symbols[j] for _, j in pairs],
+            'value': values,
+        }, [{'css': _spillover_level(value)} for value in values])
+    if name == 'granger':
+        if not model.granger or not model.granger.causality_results:
+            return None
+        tests = model.granger.causality_results
+        interpretations = model.granger.interpretations
+        causes, effects = zip(*(relationship.partition('->')[::2] for relationship in tests))
+        return PairTable(name, {
+            'cause': causes,
+            'effect': effects,
+            'min_p_value': [test.significance_summary.get('min_p_value') for test in tests.values()],
+            'optimal_lag': [test.optimal_lag_5pct if test.optimal_lag_5pct is not None else test.optimal_lag_1pct
+                            for test in tests.values()],
+        }, [{
+            'relationship': relationship,
+            'significant_5pct': bool(test.significance_summary.get('significant_at_5pct')),
+            'significant_1pct': bool(test.significance_summary.get('significant_at_1pct')),
+            'interpretation': interpretations.get(relationship, ''),
+        } for relationship, test in tests.items()])
+    raise ValueError(f"Unknown table {name!r}")
+
+
+def cached(name: str, section: Any, symbols: Sequence[str]) -> Optional[PairTable]:
+    """build() from the raw results section, cached under its content hash (decoded only on a miss)."""
+    key = (f'pair_tables:v{PAIR_TABLES_CACHE_VERSION}:{name}:'
+           f'{plot_cache.content_hash([section, list(symbols)])}')
+    table = cache.get(key)
+    if table is None and section:
+        table = build(name, decode({TABLES[name]['section']: section}, list(symbols)), symbols)
+        if table is not None:
+            cache.set(key, table)
+    return table
+
+
+def page_context(name: str, table: Optional[PairTable], params: Any,
+                 page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Template context of one table page for the query params.
+
+    Params: sort, dir, symbol, significance (granger: 5pct or 1pct),
+    min_value (spillover, in %), size, after or before (page cursors).
+
+    Raises:
+        ValueError: A parameter is not valid
+    """
+    spec = TABLES[name]
+    form = {
+        'sort': params.get('sort') or spec['sort'],
+        'dir': params.get('dir') or spec['direction'],
+        'symbol': params.get('symbol') or '',
+        'significance': params.get('significance') or '',
+        'min_value': params.get('min_value') or '',
+        'size': params.get('size') or page_size,
+    }
+    context = {'name': name, 'title': spec['title'], 'columns': spec['columns'], 'form': form}
+    if table is None:
+        return context
+    if form['sort'] not in spec['columns'] or form['dir'] not in DIRECTIONS:
+        raise ValueError(f"Sort by one of {', '.join(spec['columns'])}, ascending or descending.")
+    if form['significance'] and form['significance'] not in SIGNIFICANCE_LEVELS:
+        raise ValueError("Significance must be 5pct or 1pct.")
+    try:
+        size = int(form['size'])
+        min_value = float(form['min_value']) if form['min_value'] else None
+        after = int(params['after']) if params.get('after') else None
+        before = int(params['before']) if params.get('before') else None
+    except ValueError:
+        raise ValueError("Page size and cursors must be integers, the minimum spillover a number.")
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+    keep = table.mask(form['symbol'] or None, form['significance'] or None, min_value)
+    context.update({
+        'symbols': table.symbols,
+        'page': table.page(form['sort'], form['dir'], keep, size, after=after, before=before),
+    })
+    return context
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/pipeline_stages.py
+
+"""
+Stage-level cache of pipeline results.
+A run_pipeline payload is split into stages (data source, scaling, ARIMA,
+GARCH, spillover). Each stage is keyed by a hash of its own parameters chained
+with the key of the stage it consumes, so a change invalidates that stage and
+everything downstream of it. The response sections each stage produced are
+cached under its key. On the next run, cached stages that no recomputed stage
+depends on are switched off in the request (through the backend's per-stage
+enabled flags) and their cached sections are merged back into the response.
+When every stage and the response envelope are cached, the backend is not
+called at all.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import precision
+from .streaming import DATA_ARRAY_KEYS, STREAMED_ARRAYS_KEY, restore_rows, rows_to_columns
+
+logger = logging.getLogger(__name__)
+
+STAGE_CACHE_ALIAS = 'stages'
+
+# Bump when the stage layout changes so entries cached by older code are not reused
+STAGE_CACHE_VERSION = 1
+
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """One pipeline stage: the payload keys it reads and the response paths it writes."""
+    name: str
+    label: str
+    params: Tuple[str, ...]
+    upstream: Optional[str]
+    outputs: Tuple[Tuple[str, ...], ...]
+    # Payload path set to False to skip the stage in the backend; None if it always runs
+    switch: Optional[Tuple[str, ...]] = None
+
+
+# In pipeline order; a stage's upstream is always listed before it
+STAGES = (
+    Stage('data', 'Data source',
+          ('source_actual_or_synthetic_data', 'symbols', 'synthetic_anchor_prices',
+           'data_start_date', 'data_end_date'),
+          None,
+          (('raw_data_source',), ('original_data',), ('returns_data',),
+           ('execution_configuration', 'data_source'))),
+    Stage('scaling', 'Scaling & stationarity', ('scaling_method',), 'data',
+          (('scaled_data',), ('stationarity_results',),
+           ('execution_configuration', 'data_processing'))),
+    Stage('arima', 'ARIMA', ('arima_params',), 'scaling',
+          (('arima_results',), ('pre_garch_data',),
+           ('execution_configuration', 'model_configurations', 'arima_params'),
+           ('pipeline_metadata', 'configuration_used', 'arima_params')),
+          switch=('arima_params', 'enabled')),
+    Stage('garch', 'GARCH', ('garch_params',), 'arima',
+          (('garch_results',), ('post_garch_data',), ('multivariate_garch_results',),
+           ('execution_configuration', 'model_configurations', 'garch_params'),
+           ('pipeline_metadata', 'configuration_used', 'garch_params')),
+          switch=('garch_params', 'enabled')),
+    Stage('spillover', 'Spillover & Granger', ('spillover_enabled', 'spillover_params'), 'scaling',
+          (('var_results',), ('spillover_results',), ('granger_causality_results',),
+           ('execution_configuration', 'spillover_configuration'),
+           ('pipeline_metadata', 'configuration_used', 'spillover_enabled')),
+          switch=('spillover_enabled',)),
+)
+
+_STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+# Top-level response sections owned by a stage; everything else is the envelope
+STAGE_SECTIONS = frozenset(path[0] for stage in STAGES for path in stage.outputs if len(path) == 1)
+
+
+def _cache():
+    alias = STAGE_CACHE_ALIAS if STAGE_CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def _hash(obj: Any) -> str:
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_key(name: str, key: str) -> str:
+    return f'stage:v{STAGE_CACHE_VERSION}:{name}:{key}'
+
+
+def _get_path(obj: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(obj, dict) or key not in obj:
+            return _MISSING
+        obj = obj[key]
+    return obj
+
+
+def _set_path(obj: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    for key in path[:-1]:
+        if not isinstance(obj.get(key), dict):
+            obj[key] = {}
+        obj = obj[key]
+    obj[path[-1]] = value
+
+
+def stage_keys(payload: Dict[str, Any]) -> Dict[str, str]:
+    """Cache key of every stage, chained through its upstream stages."""
+    keys: Dict[str, str] = {}
+    for stage in STAGES:
+        params = {param: payload.get(param) for param in stage.params}
+        keys[stage.name] = _hash([keys.get(stage.upstream), stage.name, params])
+    return keys
+
+
+def _upstream_of(name: str) -> List[str]:
+    names = []
+    stage = _STAGES_BY_NAME[name]
+    while stage.upstream is not None:
+        names.append(stage.upstream)
+        stage = _STAGES_BY_NAME[stage.upstream]
+    return names
+
+
+def _extract(stage: Stage, api_results: Dict[str, Any],
+             data_arrays: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The outputs of one stage, with data arrays stored as columns."""
+    outputs = []
+    columns = {}
+    streamed = api_results.get(STREAMED_ARRAYS_KEY, {})
+    for path in stage.outputs:
+        if len(path) == 1 and path[0] in DATA_ARRAY_KEYS:
+            key = path[0]
+            if data_arrays is not None and key in streamed:
+                columns[key] = (data_arrays.get(key, {}), streamed[key])
+            elif api_results.get(key):
+                columns[key] = rows_to_columns(api_results[key])
+            continue
+        value = _get_path(api_results, path)
+        if value is not _MISSING:
+            outputs.append((path, value))
+    return {'outputs': outputs, 'columns': columns}
+
+
+def _apply(entry: Dict[str, Any], api_results: Dict[str, Any],
+           data_arrays: Optional[Dict[str, Any]]) -> None:
+    """Write a cached stage entry into a response, in its streamed or row form."""
+    for path, value in entry['outputs']:
+        _set_path(api_results, path, copy.deepcopy(value))
+    for key, (array, timestamp_key) in entry['columns'].items():
+        if data_arrays is not None:
+            data_arrays[key] = copy.deepcopy(array)
+            api_results.setdefault(STREAMED_ARRAYS_KEY, {})[key] = timestamp_key
+        else:
+            api_results[key] = restore_rows({STREAMED_ARRAYS_KEY: {key: timestamp_key}}, {key: array})[key]
+
+
+@dataclass
+class StagePlan:
+    """Which stages of a payload are served from the cache and which the backend runs."""
+    payload: Dict[str, Any]
+    keys: Dict[str, str]
+    cached: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    reused: List[str] = field(default_factory=list)
+    envelope: Optional[Dict[str, Any]] = None
+
+    @property
+    def complete(self) -> bool:
+        """Every stage is cached, so the response can be assembled without the backend."""
+        return self.envelope is not None
+
+    @property
+    def reduced(self) -> bool:
+        """The request sent to the backend skips at least one stage."""
+        return bool(self.reused) and not self.complete
+
+    def request_payload(self) -> Dict[str, Any]:
+        """The payload to send, with the reused stages switched off."""
+        payload = copy.deepcopy(self.payload)
+        for name in self.reused:
+            _set_path(payload, _STAGES_BY_NAME[name].switch, False)
+        return payload
+
+    def statuses(self) -> List[Dict[str, str]]:
+        """Per-stage status for the results page: 'reused' or 'computed'."""
+        return [{'name': stage.name, 'label': stage.label,
+                 'status': 'reused' if stage.name in self.reused else 'computed'}
+                for stage in STAGES]
+
+    def assemble(self, streamed: bool) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Build the full response from the cache (only when complete).
+
+        Args:
+            streamed: Return the data arrays in columns, as
+                streaming.parse_pipeline_response does, instead of row lists
+        """
+        api_results = copy.deepcopy(self.envelope)
+        data_arrays = None
+        if streamed:
+            api_results[STREAMED_ARRAYS_KEY] = {}
+            data_arrays = {}
+        self.merge(api_results, data_arrays)
+        return api_results, data_arrays
+
+    def merge(self, api_results: Dict[str, Any], data_arrays: Optional[Dict[str, Any]]) -> None:
+        """Write the cached outputs of the reused stages into a backend response."""
+        for name in self.reused:
+            _apply(self.cached[name], api_results, data_arrays)
+
+    def store(self, api_results: Dict[str, Any], data_arrays: Optional[Dict[str, Any]]) -> None:
+        """Cache the outputs of the stages the backend ran, and the response envelope."""
+        cache = _cache()
+        entries = {
+            _entry_key(stage.name, self.keys[stage.name]): _extract(stage, api_results, data_arrays)
+            for stage in STAGES if stage.name not in self.reused
+        }
+        entries[_entry_key('envelope', _hash(self.keys))] = {
+            key: value for key, value in api_results.items()
+            if key not in STAGE_SECTIONS and key != STREAMED_ARRAYS_KEY
+        }
+        try:
+            cache.set_many(precision.for_storage(entries), timeout=getattr(settings, 'PIPELINE_STAGE_CACHE_TIMEOUT', None))
+        except Exception as e:
+            logger.warning(f"Pipeline stage cache write failed: {e}")
+
+
+def plan(payload: Dict[str, Any], use_cache: bool = True) -> StagePlan:
+    """
+    Work out which stages of a pipeline payload can be reused.
+
+    A cached stage is reused unless a stage that has to run consumes it
+    (directly or further downstream), because the backend cannot be handed
+    intermediate results; the data source and scaling stages have no switch
+    and are only reused when the whole response is cached.
+
+    Args:
+        payload: run_pipeline request payload
+        use_cache: Look up cached stages; when False every stage is computed
+            and the plan is only used to store the new results
+    """
+    keys = stage_keys(payload)
+    stage_plan = StagePlan(payload=payload, keys=keys)
+    if not use_cache:
+        return stage_plan
+
+    cache = _cache()
+    try:
+        found = cache.get_many([_entry_key(stage.name, keys[stage.name]) for stage in STAGES])
+        stage_plan.cached = {stage.name: found[_entry_key(stage.name, keys[stage.name])]
+                             for stage in STAGES if _entry_key(stage.name, keys[stage.name]) in found}
+        if len(stage_plan.cached) == len(STAGES):
+            stage_plan.envelope = cache.get(_entry_key('envelope', _hash(keys)))
+    except Exception as e:
+        logger.warning(f"Pipeline stage cache read failed: {e}")
+        stage_plan.cached = {}
+
+    if stage_plan.complete:
+        stage_plan.reused = [stage.name for stage in STAGES]
+    else:
+        needed = {upstream for stage in STAGES if stage.name not in stage_plan.cached
+                  for upstream in _upstream_of(stage.name)}
+        stage_plan.reused = [stage.name for stage in STAGES
+                             if stage.name in stage_plan.cached and stage.switch is not None
+                             and stage.name not in needed]
+
+    logger.info("Pipeline stage plan", extra={
+        'reused': stage_plan.reused,
+        'cached': list(stage_plan.cached),
+        'complete': stage_plan.complete,
+    })
+    return stage_plan
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/plot_cache.py
+
+"""
+Cache of serialized figure payloads.
+Entries are keyed by (result content hash, plot name, render options) and live
+in the 'plots' cache alias, which is shared across workers and bounded by its
+MAX_ENTRIES setting. Hit/miss counters are kept in the same store so the hit
+rate covers every worker.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+PLOT_CACHE_ALIAS = 'plots'
+
+# Bump when figure code changes so entries built by older code are not reused
+PLOT_CACHE_VERSION = 4
+
+_STATS_KEYS = ('hits', 'misses', 'stores', 'skipped')
+
+
+def _cache():
+    alias = PLOT_CACHE_ALIAS if PLOT_CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def content_hash(obj: Any) -> str:
+    """Stable SHA-256 of a JSON-serializable object (e.g. a raw API result)."""
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_options(**overrides: Any) -> Dict[str, Any]:
+    """The settings that change how a figure is rendered, plus any per-call options."""
+    options = {
+        'max_points': getattr(settings, 'PLOT_MAX_POINTS_PER_TRACE', None),
+        'dtype': getattr(settings, 'PLOT_ARRAY_DTYPE', None),
+        'webgl_threshold': getattr(settings, 'PLOT_WEBGL_POINT_THRESHOLD', None),
+        'calendar': [getattr(settings, 'TRADING_CALENDAR_WEEKMASK', None),
+                     getattr(settings, 'TRADING_CALENDAR_HOLIDAYS', None)],
+    }
+    options.update(overrides)
+    return options
+
+
+def _generation(result_hash: str) -> int:
+    return _cache().get(f'plot:gen:{result_hash}', 0)
+
+
+def make_key(result_hash: str, plot_name: str, options: Dict[str, Any]) -> str:
+    """Build the cache key for one figure of one result."""
+    options_hash = hashlib.sha256(
+        json.dumps(options, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    return (f'plot:v{PLOT_CACHE_VERSION}:{result_hash}:{_generation(result_hash)}:'
+            f'{plot_name}:{options_hash}')
+
+
+def _count(stat: str) -> None:
+    cache = _cache()
+    key = f'plot:stats:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_or_create(result_hash: str, plot_name: str, options: Dict[str, Any],
+                  build: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for a figure, building and storing it on a miss.
+
+    Values that are None (failed builds) or larger than
+    settings.PLOT_CACHE_MAX_ENTRY_BYTES are returned but not stored.
+    """
+    cache = _cache()
+    key = make_key(result_hash, plot_name, options)
+    try:
+        cached = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Plot cache read failed for {plot_name}: {e}")
+        cached = None
+    if cached is not None:
+        _count('hits')
+        return cached
+
+    _count('misses')
+    value = build()
+    if value is None:
+        return value
+
+    max_bytes = getattr(settings, 'PLOT_CACHE_MAX_ENTRY_BYTES', None)
+    if max_bytes and len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) > max_bytes:
+        _count('skipped')
+        logger.debug(f"Plot {plot_name} exceeds the cache entry size limit, not cached")
+        return value
+    try:
+        cache.set(key, value)
+        _count('stores')
+    except Exception as e:
+        logger.warning(f"Plot cache write failed for {plot_name}: {e}")
+    return value
+
+
+def invalidate(result_hash: Optional[str] = None) -> None:
+    """
+    Drop cached figures.
+
+    Args:
+        result_hash: Only drop the figures of this result (by moving it to a
+            new key generation); drop everything when omitted
+    """
+    cache = _cache()
+    if result_hash is None:
+        cache.clear()
+        logger.info("Plot cache cleared")
+        return
+    key = f'plot:gen:{result_hash}'
+    cache.set(key, cache.get(key, 0) + 1, timeout=None)
+    logger.info(f"Plot cache invalidated for result {result_hash[:12]}")
+
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters across all workers, with the hit rate."""
+    cache = _cache()
+    counts = {stat: cache.get(f'plot:stats:{stat}', 0) for stat in _STATS_KEYS}
+    lookups = counts['hits'] + counts['misses']
+    counts['hit_rate'] = counts['hits'] / lookups if lookups else None
+    return counts
@@ -7,15 +7,12 @@ Generates interactive charts server-side to reduce client-side JavaScript depend
 """
 
 import logging
-import json
+from html import escape
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.utils
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional
+
+from . import descriptive_stats, figure_builder, matrices, plot_cache, trading_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +31,15 @@ class TimeSeriesPlotter:
         """
         self.results = analysis_results
         self.symbols = self._extract_symbols()
-        self.color_palette = px.colors.qualitative.Set2
+        self.color_palette = figure_builder.COLOR_PALETTE
+        self._content_hash = None
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the analysis results, used to key the figure cache."""
+        if self._content_hash is None:
+            self._content_hash = plot_cache.content_hash(self.results)
+        return self._content_hash
         
     def _extract_symbols(self) -> List[str]:
         """Extract symbol names from the analysis results."""
@@ -53,16 +58,61 @@ class TimeSeriesPlotter:
             return {}
     
     def _create_date_range(self, n_points: int, start_date: Optional[str] = None) -> List[str]:
-        """Create a date range for plotting."""
-        if start_date:
-            try:
-                start = datetime.strptime(start_date, "%Y-%m-%d")
-            except:
-                start = datetime.now()
-        else:
-            start = datetime.now()
-        
-        return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n_points)]
+        """Create a trading-day date range for plotting, starting today if no start is given."""
+        try:
+            start = pd.Timestamp(start_date) if start_date else pd.Timestamp.now()
+        except ValueError:
+            start = pd.Timestamp.now()
+        return trading_calendar.format_dates(trading_calendar.trading_days(start, n_points))
+    
+    def _series_from_data(self, value_key: str, fallbacks: tuple = ()) -> List[tuple]:
+        """
+        Collect (symbol, dates, values) for every symbol that carries value_key.
+
+        Fallback keys are tried in order; the special key 'prices_to_returns'
+        derives simple returns from prices.
+        """
+        series = []
+        for symbol in self.symbols:
+            data = self._safe_get_data(symbol)
+            if not data or not isinstance(data, dict) or 'dates' not in data:
+                if data:
+                    logger.warning(f"No {value_key} data available for {symbol}")
+                series.append((symbol, [], []))
+                continue
+
+            values = None
+            for key in (value_key,) + fallbacks:
+                if key == 'prices_to_returns' and 'prices' in data:
+                    prices = data['prices']
+                    values = [0] + [((prices[i] - prices[i-1]) / prices[i-1]) for i in range(1, len(prices))]
+                    break
+                if key in data:
+                    values = data[key]
+                    break
+
+            if values is None:
+                logger.warning(f"No {value_key} data available for {symbol}")
+                values = []
+            series.append((symbol, data['dates'], values))
+        return series
+
+    def _price_series(self, symbol: str) -> Optional[tuple]:
+        """Return (dates, prices) for a symbol in either supported data format."""
+        data = self._safe_get_data(symbol)
+        if not data:
+            return None
+        if isinstance(data, dict):
+            if 'dates' in data and 'prices' in data:
+                # Format: {'dates': [...], 'prices': [...]}
+                return data['dates'], data['prices']
+            if all(isinstance(v, (int, float)) for v in data.values()):
+                # Format: {'2023-01-01': 100.0, '2023-01-02': 101.0, ...}
+                return list(data.keys()), list(data.values())
+            logger.warning(f"Unexpected data format for {symbol}")
+            return None
+        logger.warning(f"Unexpected data type for {symbol}: {type(data)}")
+        return None
     
     def create_time_series_plot(self) -> Optional[str]:
         """
@@ -72,69 +122,21 @@ class TimeSeriesPlotter:
             JSON string of the Plotly figure or None if error
         """
         try:
-            fig = go.Figure()
-            
-            for i, symbol in enumerate(self.symbols):
-                data = self._safe_get_data(symbol)
-                
-                if not data:
-                    continue
-                
-                # Handle different data formats
-                if isinstance(data, dict):
-                    if 'dates' in data and 'prices' in data:
-                        # Format: {'dates': [...], 'prices': [...]}
-                        dates = data['dates']
-                        prices = data['prices']
-                    elif all(isinstance(v, (int, float)) for v in data.values()):
-                        # Format: {'2023-01-01': 100.0, '2023-01-02': 101.0, ...}
-                        dates = list(data.keys())
-                        prices = list(data.values())
-                    else:
-                        logger.warning(f"Unexpected data format for {symbol}")
-                        continue
-                else:
-                    logger.warning(f"Unexpected data type for {symbol}: {type(data)}")
-                    continue
-                
-                # Add trace
-                color = self.color_palette[i % len(self.color_palette)]
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=prices,
-                    mode='lines',
-                    name=symbol,
-                    line=dict(color=color, width=2),
-                    hovertemplate=f'<b>{symbol}</b><br>' +
-                                'Date: %{x}<br>' +
-                                'Price: %{y:.2f}<br>' +
-                                '<extra></extra>'
-                ))
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Time Series Data - Price Movements",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                xaxis_title="Date",
+            series = []
+            for symbol in self.symbols:
+                prices = self._price_series(symbol)
+                series.append((symbol,) + prices if prices else (symbol, [], []))
+
+            fig = figure_builder.series_figure(
+                series,
+                title_text="Time Series Data - Price Movements",
                 yaxis_title="Price",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
+                value_label="Price",
+                value_format=".2f",
+                line_width=2,
                 height=500,
-                margin=dict(l=50, r=50, t=80, b=50)
             )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(fig)
             
         except Exception as e:
             logger.error(f"Error creating time series plot: {e}")
@@ -148,75 +150,16 @@ class TimeSeriesPlotter:
             JSON string of the Plotly figure or None if error
         """
         try:
-            fig = go.Figure()
-            
-            for i, symbol in enumerate(self.symbols):
-                data = self._safe_get_data(symbol)
-                
-                if not data:
-                    continue
-                
-                # Extract returns data
-                returns = None
-                dates = None
-                
-                if isinstance(data, dict):
-                    if 'dates' in data and 'returns' in data:
-                        dates = data['dates']
-                        returns = data['returns']
-                    elif 'dates' in data and 'prices' in data:
-                        # Calculate returns from prices
-                        dates = data['dates']
-                        prices = data['prices']
-                        returns = [0] + [((prices[i] - prices[i-1]) / prices[i-1]) for i in range(1, len(prices))]
-                    else:
-                        logger.warning(f"No returns data available for {symbol}")
-                        continue
-                
-                if returns is None or dates is None:
-                    continue
-                
-                # Add trace
-                color = self.color_palette[i % len(self.color_palette)]
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=returns,
-                    mode='lines',
-                    name=symbol,
-                    line=dict(color=color, width=1.5),
-                    hovertemplate=f'<b>{symbol}</b><br>' +
-                                'Date: %{x}<br>' +
-                                'Return: %{y:.4f}<br>' +
-                                '<extra></extra>'
-                ))
-            
-            # Add zero line
-            fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Daily Returns",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                xaxis_title="Date",
+            fig = figure_builder.series_figure(
+                self._series_from_data('returns', ('prices_to_returns',)),
+                title_text="Daily Returns",
                 yaxis_title="Returns",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
+                value_label="Return",
+                value_format=".4f",
+                zero_line=True,
                 height=400,
-                margin=dict(l=50, r=50, t=80, b=50)
             )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(fig)
             
         except Exception as e:
             logger.error(f"Error creating returns plot: {e}")
@@ -230,44 +173,30 @@ class TimeSeriesPlotter:
             JSON string of the Plotly figure or None if error
         """
         try:
-            fig = make_subplots(
+            grid, axes = figure_builder.subplot_grid(
                 rows=len(self.symbols),
                 cols=1,
                 subplot_titles=[f"{symbol} - ARIMA Forecast" for symbol in self.symbols],
                 vertical_spacing=0.08
             )
+            data = []
             
             for i, symbol in enumerate(self.symbols, 1):
+                axis = axes[i - 1]
                 # Get historical data
-                data = self._safe_get_data(symbol)
                 arima_results = self.results.get('arima_results', {}).get(symbol, {})
+                prices = self._price_series(symbol)
                 
-                if not data or not arima_results:
-                    continue
-                
-                # Extract historical prices
-                if 'dates' in data and 'prices' in data:
-                    hist_dates = data['dates']
-                    hist_prices = data['prices']
-                elif isinstance(data, dict) and all(isinstance(v, (int, float)) for v in data.values()):
-                    hist_dates = list(data.keys())
-                    hist_prices = list(data.values())
-                else:
+                if not prices or not arima_results:
                     continue
+                hist_dates, hist_prices = prices
                 
                 # Add historical data
-                color = self.color_palette[(i-1) % len(self.color_palette)]
-                fig.add_trace(
-                    go.Scatter(
-                        x=hist_dates,
-                        y=hist_prices,
-                        mode='lines',
-                        name=f'{symbol} Historical',
-                        line=dict(color=color, width=2),
-                        showlegend=(i == 1)
-                    ),
-                    row=i, col=1
-                )
+                color = figure_builder.palette_color(i - 1)
+                data.append(figure_builder.on_axes(figure_builder.line_trace(
+                    hist_dates, hist_prices, f'{symbol} Historical',
+                    color=color, width=2, showlegend=(i == 1)
+                ), axis))
                 
                 # Add forecast
                 forecast = arima_results.get('forecast', [])
@@ -277,70 +206,41 @@ class TimeSeriesPlotter:
                     # Create forecast dates
                     last_date = hist_dates[-1] if hist_dates else "2023-01-01"
                     try:
-                        last_dt = datetime.strptime(last_date, "%Y-%m-%d")
-                        forecast_dates = [(last_dt + timedelta(days=j+1)).strftime("%Y-%m-%d") 
-                                        for j in range(len(forecast))]
-                    except:
+                        forecast_dates = trading_calendar.forecast_axis(last_date, len(forecast))
+                    except ValueError:
                         forecast_dates = [f"Day {j+1}" for j in range(len(forecast))]
                     
                     # Add forecast line
-                    fig.add_trace(
-                        go.Scatter(
-                            x=forecast_dates,
-                            y=forecast,
-                            mode='lines+markers',
-                            name=f'{symbol} Forecast',
-                            line=dict(color=color, width=2, dash='dash'),
-                            marker=dict(size=6),
-                            showlegend=(i == 1)
-                        ),
-                        row=i, col=1
-                    )
+                    data.append(figure_builder.on_axes(figure_builder.line_trace(
+                        forecast_dates, forecast, f'{symbol} Forecast',
+                        color=color, width=2, dash='dash', mode='lines+markers',
+                        marker_size=6, showlegend=(i == 1)
+                    ), axis))
                     
                     # Add confidence intervals if available
                     if forecast_se:
                         upper_bound = [f + 1.96 * se for f, se in zip(forecast, forecast_se)]
                         lower_bound = [f - 1.96 * se for f, se in zip(forecast, forecast_se)]
                         
-                        # Convert hex color to rgba properly
-                        try:
-                            rgb_vals = px.colors.hex_to_rgb(color)
-                            rgba_color = f'rgba({rgb_vals[0]}, {rgb_vals[1]}, {rgb_vals[2]}, 0.2)'
-                        except:
-                            rgba_color = 'rgba(128, 128, 128, 0.2)'  # fallback color
-                        
-                        fig.add_trace(
-                            go.Scatter(
-                                x=forecast_dates + forecast_dates[::-1],
-                                y=upper_bound + lower_bound[::-1],
-                                fill='toself',
-                                fillcolor=rgba_color,
-                                line=dict(color='rgba(255,255,255,0)'),
-                                name=f'{symbol} 95% CI',
-                                showlegend=(i == 1)
-                            ),
-                            row=i, col=1
-                        )
+                        data.append(figure_builder.on_axes(figure_builder.band_trace(
+                            forecast_dates, upper_bound, lower_bound, f'{symbol} 95% CI',
+                            fillcolor=figure_builder.rgba(color, 0.2), showlegend=(i == 1)
+                        ), axis))
             
             # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="ARIMA Forecasts with Confidence Intervals",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                template='plotly_white',
+            fig_layout = figure_builder.layout(
+                "ARIMA Forecasts with Confidence Intervals",
+                300 * len(self.symbols),
                 showlegend=True,
-                height=300 * len(self.symbols),
-                margin=dict(l=50, r=50, t=80, b=50)
+                **grid
             )
             
             # Update axis labels
-            for i in range(len(self.symbols)):
-                fig.update_xaxes(title_text="Date", row=i+1, col=1)
-                fig.update_yaxes(title_text="Price", row=i+1, col=1)
+            for axis in axes:
+                fig_layout[f'xaxis{axis}']['title'] = {'text': "Date"}
+                fig_layout[f'yaxis{axis}']['title'] = {'text': "Price"}
             
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(figure_builder.figure(data, fig_layout))
             
         except Exception as e:
             logger.error(f"Error creating ARIMA forecast plot: {e}")
@@ -354,12 +254,13 @@ class TimeSeriesPlotter:
             JSON string of the Plotly figure or None if error
         """
         try:
-            fig = make_subplots(
+            grid, axes = figure_builder.subplot_grid(
                 rows=len(self.symbols),
                 cols=1,
                 subplot_titles=[f"{symbol} - GARCH Volatility Forecast" for symbol in self.symbols],
                 vertical_spacing=0.08
             )
+            data = []
             
             for i, symbol in enumerate(self.symbols, 1):
                 garch_results = self.results.get('garch_results', {}).get(symbol, {})
@@ -373,45 +274,31 @@ class TimeSeriesPlotter:
                     # Create forecast dates
                     forecast_dates = [f"Day {j+1}" for j in range(len(volatility_forecast))]
                     
-                    color = self.color_palette[(i-1) % len(self.color_palette)]
-                    
                     # Add volatility forecast
-                    fig.add_trace(
-                        go.Scatter(
-                            x=forecast_dates,
-                            y=volatility_forecast,
-                            mode='lines+markers',
-                            name=f'{symbol} Volatility',
-                            line=dict(color=color, width=2),
-                            marker=dict(size=6),
-                            showlegend=(i == 1),
-                            hovertemplate=f'<b>{symbol}</b><br>' +
-                                        'Period: %{x}<br>' +
-                                        'Volatility: %{y:.4f}<br>' +
-                                        '<extra></extra>'
-                        ),
-                        row=i, col=1
-                    )
+                    data.append(figure_builder.on_axes(figure_builder.line_trace(
+                        forecast_dates, volatility_forecast, f'{symbol} Volatility',
+                        color=figure_builder.palette_color(i - 1), width=2,
+                        mode='lines+markers', marker_size=6, showlegend=(i == 1),
+                        hovertemplate=f'<b>{symbol}</b><br>' +
+                                    'Period: %{x}<br>' +
+                                    'Volatility: %{y:.4f}<br>' +
+                                    '<extra></extra>'
+                    ), axes[i - 1]))
             
             # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="GARCH Volatility Forecasts",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                template='plotly_white',
+            fig_layout = figure_builder.layout(
+                "GARCH Volatility Forecasts",
+                250 * len(self.symbols),
                 showlegend=True,
-                height=250 * len(self.symbols),
-                margin=dict(l=50, r=50, t=80, b=50)
+                **grid
             )
             
             # Update axis labels
-            for i in range(len(self.symbols)):
-                fig.update_xaxes(title_text="Forecast Period", row=i+1, col=1)
-                fig.update_yaxes(title_text="Volatility", row=i+1, col=1)
+            for axis in axes:
+                fig_layout[f'xaxis{axis}']['title'] = {'text': "Forecast Period"}
+                fig_layout[f'yaxis{axis}']['title'] = {'text': "Volatility"}
             
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(figure_builder.figure(data, fig_layout))
             
         except Exception as e:
             logger.error(f"Error creating GARCH volatility plot: {e}")
@@ -438,55 +325,24 @@ class TimeSeriesPlotter:
             
             # Convert to matrix format
             symbols = list(spillover_matrix.keys())
-            matrix_data = []
-            
-            for from_symbol in symbols:
-                row = []
-                for to_symbol in symbols:
-                    value = spillover_matrix.get(from_symbol, {}).get(to_symbol, 0)
-                    row.append(value)
-                matrix_data.append(row)
+            matrix_data = matrices.nested_matrix(spillover_matrix, symbols, fill=0.0)
+            
+            # Create heatmap; cell labels are drawn by Plotly from z
+            heatmap = figure_builder.heatmap_trace(
+                matrix_data, symbols, symbols, 'RdYlBu_r',
+                colorbar_title="Spillover %",
+                hovertemplate='From: %{y}<br>To: %{x}<br>Spillover: %{z:.1f}%<extra></extra>',
+                texttemplate='%{z:.1f}%',
+            )
             
-            # Create heatmap
-            fig = go.Figure(data=go.Heatmap(
-                z=matrix_data,
-                x=symbols,
-                y=symbols,
-                colorscale='RdYlBu_r',
-                showscale=True,
-                colorbar=dict(title="Spillover %"),
-                hovertemplate='From: %{y}<br>To: %{x}<br>Spillover: %{z:.1f}%<extra></extra>'
-            ))
-            
-            # Add text annotations
-            annotations = []
-            for i, from_symbol in enumerate(symbols):
-                for j, to_symbol in enumerate(symbols):
-                    annotations.append(
-                        dict(
-                            x=to_symbol,
-                            y=from_symbol,
-                            text=f"{matrix_data[i][j]:.1f}%",
-                            showarrow=False,
-                            font=dict(color="white" if matrix_data[i][j] > 50 else "black")
-                        )
-                    )
-            
-            fig.update_layout(
-                title=dict(
-                    text="Spillover Matrix Heatmap",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
+            fig_layout = figure_builder.layout(
+                "Spillover Matrix Heatmap", 400,
+                layout_margin=figure_builder.margin(l=100, r=50, t=80, b=100),
                 xaxis_title="To (Receiving)",
                 yaxis_title="From (Transmitting)",
-                template='plotly_white',
-                annotations=annotations,
-                height=400,
-                margin=dict(l=100, r=50, t=80, b=100)
             )
             
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(figure_builder.figure([heatmap], fig_layout))
             
         except Exception as e:
             logger.error(f"Error creating spillover heatmap: {e}")
@@ -517,62 +373,42 @@ class TimeSeriesPlotter:
                 is_stationary.append(result.get('is_stationary', False))
             
             # Create subplot
-            fig = make_subplots(
+            grid, axes = figure_builder.subplot_grid(
                 rows=1, cols=2,
-                subplot_titles=('P-Values', 'ADF Statistics'),
-                specs=[[{"secondary_y": False}, {"secondary_y": False}]]
+                subplot_titles=('P-Values', 'ADF Statistics')
             )
+            colors = ['green' if stat else 'red' for stat in is_stationary]
             
             # P-values bar chart
-            colors_p = ['green' if stat else 'red' for stat in is_stationary]
-            fig.add_trace(
-                go.Bar(
-                    x=symbols,
-                    y=p_values,
-                    name='P-Value',
-                    marker_color=colors_p,
-                    hovertemplate='Symbol: %{x}<br>P-Value: %{y:.4f}<extra></extra>'
-                ),
-                row=1, col=1
-            )
-            
-            # Add significance line
-            fig.add_hline(y=0.05, line_dash="dash", line_color="red", 
-                         annotation_text="α = 0.05")
+            p_value_bars = figure_builder.on_axes(figure_builder.bar_trace(
+                symbols, p_values, 'P-Value',
+                marker_color=colors,
+                hovertemplate='Symbol: %{x}<br>P-Value: %{y:.4f}<extra></extra>'
+            ), axes[0])
             
             # ADF statistics bar chart
-            colors_adf = ['green' if stat else 'red' for stat in is_stationary]
-            fig.add_trace(
-                go.Bar(
-                    x=symbols,
-                    y=adf_statistics,
-                    name='ADF Statistic',
-                    marker_color=colors_adf,
-                    hovertemplate='Symbol: %{x}<br>ADF: %{y:.4f}<extra></extra>'
-                ),
-                row=1, col=2
-            )
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Stationarity Test Results (ADF Test)",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                template='plotly_white',
+            adf_bars = figure_builder.on_axes(figure_builder.bar_trace(
+                symbols, adf_statistics, 'ADF Statistic',
+                marker_color=colors,
+                hovertemplate='Symbol: %{x}<br>ADF: %{y:.4f}<extra></extra>'
+            ), axes[1])
+            
+            # Update layout, with the significance line on the p-value panel
+            fig_layout = figure_builder.layout(
+                "Stationarity Test Results (ADF Test)", 400,
                 showlegend=False,
-                height=400,
-                margin=dict(l=50, r=50, t=80, b=50)
+                **grid
             )
+            fig_layout['annotations'].append(figure_builder.hline_annotation(0.05, "α = 0.05", axes[0]))
+            fig_layout['shapes'] = [figure_builder.hline_shape(0.05, 'red', dash='dash', axis=axes[0])]
             
             # Update axis labels
-            fig.update_xaxes(title_text="Symbol", row=1, col=1)
-            fig.update_yaxes(title_text="P-Value", row=1, col=1)
-            fig.update_xaxes(title_text="Symbol", row=1, col=2)
-            fig.update_yaxes(title_text="ADF Statistic", row=1, col=2)
+            fig_layout['xaxis']['title'] = {'text': "Symbol"}
+            fig_layout['yaxis']['title'] = {'text': "P-Value"}
+            fig_layout[f'xaxis{axes[1]}']['title'] = {'text': "Symbol"}
+            fig_layout[f'yaxis{axes[1]}']['title'] = {'text': "ADF Statistic"}
             
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(figure_builder.figure([p_value_bars, adf_bars], fig_layout))
             
         except Exception as e:
             logger.error(f"Error creating stationarity plot: {e}")
@@ -596,9 +432,8 @@ class TimeSeriesPlotter:
                     if 'returns' in data:
                         returns_data[symbol] = data['returns']
                     elif 'prices' in data:
-                        prices = data['prices']
-                        returns = [0] + [((prices[i] - prices[i-1]) / prices[i-1]) for i in range(1, len(prices))]
-                        returns_data[symbol] = returns
+                        prices = np.asarray(data['prices'], dtype=np.float64)
+                        returns_data[symbol] = np.concatenate(([0.0], np.diff(prices) / prices[:-1]))
             
             if len(returns_data) < 2:
                 return None
@@ -608,52 +443,23 @@ class TimeSeriesPlotter:
             correlation_matrix = df.corr()
             
             # Create heatmap
-            fig = go.Figure(data=go.Heatmap(
-                z=correlation_matrix.values,
-                x=correlation_matrix.columns,
-                y=correlation_matrix.index,
-                colorscale='RdBu',
+            heatmap = figure_builder.heatmap_trace(
+                correlation_matrix.values,
+                list(correlation_matrix.columns),
+                list(correlation_matrix.index),
+                'RdBu',
                 zmid=0,
-                showscale=True,
-                colorbar=dict(title="Correlation"),
-                hovertemplate='%{y} vs %{x}<br>Correlation: %{z:.3f}<extra></extra>'
-            ))
-            
-            # Add text annotations
-            annotations = []
-            for i, row in enumerate(correlation_matrix.index):
-                for j, col in enumerate(correlation_matrix.columns):
-                    value = correlation_matrix.iloc[i, j]
-                    # Handle pandas scalar types more robustly
-                    if pd.isna(value):
-                        numeric_value = 0.0
-                    else:
-                        # Use numpy conversion which handles pandas scalars better
-                        numeric_value = float(np.asarray(value).item())
-                    
-                    annotations.append(
-                        dict(
-                            x=col,
-                            y=row,
-                            text=f"{numeric_value:.3f}",
-                            showarrow=False,
-                            font=dict(color="white" if abs(numeric_value) > 0.5 else "black")
-                        )
-                    )
-            
-            fig.update_layout(
-                title=dict(
-                    text="Returns Correlation Matrix",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                template='plotly_white',
-                annotations=annotations,
-                height=400,
-                margin=dict(l=100, r=50, t=80, b=100)
+                colorbar_title="Correlation",
+                hovertemplate='%{y} vs %{x}<br>Correlation: %{z:.3f}<extra></extra>',
+                texttemplate='%{z:.3f}',
             )
             
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            fig_layout = figure_builder.layout(
+                "Returns Correlation Matrix", 400,
+                layout_margin=figure_builder.margin(l=100, r=50, t=80, b=100),
+            )
+            
+            return figure_builder.to_json(figure_builder.figure([heatmap], fig_layout))
             
         except Exception as e:
             logger.error(f"Error creating correlation matrix: {e}")
@@ -667,79 +473,17 @@ class TimeSeriesPlotter:
             JSON string of the Plotly figure or None if error
         """
         try:
-            fig = go.Figure()
-            
-            for i, symbol in enumerate(self.symbols):
-                data = self._safe_get_data(symbol)
-                
-                if not data:
-                    continue
-                
-                # Look for scaled data, fall back to returns if not available
-                scaled_data = None
-                dates = None
-                
-                if isinstance(data, dict):
-                    if 'dates' in data and 'scaled_data' in data:
-                        dates = data['dates']
-                        scaled_data = data['scaled_data']
-                    elif 'dates' in data and 'returns' in data:
-                        # Use returns as proxy for scaled data
-                        dates = data['dates']
-                        scaled_data = data['returns']
-                    elif 'dates' in data and 'prices' in data:
-                        # Calculate returns as scaled data
-                        dates = data['dates']
-                        prices = data['prices']
-                        scaled_data = [0] + [((prices[i] - prices[i-1]) / prices[i-1]) for i in range(1, len(prices))]
-                    else:
-                        logger.warning(f"No scaled data available for {symbol}")
-                        continue
-                
-                if scaled_data is None or dates is None:
-                    continue
-                
-                # Add trace
-                color = self.color_palette[i % len(self.color_palette)]
-                fig.add_trace(go.Scatter(
-                    x=dates,
-                    y=scaled_data,
-                    mode='lines',
-                    name=symbol,
-                    line=dict(color=color, width=1.5),
-                    hovertemplate=f'<b>{symbol}</b><br>' +
-                                'Date: %{x}<br>' +
-                                'Scaled Value: %{y:.4f}<br>' +
-                                '<extra></extra>'
-                ))
-            
-            # Add zero line
-            fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Scaled Data (for GARCH Analysis)",
-                    x=0.5,
-                    font=dict(size=20)
-                ),
-                xaxis_title="Date",
+            # Look for scaled data, fall back to returns, then to returns computed from prices
+            fig = figure_builder.series_figure(
+                self._series_from_data('scaled_data', ('returns', 'prices_to_returns')),
+                title_text="Scaled Data (for GARCH Analysis)",
                 yaxis_title="Scaled Values",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
+                value_label="Scaled Value",
+                value_format=".4f",
+                zero_line=True,
                 height=400,
-                margin=dict(l=50, r=50, t=80, b=50)
             )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return figure_builder.to_json(fig)
             
         except Exception as e:
             logger.error(f"Error creating scaled data plot: {e}")
@@ -748,6 +492,7 @@ class TimeSeriesPlotter:
     def create_all_plots(self) -> Dict[str, Optional[str]]:
         """
         Create all available plots and return as dictionary.
+        Figures already built for the same results are served from the plot cache.
         
         Returns:
             Dictionary mapping plot names to JSON strings (using template-expected names)
@@ -768,9 +513,11 @@ class TimeSeriesPlotter:
             'correlation_matrix': self.create_correlation_matrix
         }
         
+        options = plot_cache.render_options()
         for plot_name, plot_function in plot_functions.items():
             try:
-                plots[plot_name] = plot_function()
+                plots[plot_name] = plot_cache.get_or_create(
+                    self.content_hash, f'plotter.{plot_name}', options, plot_function)
                 status = "✓" if plots[plot_name] else "✗"
                 logger.info(f"{status} {plot_name}")
             except Exception as e:
@@ -795,35 +542,27 @@ def create_summary_statistics_table(analysis_results: Dict[str, Any]) -> Optiona
     """
     try:
         data = analysis_results.get('data', {})
-        if not data:
+        prices = {symbol: symbol_data['prices'] for symbol, symbol_data in data.items()
+                  if isinstance(symbol_data, dict) and symbol_data.get('prices')}
+        if not prices:
             return None
         
-        # Prepare statistics
-        stats = []
-        for symbol, symbol_data in data.items():
-            if isinstance(symbol_data, dict):
-                if 'prices' in symbol_data:
-                    prices = symbol_data['prices']
-                    if prices:
-                        stats.append({
-                            'Symbol': symbol,
-                            'Count': len(prices),
-                            'Mean': f"{np.mean(prices):.2f}",
-                            'Std': f"{np.std(prices):.2f}",
-                            'Min': f"{np.min(prices):.2f}",
-                            'Max': f"{np.max(prices):.2f}"
-                        })
-        
-        if not stats:
-            return None
+        # One vectorized pass over all price columns, padded to the longest
+        length = max(len(values) for values in prices.values())
+        stats = descriptive_stats.compute(
+            {'original_data': {'timestamps': [None] * length, 'symbol_data': prices}}, list(prices))
+        columns = (('Count', 'count', '{}'), ('Mean', 'mean', '{:.2f}'), ('Std', 'std', '{:.2f}'),
+                   ('Min', 'min', '{:.2f}'), ('Max', 'max', '{:.2f}'))
         
-        # Create HTML table
-        df = pd.DataFrame(stats)
-        html = df.to_html(classes='table table-striped table-hover', 
-                         table_id='summary-stats-table',
-                         escape=False, index=False)
+        rows = []
+        for symbol, values in stats['original_data'].items():
+            cells = ''.join(f'<td>{"-" if values[name] is None else fmt.format(values[name])}</td>'
+                            for _, name, fmt in columns)
+            rows.append(f'<tr><td>{escape(symbol)}</td>{cells}</tr>')
+        header = ''.join(f'<th>{label}</th>' for label, _, _ in (('Symbol', None, None), *columns))
         
-        return html
+        return (f'<table class="table table-striped table-hover" id="summary-stats-table">'
+                f'<thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>')
         
     except Exception as e:
         logger.error(f"Error creating summary statistics table: {e}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/precision.py
+
+"""
+Opt-in reduced-precision (float32) mode for stored results.
+With settings.RESULT_FLOAT_PRECISION = 'float32', every float in the
+session payloads (raw and processed results, including the data arrays) and
+in the pipeline stage cache is rounded to the nearest float32 and kept as the
+shortest decimal that identifies that float32, and plot payloads default to
+f4 typed arrays.
+
+Error bound: a stored value differs from the original by at most one float32
+ulp, i.e. a relative error of at most 2**-23 (about 1.2e-7, so 6 significant
+digits are always exact); plot arrays, which are float32 themselves, by at
+most half an ulp (2**-24). The bound holds in the float32 normal range
+(1.2e-38 to 3.4e38); smaller values lose relative precision gradually and
+larger ones are kept at full precision.
+"""
+
+import logging
+from typing import Any, List
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FLOAT32_MAX_RELATIVE_ERROR = 2.0 ** -23
+
+
+def enabled() -> bool:
+    """Whether results are stored in float32 precision."""
+    return getattr(settings, 'RESULT_FLOAT_PRECISION', 'float64') == 'float32'
+
+
+def round_float32(values: np.ndarray) -> np.ndarray:
+    """
+    Round values to float32, as float64 values holding each float32's shortest decimal.
+
+    The shortest decimal (e.g. 0.1 rather than 0.10000000149011612) keeps
+    the JSON text short. It is found by rounding to 1, 2, ... 9 significant
+    digits (9 always identifies a float32) and keeping the first rounding
+    that converts back to the same float32. Values outside the float32 range
+    are left unchanged.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(over='ignore'):
+        single = values.astype(np.float32)
+    exact = single.astype(np.float64)
+    result = exact.copy()
+    pending = np.isfinite(exact) & (exact != 0)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exponent = np.floor(np.log10(np.abs(np.where(pending, exact, 1.0))))
+        for digits in range(1, 10):
+            if not pending.any():
+                break
+            # Divide or multiply by an exact power of ten so the rounding is the nearest double
+            shift = exponent[pending] - (digits - 1)
+            x = exact[pending]
+            power = 10.0 ** np.abs(shift)
+            candidate = np.where(shift < 0, np.round(x * power) / power, np.round(x / power) * power)
+            matched = candidate.astype(np.float32) == single[pending]
+            index = np.flatnonzero(pending)[matched]
+            result[index] = candidate[matched]
+            pending[index] = False
+    return np.where(np.isfinite(single) | ~np.isfinite(values), result, values)
+
+
+def _collect(obj: Any, floats: List[float]) -> None:
+    if isinstance(obj, float):
+        floats.append(obj)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collect(value, floats)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _collect(value, floats)
+
+
+def _rebuild(obj: Any, floats) -> Any:
+    if isinstance(obj, float):
+        return next(floats)
+    if isinstance(obj, dict):
+        return {key: _rebuild(value, floats) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_rebuild(value, floats) for value in obj]
+    if isinstance(obj, tuple):
+        return tuple(_rebuild(value, floats) for value in obj)
+    return obj
+
+
+def reduce_floats(obj: Any) -> Any:
+    """
+    Return a copy of a JSON-like structure with every float rounded to float32.
+
+    All floats are gathered in one walk and converted in a single vectorized
+    call, then written back in a second walk.
+    """
+    floats: List[float] = []
+    _collect(obj, floats)
+    if not floats:
+        return obj
+    return _rebuild(obj, iter(round_float32(np.array(floats, dtype=np.float64)).tolist()))
+
+
+def for_storage(obj: Any) -> Any:
+    """obj reduced to float32 precision when the mode is enabled, unchanged otherwise."""
+    if not enabled():
+        return obj
+    try:
+        return reduce_floats(obj)
+    except Exception as e:
+        logger.warning(f"Could not reduce result precision, storing full precision: {e}")
+        return obj
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/price_analytics.py
+
+"""
+Cumulative returns, drawdowns and rolling realized volatility of every symbol.
+Prices (or, without them, the log returns) are stacked into one (row, symbol)
+array: cumulative returns are the prices relative to each symbol's first
+price, drawdowns their distance from the running maximum (np.fmax.accumulate),
+and the rolling volatility of every window length comes from one set of
+prefix sums of the returns (count, sum, sum of squares), so each window is a
+difference of two prefixes. Everything is O(rows x symbols) per window and
+computed for all symbols at once. Results are cached per dataset and
+frequency by content hash.
+"""
+
+import logging
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core.cache import cache
+
+from . import plot_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the analytics change so results cached by older code are not reused
+ANALYTICS_CACHE_VERSION = 1
+
+# Rolling volatility windows (in rows): a month, a quarter and a year of trading days
+DEFAULT_WINDOWS = (21, 63, 252)
+
+# CSV export name -> table builder name (see table())
+EXPORTS = ('cumulative_returns', 'drawdowns', 'rolling_volatility', 'max_drawdowns')
+
+
+def _matrix(data_info: Dict[str, Any], symbols: Sequence[str]) -> np.ndarray:
+    """(row, symbol) float array of a data array, None as NaN."""
+    rows = len(data_info.get('timestamps', []))
+    values = np.full((rows, len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        column = np.array((data_info.get('symbol_data', {}).get(symbol) or [])[:rows], dtype=np.float64)
+        values[:len(column), j] = column
+    return values
+
+
+def _columns(values: np.ndarray, symbols: Sequence[str]) -> Dict[str, List[Optional[float]]]:
+    """Columns of a (row, symbol) array by symbol, NaN as None."""
+    return dict(zip(symbols, np.where(np.isnan(values), None, values).T.tolist()))
+
+
+def windows_for(rows: int, windows: Sequence[int] = DEFAULT_WINDOWS) -> List[int]:
+    """The rolling windows of a sample; windows longer than half the sample are shortened to it."""
+    return sorted({min(window, rows // 2) for window in windows} - set(range(3)))
+
+
+def wealth(prices: np.ndarray) -> np.ndarray:
+    """Prices relative to each column's first price (NaN before it and where missing)."""
+    present = ~np.isnan(prices)
+    first = np.where(present.any(axis=0), prices[present.argmax(axis=0), np.arange(prices.shape[1])], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return prices / first
+
+
+def drawdowns(relative: np.ndarray) -> np.ndarray:
+    """Distance of every row from the running maximum, as a fraction (0 at new highs)."""
+    peaks = np.fmax.accumulate(relative, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return relative / peaks - 1.0
+
+
+def rolling_volatility(returns: np.ndarray, windows: Sequence[int]) -> Dict[int, np.ndarray]:
+    """
+    Sample standard deviation of the returns over every trailing window.
+
+    Rows whose window is incomplete (the first window - 1 rows, or a missing
+    return inside the window) are NaN, as with pandas' rolling().std().
+    """
+    present = ~np.isnan(returns)
+    # Centering on the column mean keeps the prefix differences accurate
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Mean of an all-missing column
+        centered = np.where(present, returns - np.nanmean(returns, axis=0), 0.0)
+    zero = np.zeros((1, returns.shape[1]))
+    count = np.concatenate([zero, np.cumsum(present, axis=0)])
+    total = np.concatenate([zero, np.cumsum(centered, axis=0)])
+    squares = np.concatenate([zero, np.cumsum(centered * centered, axis=0)])
+    result = {}
+    for window in windows:
+        volatility = np.full(returns.shape, np.nan)
+        if window <= len(returns):
+            n = count[window:] - count[:-window]
+            s = total[window:] - total[:-window]
+            ss = squares[window:] - squares[:-window]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                variance = np.maximum(ss - s * s / n, 0.0) / (n - 1)
+            volatility[window - 1:] = np.where(n == window, np.sqrt(variance), np.nan)
+        result[window] = volatility
+    return result
+
+
+def _max_drawdown(timestamps: Sequence[Any], relative: np.ndarray, drawdown: np.ndarray) -> Dict[str, Any]:
+    """Depth, peak, trough and recovery date of the deepest drawdown of one column."""
+    if np.isnan(drawdown).all():
+        return {'total_return': None, 'depth': None, 'peak': None, 'trough': None, 'recovery': None}
+    trough = int(np.nanargmin(drawdown))
+    peak = int(np.nanargmax(relative[:trough + 1]))
+    recovered = np.flatnonzero(relative[trough:] >= relative[peak])
+    last = np.flatnonzero(~np.isnan(relative))[-1]
+    return {
+        'total_return': float(relative[last] - 1.0),
+        'depth': float(drawdown[trough]),
+        'peak': timestamps[peak],
+        'trough': timestamps[trough],
+        'recovery': timestamps[trough + recovered[0]] if len(recovered) and drawdown[trough] < 0 else None,
+    }
+
+
+def compute(data_arrays: Dict[str, Any], symbols: Sequence[str],
+            windows: Sequence[int] = DEFAULT_WINDOWS) -> Dict[str, Any]:
+    """
+    Price analytics of every symbol.
+
+    Args:
+        data_arrays: ResultsProcessor data arrays; prices come from
+            'original_data', with the log returns of 'returns_data' as the
+            fallback, and volatility from 'returns_data'
+        symbols: Symbols in display order
+        windows: Rolling volatility windows in rows (see windows_for)
+
+    Returns:
+        {'cumulative_returns', 'drawdowns': {'timestamps', 'symbol_data'},
+        'rolling_volatility': {'timestamps', 'windows': {window: {symbol: values}}},
+        'max_drawdowns': {symbol: {'total_return', 'depth', 'peak', 'trough',
+        'recovery'}}}; returns and drawdowns are fractions (-0.2 is -20%)
+    """
+    prices_info = data_arrays.get('original_data') or {}
+    returns_info = data_arrays.get('returns_data') or {}
+    returns = _matrix(returns_info, symbols)
+    if prices_info.get('timestamps'):
+        timestamps = list(prices_info['timestamps'])
+        relative = wealth(_matrix(prices_info, symbols))
+    else:
+        # Compounded log returns, starting from the first return
+        timestamps = list(returns_info.get('timestamps', []))
+        relative = np.where(np.isnan(returns), np.nan, np.exp(np.nancumsum(returns, axis=0)))
+    drawdown = drawdowns(relative)
+    volatility_windows = windows_for(len(returns), windows)
+    volatility = rolling_volatility(returns, volatility_windows)
+    return {
+        'cumulative_returns': {'timestamps': timestamps, 'symbol_data': _columns(relative - 1.0, symbols)},
+        'drawdowns': {'timestamps': timestamps, 'symbol_data': _columns(drawdown, symbols)},
+        'rolling_volatility': {
+            'timestamps': list(returns_info.get('timestamps', [])),
+            'windows': {window: _columns(volatility[window], symbols) for window in volatility_windows},
+        },
+        'max_drawdowns': {symbol: _max_drawdown(timestamps, relative[:, j], drawdown[:, j])
+                          for j, symbol in enumerate(symbols)} if timestamps else {},
+    }
+
+
+def table(analytics: Dict[str, Any], name: str) -> Tuple[List[str], List[List[Any]]]:
+    """Header and rows of one of the EXPORTS."""
+    if name == 'max_drawdowns':
+        header = ['Symbol', 'total_return', 'max_drawdown', 'peak', 'trough', 'recovery']
+        return header, [[symbol, row['total_return'], row['depth'], row['peak'], row['trough'], row['recovery']]
+                        for symbol, row in analytics['max_drawdowns'].items()]
+    if name == 'rolling_volatility':
+        data = analytics['rolling_volatility']
+        columns = [(f'{symbol}_{window}', values) for window, by_symbol in data['windows'].items()
+                   for symbol, values in by_symbol.items()]
+    else:
+        data = analytics[name]
+        columns = list(data['symbol_data'].items())
+    header = ['Date'] + [column for column, _ in columns]
+    rows = [[timestamp, *(values[i] for _, values in columns)] for i, timestamp in enumerate(data['timestamps'])]
+    return header, rows
+
+
+def cached(data_hash: str, data_arrays: Dict[str, Any], symbols: Sequence[str],
+           frequency: Optional[str] = None, windows: Sequence[int] = DEFAULT_WINDOWS) -> Dict[str, Any]:
+    """compute(), cached per dataset (under the hash of its data arrays), frequency and windows."""
+    key = (f'price_analytics:v{ANALYTICS_CACHE_VERSION}:{data_hash}:{frequency or "native"}:'
+           f'{",".join(map(str, windows))}:{plot_cache.content_hash(list(symbols))}')
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute(data_arrays, symbols, windows)
+        cache.set(key, analytics)
+    return analytics
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/resampling.py
+
+"""
+Calendar resampling of the columnar data arrays (weekly, monthly, quarterly).
+Each period is a contiguous run of rows, found from the change points of a
+vectorized period id, and every symbol of a data array is aggregated at once
+with ufunc.reduceat. Prices keep the period's last value (or open, high, low,
+close for exports), returns are compounded and the scaled and GARCH series
+are averaged. Each period is labelled with the timestamp of its last row.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core.cache import cache
+
+from .trading_calendar import to_datetime64
+
+logger = logging.getLogger(__name__)
+
+# Bump when the aggregation rules change so results cached by older code are not reused
+RESAMPLE_CACHE_VERSION = 1
+
+# Query parameter value -> label; the native (daily) frequency is 'D' or no parameter
+FREQUENCIES = {
+    'W': 'Weekly',
+    'M': 'Monthly',
+    'Q': 'Quarterly',
+}
+NATIVE_FREQUENCY = 'D'
+
+# The pipeline's returns are log returns, so a period's compounded return is their sum
+AGGREGATIONS = {
+    'original_data': 'last',
+    'returns_data': 'log_sum',
+    'scaled_data': 'mean',
+    'pre_garch_data': 'mean',
+    'post_garch_data': 'mean',
+}
+
+OHLC = ('open', 'high', 'low', 'close')
+_OHLC_AGGREGATIONS = {'open': 'first', 'high': 'high', 'low': 'low', 'close': 'last'}
+
+
+def parse_frequency(value: Optional[str]) -> Optional[str]:
+    """
+    Validate a freq query parameter.
+
+    Returns:
+        'W', 'M' or 'Q', or None for the native frequency (no value or 'D')
+
+    Raises:
+        ValueError: value is not a supported frequency
+    """
+    if not value or value.upper() == NATIVE_FREQUENCY:
+        return None
+    frequency = value.upper()
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unsupported frequency {value!r}; use one of D, {', '.join(FREQUENCIES)}")
+    return frequency
+
+
+def period_ids(dates: np.ndarray, frequency: str) -> np.ndarray:
+    """Integer id of the calendar period of each datetime64 value."""
+    if frequency == 'W':
+        # Weeks end on Friday; 1970-01-03, day 2 of the epoch, is a Saturday
+        return (dates.astype('datetime64[D]').astype(np.int64) - 2) // 7
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    return months // 3 if frequency == 'Q' else months
+
+
+def period_bounds(timestamps: Sequence[Any], frequency: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of the first and last row of each period of chronologically ordered timestamps."""
+    ids = period_ids(to_datetime64(timestamps), frequency)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1)).astype(np.int64)
+    ends = np.concatenate((starts[1:] - 1, [len(ids) - 1])).astype(np.int64)
+    return starts, ends
+
+
+def _reduce(values: np.ndarray, starts: np.ndarray, how: str) -> np.ndarray:
+    """Aggregate the rows of each period of a (row, symbol) array, ignoring NaN."""
+    valid = ~np.isnan(values)
+    count = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if how in ('first', 'last'):
+            rows = np.arange(len(values))[:, None]
+            if how == 'last':
+                index = np.maximum.reduceat(np.where(valid, rows, -1), starts, axis=0)
+            else:
+                index = np.minimum.reduceat(np.where(valid, rows, len(values)), starts, axis=0)
+            picked = np.take_along_axis(values, np.clip(index, 0, len(values) - 1), axis=0)
+            return np.where(count > 0, picked, np.nan)
+        if how == 'high':
+            return np.fmax.reduceat(values, starts, axis=0)
+        if how == 'low':
+            return np.fmin.reduceat(values, starts, axis=0)
+        total = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+        if how == 'log_sum':
+            return np.where(count > 0, total, np.nan)
+        if how == 'mean':
+            return total / count
+    raise ValueError(f"Unknown aggregation {how!r}")
+
+
+def _matrix(symbol_data: Dict[str, List[Any]], symbols: Sequence[str], rows: int) -> np.ndarray:
+    values = np.full((rows, len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        column = np.array((symbol_data.get(symbol) or [])[:rows], dtype=np.float64)
+        values[:len(column), j] = column
+    return values
+
+
+def _to_lists(values: np.ndarray) -> List[List[Any]]:
+    """Columns of a (row, symbol) array as lists, NaN as None."""
+    return np.where(np.isnan(values), None, values).T.tolist()
+
+
+def resample_array(data_info: Dict[str, Any], frequency: str, how: str) -> Dict[str, Any]:
+    """Resample one data array ({'timestamps', 'symbol_data'}) with one aggregation."""
+    timestamps = data_info.get('timestamps', [])
+    symbol_data = data_info.get('symbol_data', {})
+    if not timestamps:
+        return {'timestamps': [], 'symbol_data': {symbol: [] for symbol in symbol_data}, 'count': 0}
+    symbols = list(symbol_data)
+    starts, ends = period_bounds(timestamps, frequency)
+    columns = _to_lists(_reduce(_matrix(symbol_data, symbols, len(timestamps)), starts, how))
+    return {
+        'timestamps': [timestamps[i] for i in ends],
+        'symbol_data': dict(zip(symbols, columns)),
+        'count': len(ends),
+    }
+
+
+def resample(data_arrays: Dict[str, Any], frequency: str) -> Dict[str, Any]:
+    """Resample every data array with its aggregation rule (see AGGREGATIONS)."""
+    return {
+        data_type: resample_array(data_info, frequency, AGGREGATIONS.get(data_type, 'mean'))
+        for data_type, data_info in data_arrays.items()
+    }
+
+
+def resample_ohlc(data_info: Dict[str, Any], frequency: str) -> Dict[str, Any]:
+    """
+    Open, high, low and close of each period for a price array.
+
+    Returns:
+        {'timestamps', 'symbol_data': {symbol: {'open': [...], ..., 'close': [...]}}}
+    """
+    timestamps = data_info.get('timestamps', [])
+    symbol_data = data_info.get('symbol_data', {})
+    symbols = list(symbol_data)
+    if not timestamps:
+        return {'timestamps': [], 'symbol_data': {symbol: {field: [] for field in OHLC} for symbol in symbols}}
+    starts, ends = period_bounds(timestamps, frequency)
+    values = _matrix(symbol_data, symbols, len(timestamps))
+    fields = {field: _to_lists(_reduce(values, starts, how)) for field, how in _OHLC_AGGREGATIONS.items()}
+    return {
+        'timestamps': [timestamps[i] for i in ends],
+        'symbol_data': {symbol: {field: fields[field][j] for field in OHLC} for j, symbol in enumerate(symbols)},
+    }
+
+
+def cached(data_hash: str, data_arrays: Dict[str, Any], frequency: str) -> Dict[str, Any]:
+    """resample(), cached per dataset (under the hash of its data arrays) and frequency."""
+    key = f'resample:v{RESAMPLE_CACHE_VERSION}:{data_hash}:{frequency}'
+    resampled = cache.get(key)
+    if resampled is None:
+        resampled = resample(data_arrays, frequency)
+        cache.set(key, resampled)
+    return resampled
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/result_model.py
+
+"""
+Typed model of the analysis sections of a pipeline response.
+Mirrors the paths documented in templates/timeseries/jsonpaths.txt with
+__slots__ dataclasses, so one decode step replaces the defensive .get()
+probing of nested dicts. Free-form narrative blocks (interpretations,
+critical values, parameter maps) stay plain dicts; timestamp-keyed series
+are stored as a shared index tuple plus a values tuple. Rows of the N x N
+matrix tables (pairwise spillover, FEVD) are precomputed at decode time.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .matrices import MatrixRow, matrix_rows, nested_matrix, pair_matrix, square_matrix
+
+# (threshold, css) levels of the matrix tables, highest first
+PAIRWISE_SPILLOVER_LEVELS = ((15, 'text-danger fw-bold'), (8, 'text-warning fw-medium'))
+FEVD_LEVELS = ((20, 'text-danger fw-bold'), (10, 'text-warning fw-medium'))
+
+# Template context name -> AnalysisResults attribute
+SECTION_NAMES = {
+    'stationarity_results': 'stationarity',
+    'arima_results': 'arima',
+    'garch_results': 'garch',
+    'var_results': 'var',
+    'spillover_results': 'spillover',
+    'granger_causality_results': 'granger',
+}
+
+
+@dataclass(slots=True)
+class SeriesMap:
+    """A {timestamp: value} mapping stored as two tuples; iterates like the dict it replaces."""
+
+    index: Tuple[str, ...] = ()
+    values: Tuple[Any, ...] = ()
+    # Position of each key, so get() is a dict lookup rather than a scan of index
+    _positions: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._positions = {key: i for i, key in enumerate(self.index)}
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.index
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.index, self.values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self._positions.get(key)
+        return default if position is None else self.values[position]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+
+@dataclass(slots=True)
+class StationarityTest:
+    adf_statistic: Optional[float] = None
+    p_value: Optional[float] = None
+    is_stationary: Optional[bool] = None
+    critical_values: Dict[str, float] = field(default_factory=dict)
+    optimal_lag: Optional[int] = None
+    significance_summary: Dict[str, Any] = field(default_factory=dict)
+    interpretation: Any = None
+
+
+@dataclass(slots=True)
+class SeriesStats:
+    n: Optional[float] = None
+    mean: Optional[float] = None
+    median: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    std: Optional[float] = None
+    var: Optional[float] = None
+    skew: Optional[float] = None
+    kurt: Optional[float] = None
+    annualized_vol: Optional[float] = None
+    annualized_return: Optional[float] = None
+    sharpe_approx: Optional[float] = None
+
+
+@dataclass(slots=True)
+class StationarityResults:
+    all_symbols_stationarity: Dict[str, StationarityTest] = field(default_factory=dict)
+    series_stats: Dict[str, SeriesStats] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ConditionalMeanFiltering:
+    purpose: Optional[str] = None
+    filtered_series: SeriesMap = field(default_factory=SeriesMap)
+    mean_component_removed: SeriesMap = field(default_factory=SeriesMap)
+    residual_properties: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ArimaForecasting:
+    method: Optional[str] = None
+    forecast_steps: Optional[int] = None
+    point_forecasts: List[float] = field(default_factory=list)
+    confidence_intervals: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ArimaSummary:
+    model_specification: Optional[str] = None
+    sample_size: Optional[int] = None
+    log_likelihood: Optional[float] = None
+    aic: Optional[float] = None
+    bic: Optional[float] = None
+    hqic: Optional[float] = None
+    parameters: Dict[str, float] = field(default_factory=dict)
+    parameter_pvalues: Dict[str, float] = field(default_factory=dict)
+    parameter_significance: Dict[str, str] = field(default_factory=dict)
+    residual_statistics: Dict[str, Any] = field(default_factory=dict)
+    fitted_values: SeriesMap = field(default_factory=SeriesMap)
+    residuals: SeriesMap = field(default_factory=SeriesMap)
+    conditional_mean_filtering: ConditionalMeanFiltering = field(default_factory=ConditionalMeanFiltering)
+    forecasting: ArimaForecasting = field(default_factory=ArimaForecasting)
+    full_summary: Optional[str] = None
+
+
+@dataclass(slots=True)
+class ArimaForecast:
+    point_forecasts: List[float] = field(default_factory=list)
+    forecast_steps: Optional[int] = None
+    model_specification: Optional[str] = None
+    forecast_method: Optional[str] = None
+    # Not in the documented schema, but drawn as a band when present
+    lower: List[float] = field(default_factory=list)
+    upper: List[float] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ArimaResult:
+    summary: ArimaSummary = field(default_factory=ArimaSummary)
+    forecast: ArimaForecast = field(default_factory=ArimaForecast)
+    interpretation: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class GarchResult:
+    summary: Any = None
+    forecast: List[float] = field(default_factory=list)
+    interpretation: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class VarResults:
+    fitted_model: Optional[str] = None
+    selected_lag: Optional[int] = None
+    ic_used: Optional[str] = None
+    total_parameters: Optional[int] = None
+    coefficients: Dict[str, Any] = field(default_factory=dict)
+    granger_causality: Dict[str, Any] = field(default_factory=dict)
+    fevd_matrix: List[List[float]] = field(default_factory=list)
+    fevd_interpretation: Dict[str, Any] = field(default_factory=dict)
+    interpretation: str = ''
+    fevd_rows: List[MatrixRow] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class SpilloverRow:
+    """One row of the directional spillover table."""
+
+    symbol: str
+    spillover_to: float
+    spillover_from: float
+    net_spillover: float
+
+    @property
+    def net_spillover_positive(self) -> bool:
+        return self.net_spillover > 0
+
+
+@dataclass(slots=True)
+class SpilloverResults:
+    total_spillover_index: Optional[float] = None
+    directional_spillover: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    net_spillover: Dict[str, float] = field(default_factory=dict)
+    pairwise_spillover: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    interpretation: str = ''
+    pairwise_spillover_table: List[Dict[str, Any]] = field(default_factory=list)
+    spillover_table_data: List[SpilloverRow] = field(default_factory=list)
+    pairwise_rows: List[MatrixRow] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class GrangerTest:
+    causality_1pct: Optional[bool] = None
+    causality_5pct: Optional[bool] = None
+    p_values: Dict[str, float] = field(default_factory=dict)
+    optimal_lag_1pct: Optional[int] = None
+    optimal_lag_5pct: Optional[int] = None
+    significance_summary: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class GrangerResults:
+    causality_results: Dict[str, GrangerTest] = field(default_factory=dict)
+    interpretations: Dict[str, str] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def min_p_value_matrix(self, symbols: List[str]) -> np.ndarray:
+        """matrix[i, j] = smallest p-value over the tested lags for symbols[i] -> symbols[j]."""
+        return pair_matrix({relationship: test.significance_summary.get('min_p_value')
+                            for relationship, test in self.causality_results.items()}, symbols)
+
+
+@dataclass(slots=True)
+class AnalysisResults:
+    """The analysis sections of one response; a section is None when the response lacks it."""
+
+    stationarity: Optional[StationarityResults] = None
+    arima: Dict[str, ArimaResult] = field(default_factory=dict)
+    garch: Dict[str, GarchResult] = field(default_factory=dict)
+    var: Optional[VarResults] = None
+    spillover: Optional[SpilloverResults] = None
+    granger: Optional[GrangerResults] = None
+
+    def template_context(self) -> Dict[str, Any]:
+        """The sections under the names the results templates use."""
+        return {name: getattr(self, attr) for name, attr in SECTION_NAMES.items()}
+
+
+def series_stats_table(results: AnalysisResults) -> Tuple[List[str], List[List[Any]]]:
+    """Header and rows of the series statistics, one row per symbol."""
+    header = ['Symbol', *_field_names(SeriesStats)]
+    stats = results.stationarity.series_stats if results.stationarity else {}
+    return header, [[symbol, *(getattr(row, name) for name in header[1:])] for symbol, row in stats.items()]
+
+
+def spillover_table(results: AnalysisResults) -> Tuple[List[str], List[List[Any]]]:
+    """Header and rows of the directional spillover table."""
+    header = ['Symbol', 'spillover_to', 'spillover_from', 'net_spillover']
+    rows = results.spillover.spillover_table_data if results.spillover else []
+    return header, [[row.symbol, row.spillover_to, row.spillover_from, row.net_spillover] for row in rows]
+
+
+# CSV export name -> table builder
+RESULT_TABLES: Dict[str, Callable[[AnalysisResults], Tuple[List[str], List[List[Any]]]]] = {
+    'series_stats': series_stats_table,
+    'spillover': spillover_table,
+}
+
+
+class _Decoder:
+    """
+    Builds model objects from response dicts.
+
+    Index tuples of timestamp-keyed series are shared between series with the
+    same timestamps (fitted values, residuals, filtered series, ...).
+    """
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def series(self, data: Any) -> SeriesMap:
+        if not isinstance(data, dict) or not data:
+            return SeriesMap()
+        index = tuple(data)
+        return SeriesMap(self._indexes.setdefault(index, index), tuple(data.values()))
+
+    def record(self, cls: type, data: Any, nested: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Any:
+        """Fill the fields of cls from a dict, decoding the nested ones; unknown keys are dropped."""
+        if not isinstance(data, dict):
+            return cls()
+        values = {}
+        for name in _field_names(cls):
+            if name in data:
+                value = data[name]
+                values[name] = nested[name](value) if nested and name in nested else value
+        return cls(**values)
+
+    def arima(self, data: Any) -> ArimaResult:
+        if not isinstance(data, dict):
+            return ArimaResult()
+        summary = self.record(ArimaSummary, data.get('summary'), {
+            'fitted_values': self.series,
+            'residuals': self.series,
+            'conditional_mean_filtering': lambda value: self.record(ConditionalMeanFiltering, value, {
+                'filtered_series': self.series,
+                'mean_component_removed': self.series,
+            }),
+            'forecasting': lambda value: self.record(ArimaForecasting, value),
+        })
+        return ArimaResult(
+            summary=summary,
+            forecast=self.record(ArimaForecast, data.get('forecast')),
+            interpretation=data.get('interpretation', {}),
+        )
+
+    def stationarity(self, data: Any) -> StationarityResults:
+        tests = data.get('all_symbols_stationarity', {}) or {}
+        if 'all_symbols_stationarity' in tests:  # The backend nests this key twice
+            tests = tests['all_symbols_stationarity']
+        return StationarityResults(
+            all_symbols_stationarity={symbol: self.record(StationarityTest, test) for symbol, test in tests.items()},
+            series_stats={symbol: self.record(SeriesStats, stats)
+                          for symbol, stats in (data.get('series_stats', {}) or {}).items()},
+        )
+
+    def spillover(self, data: Any, symbols: List[str]) -> SpilloverResults:
+        result = self.record(SpilloverResults, data)
+        result.spillover_table_data = [
+            SpilloverRow(
+                symbol=symbol,
+                spillover_to=(result.directional_spillover.get(symbol) or {}).get('to', 0),
+                spillover_from=(result.directional_spillover.get(symbol) or {}).get('from', 0),
+                net_spillover=result.net_spillover.get(symbol, 0),
+            )
+            for symbol in symbols
+        ] if isinstance(data, dict) else []
+        if result.pairwise_spillover:
+            result.pairwise_rows = matrix_rows(
+                symbols, nested_matrix(result.pairwise_spillover, symbols),
+                PAIRWISE_SPILLOVER_LEVELS, 'text-muted', 'text-muted')
+        return result
+
+    def var(self, data: Any, symbols: List[str]) -> VarResults:
+        result = self.record(VarResults, data)
+        fevd = square_matrix(result.fevd_matrix, len(symbols)) if result.fevd_matrix else None
+        if fevd is not None:
+            result.fevd_rows = matrix_rows(symbols, fevd, FEVD_LEVELS, 'text-muted', 'text-primary fw-bold')
+        return result
+
+    def granger(self, data: Any) -> GrangerResults:
+        return self.record(GrangerResults, data, {
+            'causality_results': lambda tests: {
+                relationship: self.record(GrangerTest, test) for relationship, test in (tests or {}).items()
+            },
+        })
+
+
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def decode(raw_results: Dict[str, Any], symbols: Optional[List[str]] = None) -> AnalysisResults:
+    """
+    Decode the analysis sections of a pipeline response.
+
+    Args:
+        raw_results: Response dict (the data arrays are not read)
+        symbols: Row and column order of the spillover and FEVD tables;
+            defaults to the symbols of the spillover result
+
+    Returns:
+        AnalysisResults; sections missing from the response are None (or
+        empty for the per-symbol ARIMA and GARCH maps)
+    """
+    decoder = _Decoder()
+    results = AnalysisResults()
+    if symbols is None:
+        spillover = raw_results.get('spillover_results')
+        symbols = list(spillover.get('net_spillover') or {}) if isinstance(spillover, dict) else []
+
+    if 'stationarity_results' in raw_results:
+        stationarity = raw_results['stationarity_results']
+        results.stationarity = decoder.stationarity(stationarity if isinstance(stationarity, dict) else {})
+
+    arima = raw_results.get('arima_results') or {}
+    if isinstance(arima, dict):
+        results.arima = {symbol: decoder.arima(result)
+                         for symbol, result in (arima.get('all_symbols_arima') or {}).items()}
+
+    garch = raw_results.get('garch_results') or {}
+    if isinstance(garch, dict):
+        results.garch = {symbol: decoder.record(GarchResult, result)
+                         for symbol, result in (garch.get('all_symbols_garch') or {}).items()}
+
+    if 'var_results' in raw_results:
+        results.var = decoder.var(raw_results['var_results'], symbols)
+
+    if 'spillover_results' in raw_results:
+        results.spillover = decoder.spillover(raw_results['spillover_results'], symbols)
+
+    if 'granger_causality_results' in raw_results:
+        results.granger = decoder.granger(raw_results['granger_causality_results'])
+
+    return results
@@ -7,10 +7,14 @@ Processes raw API results into structured format for visualization and display.
 """
 
 import logging
-import pandas as pd
-import numpy as np
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from django.conf import settings
+
+from . import (correlation_index, descriptive_stats, diagnostics, figure_builder, garch_forecast, plot_cache,
+               price_analytics, resampling, result_model, sparklines, trading_calendar)
+from .downsampling import DEFAULT_MAX_POINTS, downsample_columns
+from .streaming import STREAMED_ARRAYS_KEY
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +24,103 @@ class ResultsProcessor:
     Processes raw time series analysis results from the API into structured format.
     Handles the complete API response structure according to your JSON paths.
     """
+
+    # Plot key -> how to draw one of the data arrays as a multi-symbol line chart
+    SERIES_PLOTS = {
+        'original_data_stats': {
+            'description': 'original data',
+            'data_type': 'original_data',
+            'title': 'Original Price Data - Statistical Analysis Context',
+            'yaxis_title': 'Price',
+            'value_label': 'Price',
+            'value_format': '.2f',
+            'line_width': 2,
+            'zero_line': False,
+            'layout': {'yaxis': {'rangemode': 'tozero'}},  # Set y-axis minimum to 0
+        },
+        'returns_data_plot': {
+            'description': 'returns data',
+            'data_type': 'returns_data',
+            'title': 'Daily Returns - Logarithmic Returns',
+            'yaxis_title': 'Return',
+            'value_label': 'Return',
+            'value_format': '.6f',
+            'line_width': 1.5,
+            'zero_line': True,
+        },
+        'scaled_data_plot': {
+            'description': 'scaled data',
+            'data_type': 'scaled_data',
+            'title': 'Scaled Data - Standardized for GARCH Analysis',
+            'yaxis_title': 'Scaled Value',
+            'value_label': 'Scaled Value',
+            'value_format': '.4f',
+            'line_width': 1.5,
+            'zero_line': True,
+        },
+        'pre_garch_plot': {
+            'description': 'pre-GARCH data',
+            'data_type': 'pre_garch_data',
+            'title': 'Pre-GARCH Data - Input to GARCH Model',
+            'yaxis_title': 'Pre-GARCH Value',
+            'value_label': 'Pre-GARCH Value',
+            'value_format': '.4f',
+            'line_width': 1.5,
+            'zero_line': True,
+        },
+        'post_garch_plot': {
+            'description': 'post-GARCH data',
+            'data_type': 'post_garch_data',
+            'title': 'Post-GARCH Data - GARCH Model Output',
+            'yaxis_title': 'Post-GARCH Value',
+            'value_label': 'Post-GARCH Value',
+            'value_format': '.4f',
+            'line_width': 1.5,
+            'zero_line': False,
+        },
+    }
+
+    # Line dash of each rolling volatility window, shortest window first
+    VOLATILITY_WINDOW_DASHES = ('solid', 'dash', 'dot')
+
+    # Residual diagnostics group -> description of its ACF/PACF plot
+    DIAGNOSTICS_PLOTS = {
+        'arima': 'ARIMA Residual',
+        'garch': 'Post-GARCH',
+    }
     
-    def __init__(self, raw_results: Dict[str, Any]):
+    def __init__(self, raw_results: Dict[str, Any], max_points_per_trace: Optional[int] = None,
+                 data_arrays: Optional[Dict[str, Any]] = None, frequency: Optional[str] = None,
+                 content_hash: Optional[str] = None):
         """
         Initialize the processor with raw API results.
         
         Args:
             raw_results: Dictionary containing raw results from the API
+            max_points_per_trace: Point budget per plotted series; defaults to
+                settings.PLOT_MAX_POINTS_PER_TRACE
+            data_arrays: Columnar data arrays already built while streaming the
+                response (see streaming.parse_pipeline_response); the row
+                lists are then absent from raw_results
+            frequency: Calendar frequency of the series plots ('W', 'M' or
+                'Q', see resampling.FREQUENCIES); None plots the native data
+            content_hash: The content_hash of these results when it is
+                already known (stored with them in the session), so it is not
+                computed again
         """
         self.raw_results = raw_results
+        self._data_arrays = data_arrays
+        self.frequency = frequency
         self.symbols = self._extract_symbols()
+        self.max_points_per_trace = max_points_per_trace or getattr(
+            settings, 'PLOT_MAX_POINTS_PER_TRACE', DEFAULT_MAX_POINTS)
+        if data_arrays is not None:
+            self._align_data_arrays(data_arrays)
+        # Series referenced by the plots, shipped to the page once
+        self.plot_dataset = figure_builder.PlotDataset()
+        self._content_hash = content_hash
+        self._data_hash = None
+        self._model = None
         
     def _extract_symbols(self) -> List[str]:
         """Extract symbol names from the analysis results."""
@@ -46,6 +137,12 @@ class ResultsProcessor:
             first_row = self.raw_results['original_data'][0]
             symbols = [key for key in first_row.keys() if key not in ['index', 'Date']]
             
+        # From streamed data arrays
+        elif self._data_arrays:
+            first = self._data_arrays.get('returns_data') or self._data_arrays.get('original_data') \
+                or next(iter(self._data_arrays.values()))
+            symbols = list(first.get('symbol_data', {}).keys())
+            
         # From execution_configuration
         elif 'execution_configuration' in self.raw_results:
             config = self.raw_results['execution_configuration']
@@ -68,14 +165,14 @@ class ResultsProcessor:
 
     def process_execution_configuration(self) -> Dict[str, Any]:
         """Process execution configuration data."""
-        logger.info(f"DEBUG: Raw results top-level keys: {list(self.raw_results.keys())}")
+        logger.debug("Raw results top-level keys: %s", list(self.raw_results.keys()))
         
         if 'execution_configuration' not in self.raw_results:
-            logger.info("DEBUG: execution_configuration key not found in raw_results")
+            logger.debug("execution_configuration key not found in raw_results")
             return {}
             
         config = self.raw_results['execution_configuration']
-        logger.info(f"DEBUG: execution_configuration found with keys: {list(config.keys()) if config else 'None'}")
+        logger.debug("execution_configuration found with keys: %s", list(config.keys()) if config else None)
         
         data_source = config.get('data_source', {})
         # Format symbols and synthetic_anchor_prices for display
@@ -91,8 +188,18 @@ class ResultsProcessor:
             'execution_metadata': config.get('execution_metadata', {})
         }
     
+    @property
+    def data_arrays(self) -> Dict[str, Any]:
+        """Columnar data arrays, built once and shared by processing and plotting."""
+        if self._data_arrays is None:
+            self._data_arrays = self.process_data_arrays()
+        return self._data_arrays
+
     def process_data_arrays(self) -> Dict[str, Any]:
         """Process all data arrays (original_data, returns_data, etc.)"""
+        if self._data_arrays is not None:
+            return self._data_arrays
+
         data_arrays = {}
         
         # Process each data array type
@@ -102,19 +209,35 @@ class ResultsProcessor:
                 
         return data_arrays
     
+    @property
+    def data_hash(self) -> str:
+        """Hash of the data arrays alone, the same whether they were streamed or not."""
+        if self._data_hash is None:
+            self._data_hash = plot_cache.content_hash(self.data_arrays)
+        return self._data_hash
+
+    @property
+    def display_arrays(self) -> Dict[str, Any]:
+        """The data arrays resampled to self.frequency (the native arrays when None)."""
+        if not self.frequency:
+            return self.data_arrays
+        return resampling.cached(self.data_hash, self.data_arrays, self.frequency)
+
+    def _align_data_arrays(self, data_arrays: Dict[str, Any]) -> None:
+        """Give prebuilt data arrays exactly one column per symbol, as _process_data_array does."""
+        for data_info in data_arrays.values():
+            symbol_data = data_info.get('symbol_data', {})
+            count = len(next(iter(symbol_data.values()), []))
+            data_info['symbol_data'] = {
+                symbol: symbol_data.get(symbol, [None] * count) for symbol in self.symbols
+            }
+
     def _process_data_array(self, data_array: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Process a single data array into structured format."""
         if not data_array:
             return {}
             
-        # DEBUG: Let's see what the raw data looks like
-        logger.info(f"DEBUG: Processing data array with {len(data_array)} rows")
-        if len(data_array) > 0:
-            logger.info(f"DEBUG: First row: {data_array[0]}")
-        if len(data_array) > 1:
-            logger.info(f"DEBUG: Second row: {data_array[1]}")
-        if len(data_array) > 2:
-            logger.info(f"DEBUG: Third row: {data_array[2]}")
+        logger.debug("Processing data array with %d rows", len(data_array))
             
         # Extract timestamps - check for both 'Date' and 'index' fields
         timestamps = []
@@ -128,9 +251,7 @@ class ResultsProcessor:
         
         for symbol in self.symbols:
             # Get the symbol value from each row, preserving order and handling missing values
-            symbol_values = [row.get(symbol) for row in data_array]
-            logger.info(f"DEBUG: Symbol {symbol} first 3 values: {symbol_values[:3]}")
-            symbol_data[symbol] = symbol_values
+            symbol_data[symbol] = [row.get(symbol) for row in data_array]
             
         return {
             'timestamps': timestamps,
@@ -138,830 +259,572 @@ class ResultsProcessor:
             'count': len(timestamps)
         }
 
+    @property
+    def model(self) -> result_model.AnalysisResults:
+        """Typed analysis sections, decoded once from the raw results."""
+        if self._model is None:
+            self._model = result_model.decode(self.raw_results, self.symbols)
+        return self._model
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the raw API results, used to key the figure cache."""
+        if self._content_hash is None:
+            content = self.raw_results
+            if STREAMED_ARRAYS_KEY in self.raw_results:
+                # The row lists were streamed into data arrays instead
+                content = [self.raw_results, self.data_arrays]
+            self._content_hash = plot_cache.content_hash(content)
+        return self._content_hash
+
+    def _cached_plot(self, plot_name: str, build) -> Any:
+        """
+        Return a plot from the figure cache, building it on a miss.
+
+        The dataset columns a plot references are cached with it and restored
+        into self.plot_dataset on a hit.
+        """
+        def build_entry():
+            with self.plot_dataset.record() as columns:
+                plot = build()
+            return {'plot': plot, 'columns': columns} if plot else None
+
+        options = plot_cache.render_options(max_points=self.max_points_per_trace)
+        entry = plot_cache.get_or_create(self.content_hash, plot_name, options, build_entry)
+        if not entry:
+            return None
+        for data_type, symbol, x, y in entry['columns']:
+            if (data_type, symbol) not in self.plot_dataset:
+                self.plot_dataset.add(data_type, symbol, x, y)
+        return entry['plot']
+
     def create_plots(self) -> Dict[str, Any]:
-        """Create Plotly plots for statistical analysis."""
+        """
+        Create Plotly plots for statistical analysis.
+
+        Plots are figure specs whose series live in self.plot_dataset, so each
+        series is shipped once however many figures draw it. Plots already
+        built for the same results are served from the plot cache.
+        """
         plots = {}
         
         try:
-            # Import here to avoid circular imports
-            from .plotting_utils import TimeSeriesPlotter
-            
-            # Create plotter with raw results
-            plotter = TimeSeriesPlotter(self.raw_results)
-            
-            # Generate original data plot for statistical tests section
-            original_data_plot = self._create_original_data_plot_for_stats()
-            if original_data_plot:
-                plots['original_data_stats'] = original_data_plot
-                logger.info("✓ Created original data plot for statistical tests")
-            else:
-                logger.warning("✗ Failed to create original data plot for statistical tests")
-
-            # Generate additional data transformation plots
-            returns_plot = self._create_returns_plot()
-            if returns_plot:
-                plots['returns_data_plot'] = returns_plot
-                logger.info("✓ Created returns data plot")
-            else:
-                logger.warning("✗ Failed to create returns data plot")
-
-            scaled_plot = self._create_scaled_data_plot()
-            if scaled_plot:
-                plots['scaled_data_plot'] = scaled_plot
-                logger.info("✓ Created scaled data plot")
-            else:
-                logger.warning("✗ Failed to create scaled data plot")
-
-            pre_garch_plot = self._create_pre_garch_plot()
-            if pre_garch_plot:
-                plots['pre_garch_plot'] = pre_garch_plot
-                logger.info("✓ Created pre-GARCH data plot")
-            else:
-                logger.warning("✗ Failed to create pre-GARCH data plot")
+            # Generate the data series plots (original, returns, scaled, pre/post-GARCH)
+            # at the selected calendar frequency, cached separately per frequency
+            for plot_key, spec in self.SERIES_PLOTS.items():
+                plot_name = f'{plot_key}:{self.frequency}' if self.frequency else plot_key
+                series_plot = self._cached_plot(plot_name, lambda spec=spec: self._create_series_plot(spec))
+                if series_plot:
+                    plots[plot_key] = series_plot
+                    logger.info(f"✓ Created {spec['description']} plot")
+                else:
+                    logger.warning(f"✗ Failed to create {spec['description']} plot")
 
-            post_garch_plot = self._create_post_garch_plot()
-            if post_garch_plot:
-                plots['post_garch_plot'] = post_garch_plot
-                logger.info("✓ Created post-GARCH data plot")
-            else:
-                logger.warning("✗ Failed to create post-GARCH data plot")
+            # Generate the cumulative return, drawdown and rolling volatility plots at the same frequency
+            for plot_key, (description, build) in self._price_analytics_plots().items():
+                plot_name = f'{plot_key}:{self.frequency}' if self.frequency else plot_key
+                analytics_plot = self._cached_plot(plot_name, build)
+                if analytics_plot:
+                    plots[plot_key] = analytics_plot
+                    logger.info(f"✓ Created {description} plot")
 
             # Generate ARIMA analysis plots
-            arima_plots = self._create_arima_plots()
+            arima_plots = self._cached_plot('arima_analysis', self._create_arima_plots)
             if arima_plots:
                 plots.update(arima_plots)
                 logger.info(f"✓ Created {len(arima_plots)} ARIMA analysis plots")
             else:
                 logger.warning("✗ Failed to create ARIMA analysis plots")
+
+            # Generate the volatility forecasts extended locally from the GARCH parameters
+            garch_forecast_plot = self._cached_plot('garch_volatility_forecast', self._create_garch_forecast_plot)
+            if garch_forecast_plot:
+                plots['garch_volatility_forecast'] = garch_forecast_plot
+                logger.info("✓ Created GARCH volatility forecast plot")
+
+            # Generate the ACF/PACF bar plots of the ARIMA residuals and the post-GARCH series
+            for group, description in self.DIAGNOSTICS_PLOTS.items():
+                plot_key = f'{group}_residual_diagnostics'
+                diagnostics_plot = self._cached_plot(
+                    plot_key, lambda group=group, description=description:
+                    self._create_residual_diagnostics_plot(group, description))
+                if diagnostics_plot:
+                    plots[plot_key] = diagnostics_plot
+                    logger.info(f"✓ Created {description} diagnostics plot")
+
+            # Generate the full-period and rolling return correlations from the prefix-sum index
+            correlation_heatmap = self._cached_plot('correlation_heatmap', self._create_correlation_heatmap)
+            if correlation_heatmap:
+                plots['correlation_heatmap'] = correlation_heatmap
+            rolling_correlation = self._cached_plot('rolling_correlation', self._create_rolling_correlation_plot)
+            if rolling_correlation:
+                plots['rolling_correlation'] = rolling_correlation
+                logger.info("✓ Created rolling correlation plot")
+
+            # Generate the Granger causality p-value heatmap
+            granger_heatmap = self._cached_plot('granger_heatmap', self._create_granger_heatmap)
+            if granger_heatmap:
+                plots['granger_heatmap'] = granger_heatmap
+                logger.info("✓ Created Granger causality heatmap")
                 
         except Exception as e:
             logger.error(f"Error creating plots: {e}")
             
         return plots
 
-    def _create_original_data_plot_for_stats(self) -> Optional[str]:
-        """Create an original data plot specifically for the Statistical Tests section."""
-        try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            
-            if 'original_data' not in self.raw_results or not self.raw_results['original_data']:
-                print("DEBUG: No original_data found in raw_results")
-                logger.error("DEBUG: No original_data found in raw_results")
-                return None
-                
-            fig = go.Figure()
-            color_palette = px.colors.qualitative.Set2
-            
-            # Extract data from the original_data array
-            original_data = self.raw_results['original_data']
-            print(f"DEBUG: Original data has {len(original_data)} rows")
-            print(f"DEBUG: First few rows: {original_data[:3] if len(original_data) >= 3 else original_data}")
-            print(f"DEBUG: Detected symbols: {self.symbols}")
-            
-            # Get timestamps - check for both 'Date' and 'index' fields
-            timestamps = []
-            for row in original_data:
-                if 'Date' in row:
-                    timestamps.append(row['Date'])
-                elif 'index' in row:
-                    timestamps.append(row['index'])
-                else:
-                    # If neither field exists, we can't create the plot
-                    print(f"DEBUG: No timestamp field found in row: {row}")
-                    
-            print(f"DEBUG: Extracted {len(timestamps)} timestamps")
-            print(f"DEBUG: First few timestamps: {timestamps[:5] if len(timestamps) >= 5 else timestamps}")
-            
-            if not timestamps:
-                print("DEBUG: No timestamps found - cannot create plot")
-                logger.error("DEBUG: No timestamps found - cannot create plot")
-                return None
-            
-            # Add trace for each symbol
-            for i, symbol in enumerate(self.symbols):
-                prices = []
-                symbol_timestamps = []
-                
-                for j, row in enumerate(original_data):
-                    if row.get(symbol) is not None and j < len(timestamps):
-                        prices.append(row[symbol])
-                        symbol_timestamps.append(timestamps[j])
-                
-                print(f"DEBUG: Symbol {symbol} - extracted {len(prices)} prices, {len(symbol_timestamps)} timestamps")
-                print(f"DEBUG: Symbol {symbol} first few prices: {prices[:5] if len(prices) >= 5 else prices}")
-                
-                if prices and symbol_timestamps:
-                    color = color_palette[i % len(color_palette)]
-                    fig.add_trace(go.Scatter(
-                        x=symbol_timestamps,
-                        y=prices,
-                        mode='lines',
-                        name=symbol,
-                        line=dict(color=color, width=2),
-                        hovertemplate=f'<b>{symbol}</b><br>' +
-                                    'Date: %{x}<br>' +
-                                    'Price: %{y:.2f}<br>' +
-                                    '<extra></extra>'
-                    ))
-                    print(f"DEBUG: Successfully added trace for {symbol}")
-                else:
-                    print(f"DEBUG: No data to plot for symbol {symbol}")
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Original Price Data - Statistical Analysis Context",
-                    x=0.5,
-                    font=dict(size=18)
-                ),
-                xaxis_title="Date",
-                yaxis_title="Price",
-                yaxis=dict(rangemode='tozero'),  # Set y-axis minimum to 0
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=500,  # Increased height for wider appearance
-                margin=dict(l=40, r=40, t=80, b=60)  # Reduced margins and made plot wider
-            )
-            
-            print("DEBUG: Successfully created plot JSON")
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-            
-        except Exception as e:
-            print(f"ERROR: Error creating original data plot for stats: {e}")
-            logger.error(f"Error creating original data plot for stats: {e}")
-            import traceback
-            traceback.print_exc()
-            logger.error(f"DEBUG: Full traceback: {traceback.format_exc()}")
-            return None
+    @classmethod
+    def series_window(cls, data_arrays: Dict[str, Any], symbols: List[str], data_type: str,
+                      max_points: int, start: Optional[str] = None,
+                      end: Optional[str] = None) -> List[tuple]:
+        """
+        Return (symbol, timestamps, values) per symbol, skipping missing values.
 
-    def _create_returns_plot(self) -> Optional[str]:
-        """Create a returns data plot."""
-        try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            
-            if 'returns_data' not in self.raw_results or not self.raw_results['returns_data']:
-                return None
-                
-            fig = go.Figure()
-            color_palette = px.colors.qualitative.Set2
-            
-            # Extract data from the returns_data array
-            returns_data = self.raw_results['returns_data']
-            
-            # Get timestamps - check for both 'Date' and 'index' fields
-            timestamps = []
-            for row in returns_data:
-                if 'Date' in row:
-                    timestamps.append(row['Date'])
-                elif 'index' in row:
-                    timestamps.append(row['index'])
-            
-            # Add trace for each symbol
-            for i, symbol in enumerate(self.symbols):
-                returns = []
-                symbol_timestamps = []
-                
-                for j, row in enumerate(returns_data):
-                    if row.get(symbol) is not None and j < len(timestamps):
-                        returns.append(row[symbol])
-                        symbol_timestamps.append(timestamps[j])
-                
-                if returns and symbol_timestamps:
-                    color = color_palette[i % len(color_palette)]
-                    fig.add_trace(go.Scatter(
-                        x=symbol_timestamps,
-                        y=returns,
-                        mode='lines',
-                        name=symbol,
-                        line=dict(color=color, width=1.5),
-                        hovertemplate=f'<b>{symbol}</b><br>' +
-                                    'Date: %{x}<br>' +
-                                    'Return: %{y:.6f}<br>' +
-                                    '<extra></extra>'
-                    ))
-            
-            # Add zero line
-            fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Daily Returns - Logarithmic Returns",
-                    x=0.5,
-                    font=dict(size=18)
-                ),
-                xaxis_title="Date",
-                yaxis_title="Return",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=500,  # Increased height for wider appearance
-                margin=dict(l=40, r=40, t=80, b=60)  # Reduced margins and made plot wider
-            )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-            
-        except Exception as e:
-            logger.error(f"Error creating returns plot: {e}")
-            return None
+        Series longer than max_points are downsampled with LTTB; start/end
+        restrict the result to a visible x range.
+        """
+        data_info = data_arrays.get(data_type, {})
+        symbol_data = data_info.get('symbol_data', {})
+        return downsample_columns(
+            data_info.get('timestamps', []),
+            {symbol: symbol_data.get(symbol, []) for symbol in symbols},
+            max_points, start=start, end=end,
+        )
 
-    def _create_scaled_data_plot(self) -> Optional[str]:
-        """Create a scaled data plot."""
-        try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            
-            if 'scaled_data' not in self.raw_results or not self.raw_results['scaled_data']:
-                return None
-                
-            fig = go.Figure()
-            color_palette = px.colors.qualitative.Set2
-            
-            # Extract data from the scaled_data array
-            scaled_data = self.raw_results['scaled_data']
-            
-            # Get timestamps - check for both 'Date' and 'index' fields
-            timestamps = []
-            for row in scaled_data:
-                if 'Date' in row:
-                    timestamps.append(row['Date'])
-                elif 'index' in row:
-                    timestamps.append(row['index'])
-            
-            # Add trace for each symbol
-            for i, symbol in enumerate(self.symbols):
-                scaled_values = []
-                symbol_timestamps = []
-                
-                for j, row in enumerate(scaled_data):
-                    if row.get(symbol) is not None and j < len(timestamps):
-                        scaled_values.append(row[symbol])
-                        symbol_timestamps.append(timestamps[j])
-                
-                if scaled_values and symbol_timestamps:
-                    color = color_palette[i % len(color_palette)]
-                    fig.add_trace(go.Scatter(
-                        x=symbol_timestamps,
-                        y=scaled_values,
-                        mode='lines',
-                        name=symbol,
-                        line=dict(color=color, width=1.5),
-                        hovertemplate=f'<b>{symbol}</b><br>' +
-                                    'Date: %{x}<br>' +
-                                    'Scaled Value: %{y:.4f}<br>' +
-                                    '<extra></extra>'
-                    ))
-            
-            # Add zero line
-            fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Scaled Data - Standardized for GARCH Analysis",
-                    x=0.5,
-                    font=dict(size=18)
-                ),
-                xaxis_title="Date",
-                yaxis_title="Scaled Value",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=500,  # Increased height for wider appearance
-                margin=dict(l=40, r=40, t=80, b=60)  # Reduced margins and made plot wider
-            )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-            
-        except Exception as e:
-            logger.error(f"Error creating scaled data plot: {e}")
-            return None
+    def _series_for(self, data_type: str) -> List[tuple]:
+        """Return the downsampled (symbol, timestamps, values) series for a data array."""
+        return self.series_window(self.data_arrays, self.symbols, data_type, self.max_points_per_trace)
 
-    def _create_pre_garch_plot(self) -> Optional[str]:
-        """Create a pre-GARCH data plot."""
+    def _create_series_plot(self, spec: Dict[str, Any]) -> Optional[str]:
+        """Create a multi-symbol line plot for one of the data arrays described in SERIES_PLOTS."""
         try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            
-            if 'pre_garch_data' not in self.raw_results or not self.raw_results['pre_garch_data']:
+            data_type = spec['data_type']
+            if not self.display_arrays.get(data_type, {}).get('timestamps'):
+                logger.debug(f"No {data_type} timestamps found - cannot create plot")
                 return None
-                
-            fig = go.Figure()
-            color_palette = px.colors.qualitative.Set2
-            
-            # Extract data from the pre_garch_data array
-            pre_garch_data = self.raw_results['pre_garch_data']
-            
-            # Get timestamps - check for both 'Date' and 'index' fields
-            timestamps = []
-            for row in pre_garch_data:
-                if 'Date' in row:
-                    timestamps.append(row['Date'])
-                elif 'index' in row:
-                    timestamps.append(row['index'])
-            
-            # Add trace for each symbol
-            for i, symbol in enumerate(self.symbols):
-                pre_garch_values = []
-                symbol_timestamps = []
-                
-                for j, row in enumerate(pre_garch_data):
-                    if row.get(symbol) is not None and j < len(timestamps):
-                        pre_garch_values.append(row[symbol])
-                        symbol_timestamps.append(timestamps[j])
-                
-                if pre_garch_values and symbol_timestamps:
-                    color = color_palette[i % len(color_palette)]
-                    fig.add_trace(go.Scatter(
-                        x=symbol_timestamps,
-                        y=pre_garch_values,
-                        mode='lines',
-                        name=symbol,
-                        line=dict(color=color, width=1.5),
-                        hovertemplate=f'<b>{symbol}</b><br>' +
-                                    'Date: %{x}<br>' +
-                                    'Pre-GARCH Value: %{y:.4f}<br>' +
-                                    '<extra></extra>'
-                    ))
-            
-            # Add zero line
-            fig.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Pre-GARCH Data - Input to GARCH Model",
-                    x=0.5,
-                    font=dict(size=18)
-                ),
-                xaxis_title="Date",
-                yaxis_title="Pre-GARCH Value",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=500,  # Increased height for wider appearance
-                margin=dict(l=40, r=40, t=80, b=60)  # Reduced margins and made plot wider
-            )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-            
-        except Exception as e:
-            logger.error(f"Error creating pre-GARCH plot: {e}")
-            return None
 
-    def _create_post_garch_plot(self) -> Optional[str]:
-        """Create a post-GARCH data plot."""
-        try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            
-            if 'post_garch_data' not in self.raw_results or not self.raw_results['post_garch_data']:
-                return None
-                
-            fig = go.Figure()
-            color_palette = px.colors.qualitative.Set2
-            
-            # Extract data from the post_garch_data array
-            post_garch_data = self.raw_results['post_garch_data']
-            
-            # Get timestamps - check for both 'Date' and 'index' fields
-            timestamps = []
-            for row in post_garch_data:
-                if 'Date' in row:
-                    timestamps.append(row['Date'])
-                elif 'index' in row:
-                    timestamps.append(row['index'])
-            
-            # Add trace for each symbol
-            for i, symbol in enumerate(self.symbols):
-                post_garch_values = []
-                symbol_timestamps = []
-                
-                for j, row in enumerate(post_garch_data):
-                    if row.get(symbol) is not None and j < len(timestamps):
-                        post_garch_values.append(row[symbol])
-                        symbol_timestamps.append(timestamps[j])
-                
-                if post_garch_values and symbol_timestamps:
-                    color = color_palette[i % len(color_palette)]
-                    fig.add_trace(go.Scatter(
-                        x=symbol_timestamps,
-                        y=post_garch_values,
-                        mode='lines',
-                        name=symbol,
-                        line=dict(color=color, width=1.5),
-                        hovertemplate=f'<b>{symbol}</b><br>' +
-                                    'Date: %{x}<br>' +
-                                    'Post-GARCH Value: %{y:.4f}<br>' +
-                                    '<extra></extra>'
-                    ))
-            
-            # Update layout
-            fig.update_layout(
-                title=dict(
-                    text="Post-GARCH Data - GARCH Model Output",
-                    x=0.5,
-                    font=dict(size=18)
-                ),
-                xaxis_title="Date",
-                yaxis_title="Post-GARCH Value",
-                hovermode='x unified',
-                template='plotly_white',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
+            title = spec['title']
+            # Resampled series get their own dataset key; the ARIMA plots still use the native ones
+            dataset_key = data_type
+            if self.frequency:
+                title = f"{title} ({resampling.FREQUENCIES[self.frequency]})"
+                dataset_key = f'{data_type}:{self.frequency}'
+
+            fig = figure_builder.series_figure(
+                self.series_window(self.display_arrays, self.symbols, data_type, self.max_points_per_trace),
+                title_text=title,
+                yaxis_title=spec['yaxis_title'],
+                value_label=spec['value_label'],
+                value_format=spec['value_format'],
+                line_width=spec['line_width'],
+                zero_line=spec['zero_line'],
                 height=500,  # Increased height for wider appearance
-                margin=dict(l=40, r=40, t=80, b=60)  # Reduced margins and made plot wider
+                title_size=18,
+                layout_margin=figure_builder.margin(l=40, r=40, t=80, b=60),  # Reduced margins and made plot wider
+                **spec.get('layout', {}),
             )
-            
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-            
+            sources = [self.plot_dataset.add(dataset_key, trace['name'], trace['x'], trace['y'])
+                       for trace in fig['data']]
+            return figure_builder.to_json(figure_builder.figure_spec(fig, sources))
+
         except Exception as e:
-            logger.error(f"Error creating post-GARCH plot: {e}")
+            logger.error(f"Error creating {spec.get('description', 'series')} plot: {e}")
             return None
     
     def _create_arima_plots(self) -> Dict[str, str]:
         """Create ARIMA analysis plots for each symbol, Series tab style: one subplot per symbol, clean layout."""
         arima_plots = {}
         try:
-            import plotly.graph_objects as go
-            import plotly.express as px
-            import plotly.utils
-            import json
-            from plotly.subplots import make_subplots
-
-            if 'arima_results' not in self.raw_results or not self.raw_results['arima_results']:
-                return {}
-            arima_results = self.raw_results['arima_results']
-            if 'all_symbols_arima' not in arima_results:
+            all_symbols = self.model.arima
+            if not all_symbols:
                 return {}
-            all_symbols = arima_results['all_symbols_arima']
-            color_palette = px.colors.qualitative.Set2
+
+            # Actual data comes from returns, falling back to prices
+            actual_type = 'returns_data' if self.data_arrays.get('returns_data') else 'original_data'
+            actual_series = {symbol: (x, y) for symbol, x, y in self._series_for(actual_type)}
 
             for i, (symbol, arima_data) in enumerate(all_symbols.items()):
-                summary = arima_data.get('summary', {})
-                forecast_data = arima_data.get('forecast', {})
-                # Get actual data (returns or prices)
-                actual_x, actual_y = [], []
-                if 'returns_data' in self.raw_results and self.raw_results['returns_data']:
-                    actual_x = [row.get('Date') or row.get('index') for row in self.raw_results['returns_data'] if row.get(symbol) is not None]
-                    actual_y = [row.get(symbol) for row in self.raw_results['returns_data'] if row.get(symbol) is not None]
-                elif 'original_data' in self.raw_results and self.raw_results['original_data']:
-                    actual_x = [row.get('Date') or row.get('index') for row in self.raw_results['original_data'] if row.get(symbol) is not None]
-                    actual_y = [row.get(symbol) for row in self.raw_results['original_data'] if row.get(symbol) is not None]
+                forecast_data = arima_data.forecast
+                actual_x, actual_y = actual_series.get(symbol, ([], []))
                 # Fitted values
                 fitted_x, fitted_y = [], []
-                fitted = summary.get('fitted_values', {})
+                fitted = arima_data.summary.fitted_values
                 if fitted:
-                    fitted_x = list(fitted.keys())
-                    fitted_y = list(fitted.values())
+                    _, fitted_x, fitted_y = downsample_columns(
+                        list(fitted.index), {'fitted': list(fitted.values)}, self.max_points_per_trace)[0]
                 # Forecast
-                forecast_y = forecast_data.get('point_forecasts', [])
+                forecast_y = forecast_data.point_forecasts
                 forecast_x = []
                 if fitted_x and forecast_y:
-                    # Try to extend dates
-                    from datetime import datetime, timedelta
+                    # Continue the fitted dates on the trading calendar
                     try:
-                        last_date = fitted_x[-1]
-                        dt = datetime.strptime(last_date, "%Y-%m-%d")
-                        forecast_x = [(dt + timedelta(days=j+1)).strftime("%Y-%m-%d") for j in range(len(forecast_y))]
-                    except:
+                        forecast_x = trading_calendar.forecast_axis(fitted_x[-1], len(forecast_y))
+                    except ValueError:
                         forecast_x = [f"Forecast_{j+1}" for j in range(len(forecast_y))]
                 # Confidence intervals (optional)
-                ci_upper = forecast_data.get('upper', [])
-                ci_lower = forecast_data.get('lower', [])
-                # Build figure
-                fig = go.Figure()
-                color = color_palette[i % len(color_palette)]
+                ci_upper = forecast_data.upper
+                ci_lower = forecast_data.lower
+                # Build figure; series traces reference the shared plot dataset
+                data = []
+                sources = []
+                color = figure_builder.palette_color(i)
                 # Actual
                 if actual_x and actual_y:
-                    fig.add_trace(go.Scatter(
-                        x=actual_x,
-                        y=actual_y,
-                        mode='lines',
-                        name=f"{symbol} Actual",
-                        line=dict(color=color, width=2, dash='solid'),
+                    data.append(figure_builder.line_trace(
+                        actual_x, actual_y, f"{symbol} Actual",
+                        color=color, width=2, dash='solid',
                         hovertemplate=f'<b>{symbol}</b><br>Date: %{{x}}<br>Value: %{{y:.4f}}<extra></extra>'
                     ))
+                    sources.append(self.plot_dataset.add(actual_type, symbol, actual_x, actual_y))
                 # Fitted
                 if fitted_x and fitted_y:
-                    fig.add_trace(go.Scatter(
-                        x=fitted_x,
-                        y=fitted_y,
-                        mode='lines',
-                        name=f"{symbol} Fitted",
-                        line=dict(color=color, width=2, dash='dot'),
+                    data.append(figure_builder.line_trace(
+                        fitted_x, fitted_y, f"{symbol} Fitted",
+                        color=color, width=2, dash='dot',
                         hovertemplate=f'<b>{symbol} Fitted</b><br>Date: %{{x}}<br>Value: %{{y:.4f}}<extra></extra>'
                     ))
+                    sources.append(self.plot_dataset.add('arima_fitted', symbol, fitted_x, fitted_y))
                 # Forecast
                 if forecast_x and forecast_y:
-                    fig.add_trace(go.Scatter(
-                        x=forecast_x,
-                        y=forecast_y,
-                        mode='lines+markers',
-                        name=f"{symbol} Forecast",
-                        line=dict(color=color, width=2, dash='dash'),
-                        marker=dict(size=6),
+                    data.append(figure_builder.line_trace(
+                        forecast_x, forecast_y, f"{symbol} Forecast",
+                        color=color, width=2, dash='dash', mode='lines+markers', marker_size=6,
                         hovertemplate=f'<b>{symbol} Forecast</b><br>Date: %{{x}}<br>Value: %{{y:.4f}}<extra></extra>'
                     ))
+                    sources.append(None)
                 # Confidence interval
                 if forecast_x and ci_upper and ci_lower and len(ci_upper) == len(forecast_x) and len(ci_lower) == len(forecast_x):
-                    fig.add_traces([
-                        go.Scatter(
-                            x=forecast_x + forecast_x[::-1],
-                            y=ci_upper + ci_lower[::-1],
-                            fill='toself',
-                            fillcolor='rgba(100,100,200,0.15)',
-                            line=dict(color='rgba(255,255,255,0)'),
-                            hoverinfo='skip',
-                            name=f"{symbol} 95% CI",
-                            showlegend=True
-                        )
-                    ])
+                    data.append(figure_builder.band_trace(
+                        forecast_x, ci_upper, ci_lower, f"{symbol} 95% CI",
+                        fillcolor=figure_builder.CONFIDENCE_BAND_FILL, hoverinfo='skip', showlegend=True
+                    ))
+                    sources.append(None)
                 # Layout
-                fig.update_layout(
-                    title=dict(
-                        text=f"ARIMA Model Fit and Forecast - {symbol}",
-                        x=0.5,
-                        font=dict(size=20)
-                    ),
+                fig_layout = figure_builder.layout(
+                    f"ARIMA Model Fit and Forecast - {symbol}", 400,
                     xaxis_title="Date",
                     yaxis_title="Value",
                     hovermode='x unified',
-                    template='plotly_white',
                     showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    ),
-                    height=400,
-                    margin=dict(l=50, r=50, t=80, b=50)
+                    legend=figure_builder.HORIZONTAL_LEGEND,
+                )
+                arima_plots[f'arima_analysis_{symbol.lower()}'] = figure_builder.to_json(
+                    figure_builder.figure_spec(figure_builder.figure(data, fig_layout), sources)
                 )
-                arima_plots[f'arima_analysis_{symbol.lower()}'] = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
         except Exception as e:
             logger.error(f"Error creating ARIMA plots: {e}")
         return arima_plots
     
-    def process_stationarity_results(self) -> Dict[str, Any]:
-        """Process stationarity test results."""
-        if 'stationarity_results' not in self.raw_results:
-            return {}
-        
-        stationarity = self.raw_results['stationarity_results']
-        processed = {
-            'all_symbols_stationarity': {},
-            'series_stats': {}
-        }
-        
-        # Process stationarity tests
-        if 'all_symbols_stationarity' in stationarity:
-            tests = stationarity['all_symbols_stationarity']
-            if 'all_symbols_stationarity' in tests:  # Handle double nesting
-                tests = tests['all_symbols_stationarity']
-                
-            for symbol, test_result in tests.items():
-                processed['all_symbols_stationarity'][symbol] = test_result
-        
-        # Process series statistics
-        if 'series_stats' in stationarity:
-            for symbol, stats in stationarity['series_stats'].items():
-                processed['series_stats'][symbol] = stats
-                
-        return processed
-    
-    def process_arima_results(self) -> Dict[str, Any]:
-        """Process ARIMA model results."""
-        if 'arima_results' not in self.raw_results:
-            return {}
-        
-        arima = self.raw_results['arima_results']
-        processed = {}
-        
-        # Handle nested structure
-        if 'all_symbols_arima' in arima:
-            arima_data = arima['all_symbols_arima']
-            for symbol, result in arima_data.items():
-                processed[symbol] = {
-                    'summary': result.get('summary', {}),
-                    'forecast': result.get('forecast', {}),
-                    'interpretation': result.get('interpretation', {})
-                }
-                
-        return processed
-    
-    def process_garch_results(self) -> Dict[str, Any]:
-        """Process GARCH model results."""
-        if 'garch_results' not in self.raw_results:
-            return {}
-        
-        garch = self.raw_results['garch_results']
-        processed = {}
-        
-        if 'all_symbols_garch' in garch:
-            for symbol, result in garch['all_symbols_garch'].items():
-                processed[symbol] = {
-                    'summary': result.get('summary', {}),
-                    'forecast': result.get('forecast', []),
-                    'interpretation': result.get('interpretation', {})
-                }
-                
-        return processed
-    
-    def process_var_results(self) -> Dict[str, Any]:
-        """Process VAR model results."""
-        if 'var_results' not in self.raw_results:
-            return {}
-        
-        var = self.raw_results['var_results']
-        
-        # Handle case where var_results is None or not a dictionary
-        if not var or not isinstance(var, dict):
-            return {
-                'fitted_model': None,
-                'selected_lag': None,
-                'ic_used': None,
-                'coefficients': {},
-                'granger_causality': {},
-                'fevd_matrix': [],
-                'fevd_interpretation': {},
-                'interpretation': ''
-            }
-        
+    @property
+    def correlations(self) -> correlation_index.CorrelationIndex:
+        """Prefix-sum correlation index of the returns data."""
+        return correlation_index.cached(self.data_hash, self.data_arrays, self.symbols)
+
+    def _create_garch_forecast_plot(self) -> Optional[str]:
+        """Volatility forecasts of every symbol over garch_forecast.DEFAULT_STEPS, with the backend's steps marked."""
+        try:
+            if not self.model.garch:
+                return None
+            timestamps = self.data_arrays.get('returns_data', {}).get('timestamps') or [None]
+            extended = garch_forecast.extend(self.model.garch, garch_forecast.DEFAULT_STEPS, timestamps[-1])
+            if not extended['volatility']:
+                return None
+            x = extended['x']
+            data = []
+            for i, (symbol, volatility) in enumerate(extended['volatility'].items()):
+                color = figure_builder.palette_color(i)
+                data.append(figure_builder.line_trace(
+                    x, volatility, symbol, color=color, width=2,
+                    hovertemplate=f'<b>{symbol}</b><br>Date: %{{x}}<br>Volatility: %{{y:.4f}}<extra></extra>'
+                ))
+                backend = self.model.garch[symbol].forecast
+                data.append(figure_builder.line_trace(
+                    x[:len(backend)], backend, f"{symbol} (backend)", color=color,
+                    mode='markers', marker_size=8, showlegend=False,
+                    hovertemplate=f'<b>{symbol} backend</b><br>Date: %{{x}}<br>Volatility: %{{y:.4f}}<extra></extra>'
+                ))
+            fig_layout = figure_builder.layout(
+                "GARCH Volatility Forecast", 400,
+                xaxis_title="Date",
+                yaxis_title="Volatility",
+                hovermode='x unified',
+                showlegend=True,
+                legend=figure_builder.HORIZONTAL_LEGEND,
+            )
+            fig = figure_builder.figure(data, fig_layout)
+            return figure_builder.to_json(figure_builder.figure_spec(fig, [None] * len(data)))
+        except Exception as e:
+            logger.error(f"Error creating GARCH volatility forecast plot: {e}")
+            return None
+
+    @property
+    def price_analytics(self) -> Dict[str, Any]:
+        """Cumulative returns, drawdowns and rolling volatility of the data arrays at self.frequency."""
+        windows = getattr(settings, 'ROLLING_VOLATILITY_WINDOWS', price_analytics.DEFAULT_WINDOWS)
+        return price_analytics.cached(self.data_hash, self.display_arrays, self.symbols, self.frequency, windows)
+
+    def _price_analytics_plots(self) -> Dict[str, tuple]:
+        """Plot key -> (description, builder) of the price analytics plots."""
         return {
-            'fitted_model': var.get('fitted_model'),
-            'selected_lag': var.get('selected_lag'),
-            'ic_used': var.get('ic_used'),
-            'coefficients': var.get('coefficients', {}),
-            'granger_causality': var.get('granger_causality', {}),
-            'fevd_matrix': var.get('fevd_matrix', []),
-            'fevd_interpretation': var.get('fevd_interpretation', {}),
-            'interpretation': var.get('interpretation', '')
+            'cumulative_returns': ('cumulative return', lambda: self._create_price_analytics_plot(
+                'cumulative_returns', "Cumulative Return", "Cumulative Return", zero_line=True)),
+            'drawdowns': ('drawdown', lambda: self._create_price_analytics_plot(
+                'drawdowns', "Drawdown from Running Peak", "Drawdown", zero_line=False)),
+            'rolling_volatility': ('rolling volatility', self._create_rolling_volatility_plot),
         }
+
+    def _create_price_analytics_plot(self, name: str, title: str, label: str, zero_line: bool) -> Optional[str]:
+        """Multi-symbol line chart of the cumulative returns or drawdowns, as percentages on the axis."""
+        try:
+            data = self.price_analytics[name]
+            if not data['timestamps']:
+                return None
+            fig = figure_builder.series_figure(
+                downsample_columns(data['timestamps'], data['symbol_data'], self.max_points_per_trace),
+                title_text=title,
+                yaxis_title=label,
+                value_label=label,
+                value_format='.2%',
+                zero_line=zero_line,
+                height=400,
+                yaxis={'tickformat': '.0%'},
+            )
+            sources = [self.plot_dataset.add(name, trace['name'], trace['x'], trace['y']) for trace in fig['data']]
+            return figure_builder.to_json(figure_builder.figure_spec(fig, sources))
+        except Exception as e:
+            logger.error(f"Error creating {name} plot: {e}")
+            return None
+
+    def _create_rolling_volatility_plot(self) -> Optional[str]:
+        """Rolling realized volatility of the returns, one color per symbol and one dash per window."""
+        try:
+            data = self.price_analytics['rolling_volatility']
+            if not data['timestamps'] or not data['windows']:
+                return None
+            traces, sources = [], []
+            for k, (window, by_symbol) in enumerate(data['windows'].items()):
+                for i, (symbol, x, y) in enumerate(downsample_columns(
+                        data['timestamps'], by_symbol, self.max_points_per_trace)):
+                    name = f"{symbol} ({window})"
+                    traces.append(figure_builder.line_trace(
+                        x, y, name, color=figure_builder.palette_color(i), width=1.5,
+                        dash=self.VOLATILITY_WINDOW_DASHES[k % len(self.VOLATILITY_WINDOW_DASHES)],
+                        hovertemplate=f'<b>{name}</b><br>Date: %{{x}}<br>Volatility: %{{y:.4f}}<extra></extra>'
+                    ))
+                    sources.append(self.plot_dataset.add(f'rolling_volatility_{window}', symbol, x, y))
+            fig_layout = figure_builder.layout(
+                f"Rolling Realized Volatility ({', '.join(map(str, data['windows']))}-period windows)", 400,
+                xaxis_title="Date",
+                yaxis_title="Volatility",
+                hovermode='x unified',
+                showlegend=True,
+                legend=figure_builder.HORIZONTAL_LEGEND,
+            )
+            fig = figure_builder.figure(traces, fig_layout)
+            return figure_builder.to_json(figure_builder.figure_spec(fig, sources))
+        except Exception as e:
+            logger.error(f"Error creating rolling volatility plot: {e}")
+            return None
+
+    @property
+    def residual_diagnostics(self) -> Dict[str, Any]:
+        """ACF, PACF and Ljung-Box statistics of the ARIMA residuals ('arima') and post-GARCH series ('garch')."""
+        series = {
+            'arima': {symbol: result.summary.residuals.values
+                      for symbol, result in self.model.arima.items() if result.summary.residuals},
+            'garch': self.data_arrays.get('post_garch_data', {}).get('symbol_data', {}),
+        }
+        return diagnostics.cached(self.content_hash, series)
+
+    def _create_residual_diagnostics_plot(self, group: str, description: str) -> Optional[str]:
+        """Compact ACF and PACF bar plots, one row per symbol, with the 95% white noise band."""
+        try:
+            by_symbol = self.residual_diagnostics.get(group)
+            if not by_symbol:
+                return None
+            titles = [f"{symbol} {kind}" for symbol in by_symbol for kind in ('ACF', 'PACF')]
+            grid, axes = figure_builder.subplot_grid(rows=len(by_symbol), cols=2, subplot_titles=titles,
+                                                     vertical_spacing=0.3 / len(by_symbol) + 0.05)
+            for annotation in grid['annotations']:
+                annotation['font'] = {'size': 12}
+            data, shapes = [], []
+            for i, (symbol, result) in enumerate(by_symbol.items()):
+                color = figure_builder.palette_color(i)
+                for axis, kind in zip(axes[2 * i:2 * i + 2], ('acf', 'pacf')):
+                    data.append(figure_builder.on_axes(figure_builder.bar_trace(
+                        result['lags'], result[kind], f"{symbol} {kind.upper()}", marker_color=color,
+                        hovertemplate=f'<b>{symbol}</b><br>Lag: %{{x}}<br>{kind.upper()}: %{{y:.3f}}<extra></extra>'
+                    ), axis))
+                    shapes.extend(figure_builder.hline_shape(bound, 'red', dash='dash', opacity=0.6, axis=axis)
+                                  for bound in (result['bound'], -result['bound']))
+            fig_layout = figure_builder.layout(
+                f"{description} Autocorrelation", 180 * len(by_symbol) + 100, title_size=16,
+                showlegend=False,
+                bargap=0.3,
+                shapes=shapes,
+                **grid,
+            )
+            fig = figure_builder.figure(data, fig_layout)
+            return figure_builder.to_json(figure_builder.figure_spec(fig, [None] * len(data)))
+        except Exception as e:
+            logger.error(f"Error creating {description} diagnostics plot: {e}")
+            return None
+
+    def _create_correlation_heatmap(self) -> Optional[str]:
+        """Heatmap of the full-period return correlations; the page updates it for a selected window."""
+        try:
+            if len(self.symbols) < 2 or not self.data_arrays.get('returns_data', {}).get('timestamps'):
+                return None
+            window = self.correlations.window()
+            heatmap = figure_builder.heatmap_trace(
+                window['matrix'], self.symbols, self.symbols, 'RdBu',
+                zmid=0, zmin=-1, zmax=1,
+                colorbar_title="Correlation",
+                hovertemplate='%{y} vs %{x}<br>Correlation: %{z:.3f}<extra></extra>',
+                # Cell labels only while they stay readable
+                **({'texttemplate': '%{z:.2f}'} if len(self.symbols) <= 20 else {}),
+            )
+            fig_layout = figure_builder.layout(
+                f"Return Correlation ({window['start'][:10]} to {window['end'][:10]})",
+                max(400, 30 * len(self.symbols)),
+                layout_margin=figure_builder.margin(l=100, r=50, t=80, b=100),
+                yaxis={'autorange': 'reversed'},
+            )
+            fig = figure_builder.figure([heatmap], fig_layout)
+            return figure_builder.to_json(figure_builder.figure_spec(fig, [None]))
+        except Exception as e:
+            logger.error(f"Error creating correlation heatmap: {e}")
+            return None
+
+    def _create_rolling_correlation_plot(self) -> Optional[str]:
+        """Rolling pairwise return correlations (the first ROLLING_CORRELATION_MAX_PAIRS pairs)."""
+        try:
+            rows = len(self.data_arrays.get('returns_data', {}).get('timestamps', []))
+            # Short samples get a shorter window so the plot still has a line
+            window = min(getattr(settings, 'ROLLING_CORRELATION_WINDOW', 63), rows // 2)
+            if len(self.symbols) < 2 or window < 3:
+                return None
+            pairs = correlation_index.symbol_pairs(
+                self.symbols, getattr(settings, 'ROLLING_CORRELATION_MAX_PAIRS', 10))
+            timestamps, columns = self.correlations.rolling(pairs, window)
+            fig = figure_builder.series_figure(
+                downsample_columns(timestamps, columns, self.max_points_per_trace),
+                title_text=f"Rolling {window}-Day Return Correlation",
+                yaxis_title="Correlation",
+                value_label="Correlation",
+                value_format='.3f',
+                zero_line=True,
+                height=450,
+                layout_margin=figure_builder.margin(l=40, r=40, t=80, b=60),
+                yaxis={'range': [-1, 1]},
+            )
+            sources = [self.plot_dataset.add('rolling_correlation', trace['name'], trace['x'], trace['y'])
+                       for trace in fig['data']]
+            return figure_builder.to_json(figure_builder.figure_spec(fig, sources))
+        except Exception as e:
+            logger.error(f"Error creating rolling correlation plot: {e}")
+            return None
+
+    def _create_granger_heatmap(self) -> Optional[str]:
+        """Heatmap of the smallest Granger p-value for every cause -> effect pair."""
+        try:
+            granger = self.model.granger
+            if not granger or not granger.causality_results or len(self.symbols) < 2:
+                return None
+            matrix = granger.min_p_value_matrix(self.symbols)
+            heatmap = figure_builder.heatmap_trace(
+                matrix, self.symbols, self.symbols, 'YlOrRd_r',
+                colorbar_title="Min p-value",
+                hovertemplate='%{y} → %{x}<br>Min p-value: %{z:.4f}<extra></extra>',
+                texttemplate='%{z:.3f}',
+                zmin=0, zmax=1,
+            )
+            fig_layout = figure_builder.layout(
+                "Granger Causality - Minimum p-value across Lags", max(400, 40 * len(self.symbols)),
+                layout_margin=figure_builder.margin(l=100, r=50, t=80, b=100),
+                xaxis_title="Effect",
+                yaxis_title="Cause",
+                yaxis={'autorange': 'reversed'},
+            )
+            fig = figure_builder.figure([heatmap], fig_layout)
+            return figure_builder.to_json(figure_builder.figure_spec(fig, [None]))
+        except Exception as e:
+            logger.error(f"Error creating Granger causality heatmap: {e}")
+            return None
+
+    def process_stationarity_results(self) -> Optional[result_model.StationarityResults]:
+        """Stationarity tests and series statistics per symbol."""
+        return self.model.stationarity
+
+    def process_arima_results(self) -> Dict[str, result_model.ArimaResult]:
+        """ARIMA model results per symbol."""
+        return self.model.arima
+
+    def process_garch_results(self) -> Dict[str, result_model.GarchResult]:
+        """GARCH model results per symbol."""
+        return self.model.garch
+
+    def process_var_results(self) -> Optional[result_model.VarResults]:
+        """VAR model results."""
+        return self.model.var
+
+    def process_spillover_results(self) -> Optional[result_model.SpilloverResults]:
+        """Spillover analysis results, with the directional table rows in symbol order."""
+        return self.model.spillover
+
+    def process_granger_causality_results(self) -> Optional[result_model.GrangerResults]:
+        """Standalone Granger Causality results."""
+        return self.model.granger
     
-    def process_spillover_results(self) -> Dict[str, Any]:
-        """Process spillover analysis results."""
-        if 'spillover_results' not in self.raw_results:
+    def process_descriptive_statistics(self) -> Dict[str, Any]:
+        """Descriptive statistics of every symbol of every data array, computed locally."""
+        try:
+            return descriptive_stats.cached(self.content_hash, self.data_arrays, self.symbols)
+        except Exception as e:
+            logger.error(f"Error computing descriptive statistics: {e}")
             return {}
-        
-        spillover = self.raw_results['spillover_results']
-        
-        # Handle case where spillover_results is None or not a dictionary
-        if not spillover or not isinstance(spillover, dict):
-            return {
-                'total_spillover_index': None,
-                'directional_spillover': {},
-                'net_spillover': {},
-                'pairwise_spillover': {},
-                'interpretation': '',
-                'pairwise_spillover_table': [],
-                'spillover_table_data': []
-            }
-        
-        # Process spillover data into template-friendly format
-        processed_spillover = {
-            'total_spillover_index': spillover.get('total_spillover_index'),
-            'directional_spillover': spillover.get('directional_spillover', {}),
-            'net_spillover': spillover.get('net_spillover', {}),
-            'pairwise_spillover': spillover.get('pairwise_spillover', {}),
-            'interpretation': spillover.get('interpretation', ''),
-            'pairwise_spillover_table': spillover.get('pairwise_spillover_table', [])
-        }
-        
-        # Create template-friendly spillover table data
-        spillover_table_data = []
-        directional = spillover.get('directional_spillover', {})
-        net_spillover = spillover.get('net_spillover', {})
-        
-        for symbol in self.symbols:
-            spillover_to = directional.get(symbol, {}).get('to', 0) if directional.get(symbol) else 0
-            spillover_from = directional.get(symbol, {}).get('from', 0) if directional.get(symbol) else 0
-            net_value = net_spillover.get(symbol, 0)
-            
-            spillover_table_data.append({
-                'symbol': symbol,
-                'spillover_to': spillover_to,
-                'spillover_from': spillover_from,
-                'net_spillover': net_value,
-                'net_spillover_positive': net_value > 0
-            })
-        
-        processed_spillover['spillover_table_data'] = spillover_table_data
-        
-        return processed_spillover
 
-    def process_granger_causality_results(self) -> Dict[str, Any]:
-        """Process standalone Granger Causality results."""
-        if 'granger_causality_results' not in self.raw_results:
+    def process_max_drawdowns(self) -> Dict[str, Any]:
+        """Total return and deepest drawdown (depth, peak, trough, recovery) of every symbol."""
+        try:
+            return self.price_analytics['max_drawdowns']
+        except Exception as e:
+            logger.error(f"Error computing drawdowns: {e}")
             return {}
-        
-        granger = self.raw_results['granger_causality_results']
-        
-        # Handle case where granger_causality_results is None or not a dictionary
-        if not granger or not isinstance(granger, dict):
-            return {
-                'causality_results': {},
-                'interpretations': {},
-                'metadata': {}
-            }
-        
-        return {
-            'causality_results': granger.get('causality_results', {}),
-            'interpretations': granger.get('interpretations', {}),
-            'metadata': granger.get('metadata', {})
-        }
-    
+
+    def process_residual_diagnostics(self) -> Dict[str, Any]:
+        """Ljung-Box statistics at the reported lags, by group and symbol (the full ACF/PACF stay in the plots)."""
+        try:
+            return diagnostics.ljung_box_summary(self.residual_diagnostics)
+        except Exception as e:
+            logger.error(f"Error computing residual diagnostics: {e}")
+            return {}
+
     def process_all(self) -> Dict[str, Any]:
         """
         Process all results into a complete structured format for templates.
         This is the main method called by views to get all processed data.
+
+        The result is stored in the session, so it only holds JSON data: the
+        analysis sections are left in the raw results and decoded into the
+        typed model (result_model.decode) when a page needs them.
         """
-        # Force debug output to both console and a file
-        import sys
-        debug_msg = "DEBUG: Starting process_all() method - THIS SHOULD APPEAR!"
-        print(debug_msg, flush=True)
-        sys.stdout.flush()
-        
-        # Also write to a debug file
-        try:
-            with open('./logs/debug_results_processor.log', 'a') as f:
-                f.write(f"{debug_msg}\n")
-                f.flush()
-        except:
-            pass
+        logger.debug("Starting process_all()")
         
         processed_results = {
             'symbols': self.symbols,
+            'data_hash': self.data_hash,  # Keys the resampled arrays (see resampling.cached)
             'execution_configuration': self.process_execution_configuration(),
             'data_arrays': self.process_data_arrays(),
-            'stationarity_results': self.process_stationarity_results(),
-            'arima_results': self.process_arima_results(),
-            'garch_results': self.process_garch_results(),
-            'var_results': self.process_var_results(),
-            'spillover_results': self.process_spillover_results(),
-            'granger_causality_results': self.process_granger_causality_results(),  # Add this line
+            'descriptive_stats': self.process_descriptive_statistics(),
+            'max_drawdowns': self.process_max_drawdowns(),
+            'residual_diagnostics': self.process_residual_diagnostics(),
             'plots': self.create_plots(),  # This will call our plotting methods!
+            'plot_dataset': self.plot_dataset.to_json(),  # Series referenced by the plots
             'executive_summary': self.create_executive_summary()  # Add this for Overview tab
         }
         
-        debug_msg2 = "DEBUG: Completed process_all() method - THIS SHOULD ALSO APPEAR!"
-        print(debug_msg2, flush=True)
-        sys.stdout.flush()
-        
-        try:
-            with open('./logs/debug_results_processor.log', 'a') as f:
-                f.write(f"{debug_msg2}\n")
-                f.flush()
-        except:
-            pass
+        logger.debug("Completed process_all()", extra={'symbols': self.symbols,
+                                                       'plots': len(processed_results['plots'])})
         
         return processed_results
 
@@ -970,28 +833,26 @@ class ResultsProcessor:
         Create executive summary data for the Overview tab.
         Extracts key information from each analysis component.
         """
-        print("DEBUG: Creating executive summary")
-        
-        # Also write to debug file
-        try:
-            with open('./logs/debug_results_processor.log', 'a') as f:
-                f.write("DEBUG: Creating executive summary\n")
-                f.flush()
-        except:
-            pass
+        logger.debug("Creating executive summary")
         
         summary = {}
+
+        # Price, returns and volatility sparklines of every symbol (inline SVG, no Plotly needed)
+        symbol_sparklines = self.create_sparklines()
+        if symbol_sparklines:
+            summary['sparklines'] = symbol_sparklines
         
         # Create stationarity summary
         stationarity_data = self.process_stationarity_results()
-        if stationarity_data.get('all_symbols_stationarity'):
+        if stationarity_data and stationarity_data.all_symbols_stationarity:
             stationarity_summary = {}
-            for symbol, test_result in stationarity_data['all_symbols_stationarity'].items():
+            for symbol, test_result in stationarity_data.all_symbols_stationarity.items():
                 stationarity_summary[symbol] = {
-                    'status': 'Stationary' if test_result.get('is_stationary') else 'Non-Stationary',
-                    'test_statistic': f"{test_result.get('adf_statistic', 0):.4f}",
-                    'p_value': f"{test_result.get('p_value', 0):.4f}",
-                    'interpretation': test_result.get('interpretation', 'No interpretation available')
+                    'status': 'Stationary' if test_result.is_stationary else 'Non-Stationary',
+                    'test_statistic': f"{_or_zero(test_result.adf_statistic):.4f}",
+                    'p_value': f"{_or_zero(test_result.p_value):.4f}",
+                    'interpretation': test_result.interpretation if test_result.interpretation is not None
+                    else 'No interpretation available'
                 }
             summary['stationarity_summary'] = stationarity_summary
         
@@ -1001,10 +862,10 @@ class ResultsProcessor:
             arima_summary = {}
             for symbol, arima_result in arima_data.items():
                 arima_summary[symbol] = {
-                    'model_specification': arima_result.get('summary', {}).get('model_specification', 'N/A'),
-                    'aic': f"{arima_result.get('summary', {}).get('aic', 0):.2f}",
-                    'bic': f"{arima_result.get('summary', {}).get('bic', 0):.2f}",
-                    'forecast_steps': arima_result.get('forecast', {}).get('forecast_steps', 'N/A')
+                    'model_specification': arima_result.summary.model_specification or 'N/A',
+                    'aic': f"{_or_zero(arima_result.summary.aic):.2f}",
+                    'bic': f"{_or_zero(arima_result.summary.bic):.2f}",
+                    'forecast_steps': arima_result.forecast.forecast_steps or 'N/A'
                 }
             summary['executive_summary'] = arima_summary  # Template expects this key name
         
@@ -1013,7 +874,7 @@ class ResultsProcessor:
         if garch_data:
             garch_summary = {}
             for symbol, garch_result in garch_data.items():
-                forecast_data = garch_result.get('forecast', [])
+                forecast_data = garch_result.forecast
                 next_volatility = forecast_data[0] if forecast_data and len(forecast_data) > 0 else 'N/A'
                 if isinstance(next_volatility, (int, float)):
                     next_volatility = f"{next_volatility:.6f}"
@@ -1022,18 +883,49 @@ class ResultsProcessor:
                     'model_type': 'GARCH',
                     'forecast_periods': len(forecast_data) if forecast_data else 0,
                     'next_period_volatility': next_volatility,
-                    'summary_available': bool(garch_result.get('summary'))
+                    'summary_available': bool(garch_result.summary)
                 }
             summary['garch_summary'] = garch_summary
         
         # Create spillover summary if available
         spillover_data = self.process_spillover_results()
-        if spillover_data.get('total_spillover_index') is not None:
+        if spillover_data and spillover_data.total_spillover_index is not None:
             summary['spillover_summary'] = {
-                'total_spillover_index': f"{spillover_data['total_spillover_index']:.2f}%",
-                'interpretation': spillover_data.get('interpretation', 'No interpretation available'),
+                'total_spillover_index': f"{spillover_data.total_spillover_index:.2f}%",
+                'interpretation': spillover_data.interpretation or 'No interpretation available',
                 'symbols_analyzed': len(self.symbols)
             }
         
-        print(f"DEBUG: Created executive summary with keys: {list(summary.keys())}")
+        logger.debug("Created executive summary with keys: %s", list(summary.keys()))
         return summary
+
+    def create_sparklines(self) -> Dict[str, Any]:
+        """
+        Price, returns and rolling volatility sparklines of every symbol, as SVG markup.
+
+        Prices fall back to the cumulative returns when the run has no
+        original data; the volatility uses the shortest rolling window.
+        """
+        try:
+            analytics = self.price_analytics
+            prices = (self.display_arrays.get('original_data') or {}).get('symbol_data') \
+                or analytics['cumulative_returns']['symbol_data']
+            returns = (self.display_arrays.get('returns_data') or {}).get('symbol_data', {})
+            windows = analytics['rolling_volatility']['windows']
+            window = min(windows) if windows else None
+            series = {
+                symbol: {
+                    'price': prices.get(symbol) or [],
+                    'returns': returns.get(symbol) or [],
+                    'volatility': windows[window].get(symbol) or [] if window else [],
+                }
+                for symbol in self.symbols
+            }
+            return sparklines.cached(self.data_hash, series, f'{self.frequency or "native"}:{window}')
+        except Exception as e:
+            logger.error(f"Error creating sparklines: {e}")
+            return {}
+
+
+def _or_zero(value: Optional[float]) -> float:
+    return 0 if value is None else value
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/rolling_spillover.py
+
+"""
+Rolling spillover indices from the backend's /api/v1/rolling_spillover endpoint.
+The returns are cut into windows of window_size rows, and each window is
+sent to the backend on its own and cached under (hash of the window's data,
+window start, window size, forecast horizon). Window starts are every
+step-th trading day counted from a fixed date rather than from the first
+row, so extending the date range or moving it keeps the existing windows:
+only the windows that are not cached yet go to the backend, a few at a time
+on a thread pool, and each is cached as soon as it returns. A request stops
+starting windows once its time budget is spent, so it ends well within the
+server's worker timeout; the windows left pending are computed by the next
+request. The total and net spillover of every window form the time series
+plotted against the window end dates.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from . import figure_builder, plot_cache, trading_calendar
+from .downsampling import to_epoch, window_bounds
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached window results change so results cached by older code are not reused
+ROLLING_SPILLOVER_CACHE_VERSION = 2
+
+ENDPOINT = '/api/v1/rolling_spillover'
+# Date field of the posted records, as in the backend's data examples (openapi.json)
+DATE_KEY = 'date'
+
+DEFAULT_WINDOW = 60
+DEFAULT_STEP = 5
+DEFAULT_HORIZON = 10
+# Same bound as the rolling_window of the pipeline form
+MAX_WINDOW = 365
+DEFAULT_MAX_WINDOWS = 100
+DEFAULT_WORKERS = 4
+# Seconds per backend request, and seconds after which a request starts no more windows
+DEFAULT_WINDOW_TIMEOUT = 30
+DEFAULT_TIME_BUDGET = 120
+
+# Trading days are numbered from this Monday to pick the window starts
+_EPOCH = np.datetime64('2000-01-03', 'D')
+
+# (rows, window size, horizon) -> {'total': float, 'net': {symbol: float}}
+Fetch = Callable[[List[Dict[str, Any]], int, int], Dict[str, Any]]
+
+
+def window_starts(timestamps: Sequence[Any], size: int, step: int) -> List[int]:
+    """
+    Rows that start a complete window of size rows.
+
+    A row starts a window when its trading day number is a multiple of step;
+    timestamps that are not dates fall back to the row number.
+    """
+    try:
+        days = trading_calendar.to_datetime64(timestamps).astype('datetime64[D]')
+        numbers = np.busday_count(_EPOCH, days, busdaycal=trading_calendar.trading_calendar())
+    except (ValueError, TypeError):
+        numbers = np.arange(len(timestamps))
+    # A non-trading day shares its number with the next trading day; the first row counts
+    _, first = np.unique(numbers, return_index=True)
+    first = np.sort(first)
+    return [int(row) for row in first[numbers[first] % step == 0] if row + size <= len(timestamps)]
+
+
+def window_rows(data_info: Dict[str, Any], symbols: Sequence[str], start: int, size: int) -> List[Dict[str, Any]]:
+    """Rows of the window starting at row start, as the backend's records ({'date', symbol: value})."""
+    timestamps = data_info['timestamps'][start:start + size]
+    columns = [(symbol, data_info['symbol_data'].get(symbol, [])[start:start + size]) for symbol in symbols]
+    return [{DATE_KEY: timestamp, **{symbol: values[i] for symbol, values in columns}}
+            for i, timestamp in enumerate(timestamps)]
+
+
+def window_key(rows: List[Dict[str, Any]], size: int, horizon: int) -> str:
+    """Cache key of one window: its data, start, size and horizon."""
+    return (f'rolling_spillover:v{ROLLING_SPILLOVER_CACHE_VERSION}:{plot_cache.content_hash(rows)}:'
+            f'{rows[0][DATE_KEY]}:{size}:{horizon}')
+
+
+def fetch_window(rows: List[Dict[str, Any]], size: int, horizon: int) -> Dict[str, Any]:
+    """
+    Spillover indices of one window from the backend.
+
+    Raises:
+        requests.RequestException: The request failed
+        ValueError: The response has no total spillover index
+    """
+    response = requests.post(
+        f"{settings.TIMESERIES_API_URL}{ENDPOINT}",
+        json={'data': rows, 'method': 'diebold_yilmaz', 'forecast_horizon': horizon, 'window_size': size},
+        timeout=getattr(settings, 'ROLLING_SPILLOVER_WINDOW_TIMEOUT', DEFAULT_WINDOW_TIMEOUT),
+    )
+    response.raise_for_status()
+    result = response.json()
+    if result.get('total_spillover_index') is None:
+        raise ValueError("Response has no total_spillover_index")
+    return {
+        'total': float(result['total_spillover_index']),
+        'net': {symbol: float(value) for symbol, value in (result.get('net_spillover') or {}).items()},
+    }
+
+
+def compute(data_info: Dict[str, Any], symbols: Sequence[str], size: int = DEFAULT_WINDOW,
+            step: int = DEFAULT_STEP, horizon: int = DEFAULT_HORIZON, start: Optional[str] = None,
+            end: Optional[str] = None, max_windows: int = DEFAULT_MAX_WINDOWS, workers: int = DEFAULT_WORKERS,
+            budget: float = DEFAULT_TIME_BUDGET, fetch: Fetch = fetch_window) -> Dict[str, Any]:
+    """
+    Total and net spillover of every window inside [start, end].
+
+    Args:
+        data_info: The returns data array ({'timestamps', 'symbol_data'})
+        symbols: Symbols in display order
+        size: Window size in rows
+        step: Trading days between window starts
+        horizon: Forecast horizon of the variance decomposition
+        start, end: Optional date range of the windows
+        max_windows: Most windows per request
+        workers: Concurrent backend requests
+        budget: Seconds after which no more windows are started
+        fetch: Computes one window (the backend by default)
+
+    Returns:
+        {'x': window end dates, 'total': [...], 'net': {symbol: [...]},
+        'windows', 'computed', 'cached', 'failed', 'pending' (not started
+        within the budget), 'error' (the first failure)}; failed and pending
+        windows are None and are not cached
+
+    Raises:
+        ValueError: The range holds no complete window or more than max_windows
+    """
+    timestamps = data_info.get('timestamps', [])
+    lo, hi = window_bounds(to_epoch(timestamps), start, end) if timestamps else (0, 0)
+    starts = [lo + row for row in window_starts(timestamps[lo:hi], size, step)]
+    if not starts:
+        raise ValueError(f"The date range has fewer than {size} rows for a window.")
+    if len(starts) > max_windows:
+        raise ValueError(f"{len(starts)} windows exceed the limit of {max_windows}; "
+                         f"increase the step or shorten the date range.")
+
+    windows = [window_rows(data_info, symbols, row, size) for row in starts]
+    keys = [window_key(rows, size, horizon) for rows in windows]
+    results = cache.get_many(keys)
+    missing = [i for i, key in enumerate(keys) if key not in results]
+    errors, pending = [], []
+    deadline = time.monotonic() + budget
+
+    def run(i):
+        if time.monotonic() > deadline:
+            pending.append(i)
+            return None
+        try:
+            result = fetch(windows[i], size, horizon)
+        except Exception as e:
+            logger.warning(f"Rolling spillover window starting {windows[i][0][DATE_KEY]} failed: {e}")
+            errors.append(str(e))
+            return None
+        # Cached right away, so windows fetched before a timeout are not lost
+        cache.set(keys[i], result)
+        return result
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing)))) as pool:
+            fetched = dict(zip((keys[i] for i in missing), pool.map(run, missing)))
+        results.update({key: result for key, result in fetched.items() if result is not None})
+
+    ordered = [results.get(key) for key in keys]
+    return {
+        'x': [rows[-1][DATE_KEY] for rows in windows],
+        'total': [result['total'] if result else None for result in ordered],
+        'net': {symbol: [result['net'].get(symbol) if result else None for result in ordered]
+                for symbol in symbols},
+        'windows': len(keys),
+        'computed': len(missing) - len(errors) - len(pending),
+        'cached': len(keys) - len(missing),
+        'failed': len(errors),
+        'pending': len(pending),
+        'error': errors[0] if errors else None,
+    }
+
+
+def figure(series: Dict[str, Any], size: int) -> str:
+    """Total spillover above the net spillover of every symbol, against the window end dates."""
+    grid, axes = figure_builder.subplot_grid(
+        rows=2, cols=1, subplot_titles=["Total Spillover Index", "Net Spillover"], vertical_spacing=0.12)
+    x = series['x']
+    data = [figure_builder.on_axes(figure_builder.line_trace(
+        x, series['total'], "Total", color='#333333', width=2,
+        hovertemplate='Window ending %{x}<br>Total: %{y:.2f}%<extra></extra>'
+    ), axes[0])]
+    for i, (symbol, values) in enumerate(series['net'].items()):
+        data.append(figure_builder.on_axes(figure_builder.line_trace(
+            x, values, symbol, color=figure_builder.palette_color(i), width=1.5,
+            hovertemplate=f'<b>{symbol}</b><br>Window ending %{{x}}<br>Net: %{{y:.2f}}<extra></extra>'
+        ), axes[1]))
+    fig_layout = figure_builder.layout(
+        f"Rolling Spillover ({size}-day windows)", 600,
+        hovermode='x unified',
+        showlegend=True,
+        legend=figure_builder.HORIZONTAL_LEGEND,
+        shapes=[figure_builder.hline_shape(0, 'gray', dash='dash', opacity=0.6, axis=axes[1])],
+        **grid,
+    )
+    fig = figure_builder.figure(data, fig_layout)
+    return figure_builder.to_json(figure_builder.figure_spec(fig, [None] * len(data)))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/sparklines.py
+
+"""
+Small inline SVG sparklines for the Overview tab.
+Each series is reduced to at most one point per pixel with LTTB (missing
+values are skipped), scaled into the sparkline box and written as a single
+SVG polyline, with the coordinates formatted by numpy rather than point by
+point. The markup is plain SVG, so the Overview tab shows the sparklines
+without Plotly or any figure JSON. Sparklines are cached per dataset by
+content hash.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from django.core.cache import cache
+from django.utils.html import escape
+
+from . import plot_cache
+from .downsampling import lttb_indices
+
+logger = logging.getLogger(__name__)
+
+# Bump when the markup changes so sparklines cached by older code are not reused
+SPARKLINES_CACHE_VERSION = 1
+
+DEFAULT_WIDTH = 120
+DEFAULT_HEIGHT = 32
+# Space around the line so the stroke and end dot are not clipped
+_PADDING = 2.0
+
+# Sparkline kind -> (label, stroke color, draw a zero line)
+KINDS = {
+    'price': ('Price', '#0d6efd', False),
+    'returns': ('Returns', '#6c757d', True),
+    'volatility': ('Volatility', '#fd7e14', False),
+}
+
+
+def _coordinates(values: np.ndarray, lo: float, hi: float, extent: float) -> np.ndarray:
+    """Values scaled into [padding, extent - padding] (the middle when the range is flat)."""
+    if hi <= lo:
+        return np.full(len(values), extent / 2)
+    return _PADDING + (values - lo) / (hi - lo) * (extent - 2 * _PADDING)
+
+
+def svg(values: Sequence[Optional[float]], label: str, color: str, zero_line: bool = False,
+        width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT) -> str:
+    """
+    SVG markup of one sparkline, or '' with fewer than two values.
+
+    Args:
+        values: The series; None or NaN values are skipped
+        label: Accessible name of the image
+        color: Stroke color
+        zero_line: Draw a dashed line at zero (when it is inside the range)
+    """
+    y = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    x = np.flatnonzero(np.isfinite(y))
+    if len(x) < 2:
+        return ''
+    y = y[x]
+    kept = lttb_indices(x, y, width)
+    x, y = x[kept], y[kept]
+    lo, hi = float(y.min()), float(y.max())
+    px = _coordinates(x.astype(np.float64), float(x[0]), float(x[-1]), width)
+    py = height - _coordinates(y, lo, hi, height)
+    points = ' '.join(np.char.add(np.char.add(np.char.mod('%.1f', px), ','), np.char.mod('%.1f', py)))
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="sparkline" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" role="img" aria-label="{escape(label)}"><title>{escape(label)}</title>'
+    ]
+    if zero_line and lo < 0 < hi:
+        zero = height - float(_coordinates(np.array([0.0]), lo, hi, height)[0])
+        parts.append(f'<line x1="0" y1="{zero:.1f}" x2="{width}" y2="{zero:.1f}" stroke="#adb5bd" '
+                     f'stroke-width="0.5" stroke-dasharray="2,2"/>')
+    parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.2" '
+                 f'stroke-linejoin="round" stroke-linecap="round"/>')
+    parts.append(f'<circle cx="{px[-1]:.1f}" cy="{py[-1]:.1f}" r="1.8" fill="{color}"/>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def render(series: Dict[str, Dict[str, Sequence[Optional[float]]]], width: int = DEFAULT_WIDTH,
+           height: int = DEFAULT_HEIGHT) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Sparklines of every symbol.
+
+    Args:
+        series: {symbol: {kind: values}} with kinds from KINDS
+
+    Returns:
+        {symbol: {kind: {'svg', 'last' (the last value, None if missing)}}}
+    """
+    result = {}
+    for symbol, by_kind in series.items():
+        result[symbol] = {}
+        for kind, values in by_kind.items():
+            label, color, zero_line = KINDS[kind]
+            last = next((value for value in reversed(values) if value is not None and value == value), None)
+            result[symbol][kind] = {
+                'svg': svg(values, f'{symbol} {label.lower()}', color, zero_line, width, height),
+                'last': last,
+            }
+    return result
+
+
+def cached(data_hash: str, series: Dict[str, Dict[str, Sequence[Optional[float]]]],
+           variant: str = '') -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """render(), cached per dataset (under the hash of its data arrays) and variant (such as the window)."""
+    key = f'sparklines:v{SPARKLINES_CACHE_VERSION}:{data_hash}:{variant}:{plot_cache.content_hash(list(series))}'
+    sparklines = cache.get(key)
+    if sparklines is None:
+        sparklines = render(series)
+        cache.set(key, sparklines)
+    return sparklines
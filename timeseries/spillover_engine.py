@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/spillover_engine.py
+
+"""
+Local Diebold-Yilmaz spillover tables from the VAR's FEVD matrix.
+The backend returns var_results.fevd_matrix alongside its spillover results,
+with fevd[i, j] the share (in %) of variable j's forecast error variance
+caused by shocks to variable i, so every what-if view of the spillovers
+(another normalization, a symbol left out, symbols grouped into sectors) is
+a few matrix operations on that matrix instead of another pipeline run.
+The tables follow the backend's layout: pairwise[i, j] is the spillover from
+i to j, "to" sums a row and "from" a column, net is to - from and the total
+index is the sum of all pairwise spillovers.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .matrices import matrix_rows, nested_matrix, square_matrix
+from .result_model import PAIRWISE_SPILLOVER_LEVELS, SpilloverResults
+
+logger = logging.getLogger(__name__)
+
+# Normalization -> label for the what-if control
+NORMALIZATIONS = {
+    'column': 'Rescale each decomposition to 100%',
+    'none': 'Keep the returned shares',
+}
+DEFAULT_NORMALIZATION = 'column'
+
+# Largest difference (in percentage points) from the backend's tables that still counts as a match;
+# the backend rounds its results to 6 decimals
+CROSS_CHECK_TOLERANCE = 1e-4
+
+
+def parse_groups(text: str, symbols: Sequence[str]) -> Dict[str, List[str]]:
+    """
+    Parse sector groups written as "Tech: MSFT, AAPL; Mining: NEM.US".
+
+    Symbols that are not listed stay in a group of their own.
+
+    Raises:
+        ValueError: A group names an unknown symbol or a symbol is listed twice
+    """
+    groups: Dict[str, List[str]] = {}
+    seen = set()
+    for part in filter(None, (part.strip() for part in re.split(r'[;\n]', text or ''))):
+        name, _, members = part.partition(':')
+        if not members:
+            raise ValueError(f"Group {part!r} has no symbols; write it as 'Name: SYM1, SYM2'")
+        members = [symbol.strip() for symbol in members.split(',') if symbol.strip()]
+        for symbol in members:
+            if symbol not in symbols:
+                raise ValueError(f"Unknown symbol {symbol!r} in group {name.strip()!r}")
+            if symbol in seen:
+                raise ValueError(f"Symbol {symbol!r} is in more than one group")
+            seen.add(symbol)
+        groups.setdefault(name.strip() or 'Group', []).extend(members)
+    return groups
+
+
+def compute(fevd: np.ndarray, symbols: Sequence[str], normalization: str = DEFAULT_NORMALIZATION,
+            exclude: Sequence[str] = (), groups: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Total, directional, net and pairwise spillovers of an FEVD matrix.
+
+    Args:
+        fevd: N x N matrix, fevd[i, j] = share of j's forecast error variance due to i
+        symbols: Labels of the rows and columns
+        normalization: 'column' rescales every decomposition (column) to sum
+            to 100 after excluding and grouping; 'none' keeps the shares
+        exclude: Symbols left out of the system
+        groups: Group name -> symbols; the spillovers inside a group become
+            the group's own share
+
+    Returns:
+        Dict with 'labels', 'total' and the 'to', 'from', 'net' (arrays) and
+        'pairwise' (matrix) tables, in percent of the system's variance
+    """
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization {normalization!r}")
+    excluded = set(exclude)
+    keep = [i for i, symbol in enumerate(symbols) if symbol not in excluded]
+    if len(keep) < 2:
+        raise ValueError("At least two symbols are needed for spillovers")
+    labels = [symbols[i] for i in keep]
+    matrix = np.asarray(fevd, dtype=np.float64)[np.ix_(keep, keep)]
+
+    if groups:
+        grouped = {symbol for members in groups.values() for symbol in members}
+        members_by_label = [(name, [s for s in members if s in labels]) for name, members in groups.items()]
+        members_by_label = [(name, members) for name, members in members_by_label if members]
+        members_by_label += [(symbol, [symbol]) for symbol in labels if symbol not in grouped]
+        # (group, symbol) indicator; G @ M @ G.T sums the shares between groups
+        indicator = np.array([[symbol in members for symbol in labels] for _, members in members_by_label],
+                             dtype=np.float64)
+        matrix = indicator @ matrix @ indicator.T
+        labels = [name for name, _ in members_by_label]
+        if len(labels) < 2:
+            raise ValueError("At least two groups are needed for spillovers")
+
+    if normalization == 'column':
+        sums = matrix.sum(axis=0)
+        matrix = np.divide(matrix, sums, out=np.zeros_like(matrix), where=sums != 0) * 100.0
+
+    total_share = matrix.sum()
+    pairwise = matrix * (100.0 / total_share) if total_share else np.zeros_like(matrix)
+    np.fill_diagonal(pairwise, 0.0)
+    spill_to = pairwise.sum(axis=1)
+    spill_from = pairwise.sum(axis=0)
+    return {
+        'labels': labels,
+        'total': float(pairwise.sum()),
+        'to': spill_to,
+        'from': spill_from,
+        'net': spill_to - spill_from,
+        'pairwise': pairwise,
+    }
+
+
+def cross_check(local: Dict[str, Any], backend: SpilloverResults) -> Optional[Dict[str, Any]]:
+    """
+    Compare locally computed tables (of the full system) with the backend's.
+
+    Returns:
+        {'max_difference', 'matches'}, or None when the backend returned no tables
+    """
+    if backend is None or backend.total_spillover_index is None:
+        return None
+    labels = local['labels']
+    directional = backend.directional_spillover or {}
+    backend_to = np.array([(directional.get(s) or {}).get('to', np.nan) for s in labels], dtype=np.float64)
+    backend_from = np.array([(directional.get(s) or {}).get('from', np.nan) for s in labels], dtype=np.float64)
+    backend_net = np.array([(backend.net_spillover or {}).get(s, np.nan) for s in labels], dtype=np.float64)
+    backend_pairwise = nested_matrix(backend.pairwise_spillover or {}, labels)
+    differences = np.concatenate([
+        [local['total'] - backend.total_spillover_index],
+        local['to'] - backend_to,
+        local['from'] - backend_from,
+        local['net'] - backend_net,
+        (local['pairwise'] - np.where(np.eye(len(labels), dtype=bool), 0.0, backend_pairwise)).ravel(),
+    ])
+    differences = np.abs(differences[~np.isnan(differences)])
+    if not len(differences):
+        return None
+    max_difference = float(differences.max())
+    return {'max_difference': max_difference, 'matches': max_difference <= CROSS_CHECK_TOLERANCE}
+
+
+def scenario(fevd_matrix: Any, symbols: Sequence[str], backend: Optional[SpilloverResults] = None,
+             normalization: str = DEFAULT_NORMALIZATION, exclude: Sequence[str] = (),
+             groups_text: str = '') -> Optional[Dict[str, Any]]:
+    """
+    Template context of the what-if spillover view.
+
+    Raises:
+        ValueError: Invalid normalization, groups or exclusions
+    """
+    fevd = square_matrix(fevd_matrix, len(symbols)) if fevd_matrix else None
+    if fevd is None:
+        return None
+    groups = parse_groups(groups_text, symbols)
+    local = compute(fevd, symbols, normalization, exclude, groups)
+    baseline = local if not exclude and not groups and normalization == DEFAULT_NORMALIZATION \
+        else compute(fevd, symbols)
+    return {
+        'labels': local['labels'],
+        'total': local['total'],
+        'rows': [{'label': label, 'to': to, 'from': frm, 'net': net}
+                 for label, to, frm, net in zip(local['labels'], local['to'].tolist(),
+                                                local['from'].tolist(), local['net'].tolist())],
+        'pairwise_rows': matrix_rows(local['labels'], local['pairwise'], PAIRWISE_SPILLOVER_LEVELS,
+                                     'text-muted', 'text-muted'),
+        'cross_check': cross_check(baseline, backend),
+    }
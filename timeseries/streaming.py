@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/streaming.py
+
+"""
+Incremental parsing of pipeline responses.
+Reads the upstream body chunk by chunk and appends the rows of the large data
+arrays (original_data, returns_data, ...) straight into columnar lists, so
+neither the full response text nor the per-row dicts are ever held at once.
+All other sections are small and decoded as ordinary JSON values.
+"""
+
+import codecs
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sections that hold one row dict per timestamp
+DATA_ARRAY_KEYS = ('original_data', 'returns_data', 'scaled_data', 'pre_garch_data', 'post_garch_data')
+TIMESTAMP_KEYS = ('Date', 'index')
+
+# Records which data arrays were streamed and which timestamp key they used
+STREAMED_ARRAYS_KEY = '_streamed_arrays'
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _ColumnBuilder:
+    """Accumulates the rows of one data array as a timestamp list plus one list per symbol."""
+
+    def __init__(self):
+        self.timestamps: List[Any] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.timestamp_key: Optional[str] = None
+        self.rows = 0
+
+    def add_row(self, row: Dict[str, Any]) -> None:
+        # Same precedence as ResultsProcessor._process_data_array
+        for key in TIMESTAMP_KEYS:
+            if key in row:
+                self.timestamps.append(row[key])
+                self.timestamp_key = self.timestamp_key or key
+                break
+        for key, value in row.items():
+            if key in TIMESTAMP_KEYS:
+                continue
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [None] * self.rows
+            column.append(value)
+        self.rows += 1
+        for column in self.columns.values():
+            if len(column) < self.rows:
+                column.append(None)
+
+    def to_data_array(self) -> Dict[str, Any]:
+        """Return the ResultsProcessor data-array format."""
+        return {
+            'timestamps': self.timestamps,
+            'symbol_data': self.columns,
+            'count': len(self.timestamps),
+        }
+
+
+class _ChunkReader:
+    """Text buffer over a stream of byte chunks, decoding one JSON value at a time."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Append chunks until at least min_chars more characters are buffered."""
+        # Drop the consumed prefix so the buffer only holds unparsed text
+        pending = [self.text[self.pos:]]
+        added = 0
+        while added < min_chars and not self.eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self.eof = True
+                chunk = b''
+                text = self._decoder.decode(b'', final=True)
+            else:
+                self.bytes_read += len(chunk)
+                text = self._decoder.decode(chunk)
+            pending.append(text)
+            added += len(text)
+        self.text = ''.join(pending)
+        self.pos = 0
+        return added > 0
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at byte ~{self.bytes_read}, found {found!r}")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.text, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow the buffer geometrically so large values are re-decoded O(log n) times
+            self._fill(max(len(self.text) - self.pos, 1))
+
+
+def parse_pipeline_response(chunks: Iterable[bytes],
+                            array_keys: Tuple[str, ...] = DATA_ARRAY_KEYS) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Parse a run_pipeline response body incrementally.
+
+    Args:
+        chunks: Iterable of raw body chunks, e.g. response.iter_content()
+        array_keys: Top-level keys whose row lists are converted to columns
+
+    Returns:
+        Tuple of (response sections without the data arrays, data arrays in
+        the ResultsProcessor format keyed by section name)
+    """
+    reader = _ChunkReader(chunks)
+    sections: Dict[str, Any] = {}
+    builders: Dict[str, _ColumnBuilder] = {}
+
+    reader.expect('{')
+    while True:
+        char = reader.peek()
+        if char == '}':
+            break
+        if char == ',':
+            reader.pos += 1
+            continue
+        key = reader.read_value()
+        reader.expect(':')
+        if key in array_keys and reader.peek() == '[':
+            reader.pos += 1
+            builder = builders[key] = _ColumnBuilder()
+            while True:
+                char = reader.peek()
+                if char == ']':
+                    reader.pos += 1
+                    break
+                if char == ',':
+                    reader.pos += 1
+                    continue
+                row = reader.read_value()
+                if isinstance(row, dict):
+                    builder.add_row(row)
+        else:
+            sections[key] = reader.read_value()
+
+    data_arrays = {key: builder.to_data_array() for key, builder in builders.items() if builder.rows}
+    sections[STREAMED_ARRAYS_KEY] = {key: builders[key].timestamp_key or 'index' for key in data_arrays}
+    logger.info("Streamed pipeline response", extra={
+        'bytes': reader.bytes_read,
+        'rows': {key: array['count'] for key, array in data_arrays.items()},
+    })
+    return sections, data_arrays
+
+
+def rows_to_columns(rows: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+    """
+    Convert a row list into a columnar data array.
+
+    Returns:
+        Tuple of (data array in the ResultsProcessor format, timestamp key
+        the rows used)
+    """
+    builder = _ColumnBuilder()
+    for row in rows:
+        if isinstance(row, dict):
+            builder.add_row(row)
+    return builder.to_data_array(), builder.timestamp_key or 'index'
+
+
+def restore_rows(raw_results: Dict[str, Any], data_arrays: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuild the row lists of a streamed response from its columnar data arrays.
+
+    Used where the full original response is needed (download and viewer);
+    responses parsed with json.loads are returned unchanged.
+    """
+    streamed = raw_results.get(STREAMED_ARRAYS_KEY)
+    if streamed is None:
+        return raw_results
+    restored = {key: value for key, value in raw_results.items() if key != STREAMED_ARRAYS_KEY}
+    for key, timestamp_key in streamed.items():
+        array = data_arrays.get(key, {})
+        symbol_data = array.get('symbol_data', {})
+        rows = []
+        for i, timestamp in enumerate(array.get('timestamps', [])):
+            row = {timestamp_key: timestamp}
+            for symbol, values in symbol_data.items():
+                row[symbol] = values[i] if i < len(values) else None
+            rows.append(row)
+        restored[key] = rows
+    return restored
@@ -1,6 +1,924 @@
 #!/usr/bin/env python3
 # timeseries/tests.py
 
-from django.test import TestCase
+import base64
+import copy
+import dataclasses
+import json
+import logging.handlers
+import re
+from html import unescape as html_unescape
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+
+from django.conf import settings
+from django.test import Client, SimpleTestCase, override_settings
+
+from . import (arima_forecast, correlation_index, descriptive_stats, diagnostics, downsampling, figure_builder,
+               garch_forecast, logging_utils, monte_carlo, pair_tables, pipeline_stages, plot_cache, precision,
+               price_analytics, resampling, result_model, rolling_spillover, sparklines, spillover_engine,
+               trading_calendar)
+from .streaming import parse_pipeline_response, restore_rows
+from .plotting_utils import TimeSeriesPlotter
+from .results_processor import ResultsProcessor
+
+GOLDEN_FIGURES_PATH = Path(__file__).resolve().parent / 'testdata' / 'golden_figures.json'
+
+
+def load_sample_results():
+    """Load the sample pipeline response shipped with the repository."""
+    with open(Path(settings.BASE_DIR) / 'sample.json') as f:
+        return json.load(f)
+
+
+def plotter_fixture(raw):
+    """Reshape the sample response into the per-symbol format TimeSeriesPlotter reads."""
+    symbols = [k for k in raw['original_data'][0] if k not in ('index', 'Date')]
+    dates = [row['index'][:10] for row in raw['original_data']]
+    data = {}
+    for n, symbol in enumerate(symbols):
+        entry = {'dates': dates, 'prices': [row[symbol] for row in raw['original_data']]}
+        if n == 0:
+            entry['returns'] = [0.0] + [row[symbol] for row in raw['returns_data']]
+        if n == 1:
+            entry['scaled_data'] = [0.0] + [row[symbol] for row in raw['scaled_data']]
+        data[symbol] = entry
+    arima = raw['arima_results']['all_symbols_arima']
+    garch = raw['garch_results']['all_symbols_garch']
+    stationarity = raw['stationarity_results']['all_symbols_stationarity']['all_symbols_stationarity']
+    return {
+        'data': data,
+        'arima_results': {
+            s: {'forecast': arima[s]['forecast']['point_forecasts'],
+                'forecast_se': [0.05 * (j + 1) for j in range(len(arima[s]['forecast']['point_forecasts']))]}
+            for s in symbols
+        },
+        'garch_results': {s: {'volatility_forecast': garch[s]['forecast']} for s in symbols},
+        'spillover_results': {'spillover_matrix': raw['spillover_results']['pairwise_spillover']},
+        'stationarity_results': {
+            s: {'p_value': stationarity[s]['p_value'], 'adf_statistic': stationarity[s]['adf_statistic'],
+                'is_stationary': n != 1}
+            for n, s in enumerate(symbols)
+        },
+    }
+
+
+def decode_typed_arrays(obj):
+    """Replace Plotly.js typed-array payloads ({'dtype', 'bdata'}) with nested lists."""
+    if isinstance(obj, dict):
+        if set(obj) >= {'dtype', 'bdata'}:
+            values = np.frombuffer(base64.b64decode(obj['bdata']), dtype=obj['dtype'])
+            if 'shape' in obj:
+                values = values.reshape([int(n) for n in str(obj['shape']).split(',')])
+            # NaN is how null (a gap) travels in a typed array
+            return np.where(np.isnan(values), None, values).tolist()
+        return {k: decode_typed_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode_typed_arrays(v) for v in obj]
+    return obj
+
+
+NO_PLOT_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'plots': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+LOCMEM_PLOT_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'plots': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'plot-cache-tests'},
+}
+
+
+def session_client(raw):
+    """Test client whose session holds the processed sample results, as after a pipeline run."""
+    client = Client()
+    session = client.session
+    processor = ResultsProcessor(raw)
+    session['analysis_raw_results'] = raw
+    session['analysis_results'] = processor.process_all()
+    session['analysis_result_hash'] = processor.content_hash
+    session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    return client
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class ResultsViewTests(SimpleTestCase):
+    """Links rendered on the results page must resolve against the session's results."""
+
+    def test_export_links_download_csv(self):
+        client = session_client(load_sample_results())
+        for query in ('', '?freq=M'):
+            html = client.get(f'/results/{query}').content.decode()
+            links = re.findall(r'href="(/export-csv/[^"]*)"', html)
+            self.assertTrue(any(link.split('?')[0].endswith('_data/') for link in links))
+            for link in links:
+                response = client.get(html_unescape(link))
+                self.assertEqual(response.status_code, 200, link)
+                self.assertEqual(response['Content-Type'], 'text/csv')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'results-context-tests'}})
+    def test_model_context_built_once_per_result(self):
+        client = session_client(load_sample_results())
+        with mock.patch('timeseries.views.result_model.decode', wraps=result_model.decode) as decode, \
+                mock.patch('timeseries.views.arima_forecast.cross_check',
+                           wraps=arima_forecast.cross_check) as cross_check:
+            first = client.get('/results/')
+            second = client.get('/results/')
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(cross_check.call_count, 1)
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+
+        # The resampled page keys its caches on the result hash stored in the session
+        with mock.patch('timeseries.plot_cache.content_hash', wraps=plot_cache.content_hash) as content_hash:
+            self.assertEqual(client.get('/results/?freq=M').status_code, 200)
+        hashed = [call.args[0] for call in content_hash.call_args_list]
+        self.assertFalse([obj for obj in hashed if isinstance(obj, dict) and 'arima_results' in obj])
+
+
+@override_settings(CACHES=NO_PLOT_CACHE)
+class FigureBuilderGoldenTests(SimpleTestCase):
+    """
+    The raw-dict figure builder must produce the same figures the
+    plotly.graph_objects implementation produced (captured in testdata).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(GOLDEN_FIGURES_PATH) as f:
+            cls.golden = json.load(f)
+        raw = load_sample_results()
+        cls.figures = {}
+        processor = ResultsProcessor(copy.deepcopy(raw))
+        plots = processor.create_plots()
+        dataset = json.loads(processor.plot_dataset.to_json())
+        for name, spec in plots.items():
+            cls.figures[f'results_processor.{name}'] = json.dumps(
+                figure_builder.assemble_figure(json.loads(spec), dataset))
+        for name, fig in TimeSeriesPlotter(plotter_fixture(raw)).create_all_plots().items():
+            cls.figures[f'plotting_utils.{name}'] = fig
+
+    def test_same_set_of_figures(self):
+        self.assertEqual(sorted(self.figures), sorted(self.golden))
+
+    def test_figures_match_golden(self):
+        for name, golden in self.golden.items():
+            with self.subTest(figure=name):
+                fig = json.loads(self.figures[name])
+                template = fig['layout'].pop('template')
+                self.assertEqual(template, figure_builder.PLOTLY_WHITE_TEMPLATE)
+                self.assertEqual(decode_typed_arrays(fig), decode_typed_arrays(golden))
+
+
+class WebGLSwitchTests(SimpleTestCase):
+    """Scatter traces switch to scattergl above the point threshold and keep their styling."""
+
+    def test_switch_above_threshold(self):
+        x = list(range(100))
+        fig = figure_builder.series_figure([('A', x, x), ('B', x, x)], 'Test', 'Value', 'Value')
+        self.assertIs(figure_builder.use_webgl(fig, 200), fig)
+        switched = figure_builder.use_webgl(fig, 199)
+        self.assertEqual([trace['type'] for trace in switched['data']], ['scattergl', 'scattergl'])
+        for before, after in zip(fig['data'], switched['data']):
+            self.assertEqual({k: v for k, v in after.items() if k != 'type'},
+                             {k: v for k, v in before.items() if k != 'type'})
+        with override_settings(PLOT_WEBGL_POINT_THRESHOLD=150):
+            spec = figure_builder.figure_spec(fig, [['returns_data', 'A'], ['returns_data', 'B']])
+        self.assertEqual({trace['type'] for trace in spec['data']}, {'scattergl'})
+
+    def test_setting_default_and_explicit_none(self):
+        x = list(range(100))
+        fig = figure_builder.series_figure([('A', x, x)], 'Test', 'Value', 'Value')
+        with override_settings(PLOT_WEBGL_POINT_THRESHOLD=10, PLOT_ARRAY_DTYPE='f4'):
+            by_default = json.loads(figure_builder.to_json(fig))
+            explicit = json.loads(figure_builder.to_json(fig, dtype=None, webgl_threshold=None))
+        self.assertEqual((by_default['data'][0]['type'], by_default['data'][0]['y']['dtype']), ('scattergl', 'f4'))
+        self.assertEqual((explicit['data'][0]['type'], explicit['data'][0]['y']), ('scatter', x))
+
+
+class PlotDatasetTests(SimpleTestCase):
+    """Dataset columns hold only their own points, positioned on the shared axis."""
+
+    def test_columns_are_not_padded(self):
+        dataset = figure_builder.PlotDataset()
+        a = dataset.add('returns_data', 'A', ['2024-01-01', '2024-01-03', '2024-01-05'], [1.0, None, 3.0])
+        b = dataset.add('returns_data', 'B', ['2024-01-02', '2024-01-04'], [4.0, 5.0])
+        spec = {'data': [{'type': 'scatter', 'source': a}, {'type': 'scatter', 'source': b}], 'layout': {}}
+        for dtype in ('f8', None):
+            with self.subTest(dtype=dtype):
+                shipped = json.loads(dataset.to_json(dtype))
+                self.assertEqual(len(shipped['timestamps']), 5)
+                self.assertEqual(decode_typed_arrays(shipped['columns']['returns_data']),
+                                 {'A': [1.0, 3.0], 'B': [4.0, 5.0]})
+                self.assertEqual(decode_typed_arrays(shipped['indices']['returns_data']),
+                                 {'A': [0, 4], 'B': [1, 3]})
+                traces = figure_builder.assemble_figure(spec, shipped)['data']
+                self.assertEqual([(t['x'], t['y']) for t in traces],
+                                 [(['2024-01-01', '2024-01-05'], [1.0, 3.0]), (['2024-01-02', '2024-01-04'], [4.0, 5.0])])
+        with override_settings(PLOT_ARRAY_DTYPE='f4'):
+            self.assertEqual(dataset.to_dict()['columns']['returns_data']['A']['dtype'], 'f4')
+
+
+class PlotBenchmarkTests(SimpleTestCase):
+    """The plot benchmark page is only served to staff users or in DEBUG."""
+
+    def test_needs_staff_or_debug(self):
+        self.assertEqual(Client().get('/debug/plot-benchmark?points=10&traces=1').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(Client().get('/debug/plot-benchmark?points=10&traces=1').status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_PLOT_CACHE)
+class PlotCacheTests(SimpleTestCase):
+    """Figures are served from the plot cache on a second build of the same results."""
+
+    def setUp(self):
+        plot_cache.invalidate()
+        self.raw = load_sample_results()
+
+    def build(self):
+        processor = ResultsProcessor(copy.deepcopy(self.raw))
+        return processor.create_plots(), processor.plot_dataset.to_json()
+
+    def test_second_build_hits_cache(self):
+        plots, dataset = self.build()
+        misses = plot_cache.stats()['misses']
+        self.assertEqual(plot_cache.stats()['hits'], 0)
+
+        cached_plots, cached_dataset = self.build()
+        self.assertEqual(cached_plots, plots)
+        self.assertEqual(cached_dataset, dataset)
+        stats = plot_cache.stats()
+        self.assertEqual(stats['hits'], misses)
+        self.assertEqual(stats['misses'], misses)
+
+    def test_invalidate_result(self):
+        self.build()
+        plot_cache.invalidate(ResultsProcessor(copy.deepcopy(self.raw)).content_hash)
+        hits = plot_cache.stats()['hits']
+        self.build()
+        self.assertEqual(plot_cache.stats()['hits'], hits)
+
+    def test_invalidation_needs_staff_and_csrf(self):
+        self.build()
+        entries = plot_cache.stats()['misses']
+        response = Client().post('/debug/plot-cache')
+        self.assertEqual(response.status_code, 403)
+        with override_settings(DEBUG=True):
+            # Cross-site posts without a CSRF token are rejected before the view
+            self.assertEqual(Client(enforce_csrf_checks=True).post('/debug/plot-cache').status_code, 403)
+        self.build()
+        self.assertEqual(plot_cache.stats()['hits'], entries)
+        with override_settings(DEBUG=True):
+            self.assertEqual(Client().post('/debug/plot-cache').json()['invalidated'], 'all')
+
+
+@override_settings(CACHES=NO_PLOT_CACHE)
+class StreamingParseTests(SimpleTestCase):
+    """Streaming a response must give the same processed results as json.loads."""
+
+    def chunks(self, size):
+        body = (Path(settings.BASE_DIR) / 'sample.json').read_bytes()
+        return (body[i:i + size] for i in range(0, len(body), size))
+
+    def test_streamed_matches_loaded(self):
+        expected = ResultsProcessor(load_sample_results()).process_all()
+        for size in (7, 4096):
+            with self.subTest(chunk_size=size):
+                sections, data_arrays = parse_pipeline_response(self.chunks(size))
+                self.assertEqual(ResultsProcessor(sections, data_arrays=data_arrays).process_all(), expected)
+
+    def test_restore_rows(self):
+        sections, data_arrays = parse_pipeline_response(self.chunks(1024))
+        self.assertEqual(restore_rows(sections, data_arrays), load_sample_results())
+
+
+STAGE_PAYLOAD = {
+    'source_actual_or_synthetic_data': 'synthetic',
+    'symbols': ['MSFT', 'AAPL', 'NEM.US'],
+    'synthetic_anchor_prices': [10.0, 20.0, 30.0],
+    'data_start_date': '2023-01-01',
+    'data_end_date': '2023-02-01',
+    'scaling_method': 'standardize',
+    'arima_params': {'p': 1, 'd': 1, 'q': 1, 'forecast_steps': 10},
+    'garch_params': {'p': 1, 'q': 1, 'dist': 't', 'forecast_steps': 3},
+    'spillover_enabled': True,
+    'spillover_params': {'method': 'diebold_yilmaz', 'forecast_horizon': 5},
+}
+
+
+@override_settings(CACHES={**NO_PLOT_CACHE, 'stages': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'stage-cache-tests'}})
+class PipelineStageTests(SimpleTestCase):
+    """Only the stages downstream of a parameter change are recomputed."""
+
+    def setUp(self):
+        pipeline_stages._cache().clear()
+        self.raw = load_sample_results()
+        pipeline_stages.plan(STAGE_PAYLOAD).store(copy.deepcopy(self.raw), None)
+
+    def test_garch_change_reuses_spillover(self):
+        payload = copy.deepcopy(STAGE_PAYLOAD)
+        payload['garch_params']['dist'] = 'skewt'
+        stage_plan = pipeline_stages.plan(payload)
+        self.assertFalse(stage_plan.complete)
+        self.assertEqual(stage_plan.reused, ['spillover'])
+        request_payload = stage_plan.request_payload()
+        self.assertFalse(request_payload['spillover_enabled'])
+        self.assertNotIn('enabled', request_payload['garch_params'])
+
+        response = {key: value for key, value in copy.deepcopy(self.raw).items()
+                    if key not in ('var_results', 'spillover_results', 'granger_causality_results')}
+        stage_plan.merge(response, None)
+        self.assertEqual(response['spillover_results'], self.raw['spillover_results'])
+
+    def test_unchanged_payload_is_assembled_from_cache(self):
+        stage_plan = pipeline_stages.plan(STAGE_PAYLOAD)
+        self.assertTrue(stage_plan.complete)
+        self.assertEqual(stage_plan.assemble(streamed=False), (self.raw, None))
+        expected = ResultsProcessor(self.raw).process_all()
+        sections, data_arrays = stage_plan.assemble(streamed=True)
+        self.assertEqual(ResultsProcessor(sections, data_arrays=data_arrays).process_all(), expected)
+
+
+class DescriptiveStatsTests(SimpleTestCase):
+    """The one-pass statistics must match pandas for every series, gaps included."""
+
+    def test_matches_pandas(self):
+        import pandas as pd
+        processor = ResultsProcessor(load_sample_results())
+        data_arrays = copy.deepcopy(processor.data_arrays)
+        data_arrays['returns_data']['symbol_data']['AAPL'][3] = None
+        stats = descriptive_stats.compute(data_arrays, processor.symbols)
+        self.assertEqual(sorted(stats), sorted(data_arrays))
+        for data_type, data_info in data_arrays.items():
+            frame = pd.DataFrame(data_info['symbol_data'], dtype=float)
+            expected = {'count': frame.count(), 'missing': frame.isna().sum(), 'mean': frame.mean(),
+                        'std': frame.std(), 'min': frame.min(), 'median': frame.median(),
+                        'q95': frame.quantile(0.95), 'max': frame.max(), 'skew': frame.skew(), 'kurt': frame.kurt()}
+            for symbol in processor.symbols:
+                for name, values in expected.items():
+                    with self.subTest(data_type=data_type, symbol=symbol, statistic=name):
+                        self.assertAlmostEqual(stats[data_type][symbol][name], values[symbol], places=10)
+
+    def test_cache_key_hashes_symbols(self):
+        symbols = [f'SYMBOL{i:04d}' for i in range(2000)]
+        with mock.patch('timeseries.descriptive_stats.cache') as cache:
+            cache.get.return_value = {}
+            descriptive_stats.cached('abc', {}, symbols)
+        key = cache.get.call_args[0][0]
+        self.assertLess(len(key), 250)
+        self.assertNotIn('SYMBOL', key)
+
+
+def lttb_reference(x, y, threshold):
+    """Point-by-point LTTB with the same buckets as downsampling.lttb_indices."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    edges = [int(i * every) + 1 for i in range(threshold - 1)]
+    edges[-1] = n - 1
+    selected = [0]
+    for i in range(threshold - 2):
+        if i + 2 < len(edges):
+            bucket = range(edges[i + 1], edges[i + 2])
+            next_x = sum(x[j] for j in bucket) / len(bucket)
+            next_y = sum(y[j] for j in bucket) / len(bucket)
+        else:
+            next_x, next_y = x[-1], y[-1]
+        a = selected[-1]
+        areas = [abs((x[a] - next_x) * (y[j] - y[a]) - (x[a] - x[j]) * (next_y - y[a]))
+                 for j in range(edges[i], edges[i + 1])]
+        selected.append(edges[i] + areas.index(max(areas)))
+    return selected + [n - 1]
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+class DownsamplingTests(SimpleTestCase):
+    """LTTB keeps the end points and the point budget, and plot_range serves the visible window."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.x = np.arange(500, dtype=float)
+        self.y = np.cumsum(rng.normal(size=(4, 500)), axis=1)
+
+    def test_keeps_end_points_and_budget(self):
+        for threshold in (3, 10, 57, 499):
+            with self.subTest(threshold=threshold):
+                indices = downsampling.lttb_indices(self.x, self.y[0], threshold)
+                self.assertEqual(len(indices), threshold)
+                self.assertEqual((indices[0], indices[-1]), (0, 499))
+                self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_vectorized_matches_reference(self):
+        batch = downsampling.lttb_indices(self.x, self.y, 40)
+        self.assertEqual(batch.shape, (4, 40))
+        for row, indices in enumerate(batch):
+            self.assertEqual(indices.tolist(), lttb_reference(self.x.tolist(), self.y[row].tolist(), 40))
+
+    def test_short_input_passes_through(self):
+        self.assertEqual(downsampling.lttb_indices(self.x[:20], self.y[0, :20], 20).tolist(), list(range(20)))
+        timestamps = [f'2024-01-{day:02d}' for day in range(1, 11)]
+        columns = {'A': [1.0, None, *range(8)], 'B': list(range(10))}
+        series = downsampling.downsample_columns(timestamps, columns, 50)
+        self.assertEqual(series[0], ('A', [timestamps[0], *timestamps[2:]], [1.0, *range(8)]))
+        self.assertEqual(series[1], ('B', timestamps, list(range(10))))
+
+    @override_settings(PLOT_MAX_POINTS_PER_TRACE=5)
+    def test_plot_range_returns_points_in_window(self):
+        client = session_client(load_sample_results())
+        payload = client.get('/plots/range/original_data_stats/',
+                             {'start': '2023-01-05', 'end': '2023-01-20'}).json()
+        self.assertTrue(payload['traces'])
+        for trace in payload['traces']:
+            self.assertLessEqual(len(trace['x']), 5)
+            self.assertTrue(all('2023-01-05' <= x[:10] <= '2023-01-20' for x in trace['x']), trace['x'])
+        overview = client.get('/plots/range/original_data_stats/').json()
+        self.assertEqual({len(trace['x']) for trace in overview['traces']}, {5})
+
+    def test_plot_range_rejects_bad_dates(self):
+        client = session_client(load_sample_results())
+        response = client.get('/plots/range/original_data_stats/', {'start': 'not-a-date', 'end': '2023-01-20'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.get('/plots/range/unknown/').status_code, 404)
+
+
+class ResamplingTests(SimpleTestCase):
+    """Calendar resampling must match pandas: period close, compounded log returns, means."""
+
+    def test_matches_pandas(self):
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range('2022-12-01', periods=120)
+        prices = 100 * np.exp(rng.normal(0, 0.01, (120, 2)).cumsum(axis=0))
+        prices[5, 0] = np.nan
+        returns = np.diff(np.log(prices), axis=0)
+        column = lambda values: [None if np.isnan(v) else float(v) for v in values]
+        timestamps = dates.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+        data_arrays = {
+            'original_data': {'timestamps': timestamps,
+                              'symbol_data': {'A': column(prices[:, 0]), 'B': column(prices[:, 1])}},
+            'returns_data': {'timestamps': timestamps[1:],
+                             'symbol_data': {'A': column(returns[:, 0]), 'B': column(returns[:, 1])}},
+            'scaled_data': {'timestamps': timestamps[1:],
+                            'symbol_data': {'A': column(returns[:, 0]), 'B': column(returns[:, 1])}},
+        }
+        price_frame = pd.DataFrame(prices, index=dates, columns=['A', 'B'])
+        return_frame = pd.DataFrame(returns, index=dates[1:], columns=['A', 'B'])
+        for frequency, rule in (('W', 'W-FRI'), ('M', 'ME'), ('Q', 'QE')):
+            resampled = resampling.resample(data_arrays, frequency)
+            expected = {'original_data': price_frame.resample(rule).last(),
+                        'returns_data': return_frame.resample(rule).sum(min_count=1),
+                        'scaled_data': return_frame.resample(rule).mean()}
+            for data_type, frame in expected.items():
+                with self.subTest(frequency=frequency, data_type=data_type):
+                    got = pd.DataFrame(resampled[data_type]['symbol_data'], dtype=float)
+                    np.testing.assert_allclose(got.to_numpy(), frame.to_numpy(), rtol=1e-12)
+            ohlc = resampling.resample_ohlc(data_arrays['original_data'], frequency)['symbol_data']['A']
+            expected_ohlc = price_frame['A'].resample(rule).ohlc()
+            for field in resampling.OHLC:
+                np.testing.assert_allclose(np.array(ohlc[field], dtype=float), expected_ohlc[field], rtol=1e-12)
+        # Periods are labelled with their last row (weeks end on Friday)
+        self.assertEqual(resampling.resample(data_arrays, 'W')['original_data']['timestamps'][:2],
+                         ['2022-12-02T00:00:00', '2022-12-09T00:00:00'])
+        with self.assertRaises(ValueError):
+            resampling.parse_frequency('Y')
+
+
+class CorrelationIndexTests(SimpleTestCase):
+    """Window and rolling correlations from the prefix sums must match pandas, gaps included."""
+
+    def test_matches_pandas(self):
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(300, 4)) + rng.normal(size=(300, 1))
+        values[rng.random(values.shape) < 0.05] = np.nan
+        dates = pd.bdate_range('2023-01-02', periods=300)
+        symbols = ['A', 'B', 'C', 'D']
+        symbol_data = {s: [None if np.isnan(v) else float(v) for v in values[:, k]] for k, s in enumerate(symbols)}
+        frame = pd.DataFrame(values, index=dates, columns=symbols)
+        timestamps = dates.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+        # Every row a prefix, and prefixes every 16 rows with directly summed edges
+        for block_size in (1, 16):
+            index = correlation_index.CorrelationIndex(timestamps, symbol_data, symbols, block_size=block_size)
+            for start, end in ((None, None), ('2023-02-03', '2023-09-14'), ('2023-05-01', '2023-05-04')):
+                with self.subTest(block_size=block_size, start=start, end=end):
+                    window = index.window(start, end)
+                    expected = frame.loc[start:end].corr().to_numpy()
+                    np.testing.assert_allclose(np.array(window['matrix'], dtype=float), expected, atol=1e-12)
+        x, rolling = index.rolling([('A', 'C')], 20, min_periods=15)
+        expected = frame['A'].rolling(20, min_periods=15).corr(frame['C']).iloc[19:]
+        self.assertEqual(x, timestamps[19:])
+        np.testing.assert_allclose(np.array(rolling['A / C'], dtype=float), expected.to_numpy(), atol=1e-12)
+
+
+class ArimaForecastTests(SimpleTestCase):
+    """The local forecaster must reproduce the backend's forecasts and extend them consistently."""
+
+    def test_matches_backend_and_extends_horizon(self):
+        model = result_model.decode(load_sample_results())
+        models = [arima_forecast.model_from(symbol, result) for symbol, result in model.arima.items()]
+        check = arima_forecast.cross_check(models, model.arima)
+        self.assertTrue(check['matches'], check)
+        self.assertEqual(set(check['differences']), set(model.arima))
+
+        extended = arima_forecast.extend(model.arima, 60)
+        for symbol, forecast in extended.items():
+            with self.subTest(symbol=symbol):
+                self.assertEqual(len(forecast['x']), 60)
+                self.assertEqual(forecast['x'][0], arima_forecast.extend(model.arima, 1)[symbol]['x'][0])
+                backend_lower, _ = arima_forecast.backend_bounds(model.arima[symbol])
+                np.testing.assert_allclose(forecast['lower'][:10], backend_lower,
+                                           atol=arima_forecast.CROSS_CHECK_TOLERANCE)
+                self.assertTrue(np.all(np.array(forecast['upper']) > np.array(forecast['point'])))
+        self.assertEqual(arima_forecast.parse_order('ARIMA(2, 1, 0)'), (2, 1, 0))
+        self.assertIsNone(arima_forecast.parse_order('GARCH(1,1)'))
+
+
+class GarchForecastTests(SimpleTestCase):
+    """Closed-form volatility forecasts must reproduce the backend's steps from the summary parameters."""
+
+    def test_matches_backend_and_converges(self):
+        model = result_model.decode(load_sample_results())
+        models = garch_forecast.models_from(model.garch)
+        self.assertEqual([m.symbol for m in models], list(model.garch))
+        self.assertEqual(models[0].distribution, "Standardized Student's t")
+        check = garch_forecast.cross_check(models, model.garch)
+        self.assertTrue(check['matches'], check)
+
+        # The closed form equals the one-step recursion and tends to the unconditional variance
+        stationary = garch_forecast.GarchModel('X', omega=0.2, alpha=0.1, beta=0.8, first_variance=4.0)
+        integrated = garch_forecast.GarchModel('Y', omega=0.5, alpha=0.3, beta=0.7, first_variance=1.0)
+        variance = garch_forecast.variance_forecast([stationary, integrated], 500)
+        recursion = [4.0]
+        for _ in range(4):
+            recursion.append(0.2 + 0.9 * recursion[-1])
+        np.testing.assert_allclose(variance[0, :5], recursion)
+        self.assertAlmostEqual(variance[0, -1], 0.2 / (1 - 0.9))
+        np.testing.assert_allclose(variance[1, :3], [1.0, 1.5, 2.0])
+
+
+class MonteCarloTests(SimpleTestCase):
+    """Simulated paths must have the analytic ARIMA distribution and standardized shocks."""
+
+    def test_paths_match_analytic_forecasts(self):
+        rng = np.random.default_rng(0)
+        for distribution, shape in (('normal', ()), ('t', (6.0,)), ('skewt', (6.0, -0.3)), ('ged', (1.5,))):
+            with self.subTest(distribution=distribution):
+                draws = monte_carlo.standardized_draws(rng, distribution, shape, (200000,))
+                self.assertAlmostEqual(draws.mean(), 0, delta=0.01)
+                self.assertAlmostEqual(draws.var(), 1, delta=0.03)
+
+        model = result_model.decode(load_sample_results())
+        models = monte_carlo.path_models(model)
+        self.assertEqual([m.distribution for m in models], ['t'] * 3)
+        # Without GARCH the paths are the ARIMA forecast distribution
+        constant = [dataclasses.replace(m, garch=None, distribution='normal', shape=()) for m in models]
+        count = 20000
+        paths = monte_carlo.simulate_paths(constant, count, 5, np.random.default_rng(1))
+        analytic = arima_forecast.forecast([arima_forecast.model_from(s, r) for s, r in model.arima.items()], 5)
+        for j, m in enumerate(constant):
+            sd = (np.array(analytic[m.symbol]['upper']) - analytic[m.symbol]['point']) / 1.959964
+            np.testing.assert_allclose(paths[:, :, j].mean(axis=0), analytic[m.symbol]['point'],
+                                       atol=4 * sd[0] / np.sqrt(count))
+            np.testing.assert_allclose(paths[:, :, j].std(axis=0), sd, rtol=0.03)
+
+        first = monte_carlo.simulate(models, 3000, 4, seed=7, chunk_paths=1000, workers=1)
+        again = monte_carlo.simulate(models, 3000, 4, seed=7, chunk_paths=1000, workers=1)
+        np.testing.assert_array_equal(first['bands'], again['bands'])
+        self.assertEqual(first['bands'].shape, (len(monte_carlo.QUANTILES), 4, 3))
+        self.assertEqual(first['throughput']['chunks'], 3)
+
+    @override_settings(MONTE_CARLO_WORKERS=2)
+    def test_pool_is_shared_between_runs(self):
+        self.addCleanup(monte_carlo._reset_pool)
+        models = monte_carlo.path_models(result_model.decode(load_sample_results()))
+        pooled = monte_carlo.simulate(models, 2000, 3, seed=5, chunk_paths=500)
+        pool = monte_carlo._pool
+        monte_carlo.simulate(models, 2000, 3, seed=6, chunk_paths=500)
+        self.assertIsNotNone(pool)
+        self.assertIs(monte_carlo._pool, pool)
+        in_process = monte_carlo.simulate(models, 2000, 3, seed=5, chunk_paths=500, workers=1)
+        np.testing.assert_array_equal(pooled['bands'], in_process['bands'])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache', MONTE_CARLO_MAX_PATHS=1000)
+    def test_path_limit_for_anonymous_users(self):
+        client = session_client(load_sample_results())
+        response = client.get('/forecast/fan/', {'paths': 1001, 'steps': 3})
+        self.assertContains(response, 'Paths must be between 1 and 1000')
+        with override_settings(DEBUG=True):
+            response = client.get('/forecast/fan/', {'paths': 1001, 'steps': 3})
+        self.assertNotContains(response, 'Paths must be between')
+
+
+class PriceAnalyticsTests(SimpleTestCase):
+    """Cumulative returns, drawdowns and rolling volatility must match pandas, gaps included."""
+
+    def test_matches_pandas(self):
+        rng = np.random.default_rng(3)
+        returns = rng.standard_normal((300, 4)) * 0.01
+        returns[rng.random(returns.shape) < 0.02] = np.nan
+        prices = 50 * np.exp(np.nancumsum(returns, axis=0))
+        prices[:5, 1] = np.nan  # Listed late
+        symbols = ['A', 'B', 'C', 'D']
+        timestamps = [str(day) for day in pd.bdate_range('2024-01-01', periods=300).date]
+        arrays = {name: {'timestamps': timestamps, 'symbol_data': {s: [None if np.isnan(v) else v for v in values[:, j]]
+                                                                   for j, s in enumerate(symbols)}}
+                  for name, values in (('original_data', prices), ('returns_data', returns))}
+        result = price_analytics.compute(arrays, symbols, windows=(21, 63, 500))
+
+        frame = pd.DataFrame(prices, columns=symbols)
+        first = frame.apply(lambda column: column.dropna().iloc[0])
+        expected = {'cumulative_returns': frame / first - 1, 'drawdowns': frame / frame.cummax() - 1}
+        for name, reference in expected.items():
+            got = pd.DataFrame(result[name]['symbol_data'], dtype=float)
+            np.testing.assert_allclose(got.values, reference.values, atol=1e-12, equal_nan=True)
+        self.assertEqual(list(result['rolling_volatility']['windows']), [21, 63, 150])
+        for window, by_symbol in result['rolling_volatility']['windows'].items():
+            reference = pd.DataFrame(returns, columns=symbols).rolling(window).std()
+            got = pd.DataFrame(by_symbol, dtype=float)
+            np.testing.assert_allclose(got.values, reference.values, atol=1e-12, equal_nan=True)
+        worst = result['max_drawdowns']['A']
+        self.assertAlmostEqual(worst['depth'], expected['drawdowns']['A'].min())
+        self.assertEqual(worst['trough'], timestamps[int(expected['drawdowns']['A'].idxmin())])
+        header, rows = price_analytics.table(result, 'rolling_volatility')
+        self.assertEqual(header[:3], ['Date', 'A_21', 'B_21'])
+        self.assertEqual(len(rows), 300)
+
+
+class RollingSpilloverTests(SimpleTestCase):
+    """Windows are cached one by one, so a longer or shifted range only fetches the new windows."""
+
+    def test_only_new_windows_are_fetched(self):
+        fetched = []
+
+        def fetch(rows, size, horizon):
+            fetched.append(rows[0]['date'])
+            self.assertEqual((len(rows), horizon), (size, 4))
+            return {'total': float(np.mean([row['A'] for row in rows])), 'net': {'A': 1.0, 'B': -1.0}}
+
+        rng = np.random.default_rng(11)
+        timestamps = [str(day) for day in pd.bdate_range('2021-03-01', periods=200).date]
+        returns = {'timestamps': timestamps, 'symbol_data': {s: rng.standard_normal(200).tolist() for s in 'AB'}}
+        first = rolling_spillover.compute(returns, ['A', 'B'], 40, 5, 4, end=timestamps[119], fetch=fetch)
+        self.assertEqual((first['computed'], first['cached']), (len(fetched), 0))
+        self.assertEqual(first['x'][0], timestamps[rolling_spillover.window_starts(timestamps, 40, 5)[0] + 39])
+
+        fetched.clear()
+        extended = rolling_spillover.compute(returns, ['A', 'B'], 40, 5, 4, fetch=fetch)
+        self.assertEqual(extended['cached'], first['windows'])
+        self.assertEqual(extended['computed'], len(fetched))
+        self.assertEqual(extended['total'][:first['windows']], first['total'])
+
+        fetched.clear()
+        shifted = rolling_spillover.compute(returns, ['A', 'B'], 40, 5, 4, start=timestamps[23], fetch=fetch)
+        self.assertEqual((shifted['computed'], fetched), (0, []))
+        self.assertEqual(shifted['total'], extended['total'][-shifted['windows']:])
+        with self.assertRaises(ValueError):
+            rolling_spillover.compute(returns, ['A', 'B'], 40, 1, 4, max_windows=10, fetch=fetch)
+
+        # Windows are cached as they return: a request that fails part way keeps what it fetched,
+        # and windows not started within the time budget are left for the next request
+        def failing(rows, size, horizon):
+            if rows[0]['date'] >= timestamps[100]:
+                raise ValueError("backend timed out")
+            return fetch(rows, size, horizon)
+
+        partial = rolling_spillover.compute(returns, ['A', 'B'], 30, 5, 4, fetch=failing, workers=1)
+        self.assertGreater(partial['failed'], 0)
+        skipped = rolling_spillover.compute(returns, ['A', 'B'], 30, 5, 4, budget=0, fetch=fetch)
+        self.assertEqual(skipped['cached'], partial['computed'])
+        self.assertEqual(skipped['pending'], partial['failed'])
+
+    @override_settings(TIMESERIES_API_URL='http://backend', ROLLING_SPILLOVER_WINDOW_TIMEOUT=7)
+    def test_backend_request_and_response(self):
+        response = mock.Mock()
+        response.json.return_value = {'total_spillover_index': '41.5', 'net_spillover': {'A': 2, 'B': -2},
+                                      'directional_spillover': {}, 'pairwise_spillover': {}}
+        data = {'timestamps': ['2021-03-01', '2021-03-02', '2021-03-03'],
+                'symbol_data': {'A': [0.1, 0.2, 0.3], 'B': [-0.1, None, 0.4]}}
+        rows = rolling_spillover.window_rows(data, ['A', 'B'], 1, 2)
+        with mock.patch('timeseries.rolling_spillover.requests.post', return_value=response) as post:
+            result = rolling_spillover.fetch_window(rows, 2, 10)
+        post.assert_called_once_with('http://backend/api/v1/rolling_spillover', json={
+            'data': [{'date': '2021-03-02', 'A': 0.2, 'B': None}, {'date': '2021-03-03', 'A': 0.3, 'B': 0.4}],
+            'method': 'diebold_yilmaz', 'forecast_horizon': 10, 'window_size': 2,
+        }, timeout=7)
+        response.raise_for_status.assert_called_once()
+        self.assertEqual(result, {'total': 41.5, 'net': {'A': 2.0, 'B': -2.0}})
+
+        response.json.return_value = {'detail': 'window too short'}
+        with mock.patch('timeseries.rolling_spillover.requests.post', return_value=response):
+            with self.assertRaises(ValueError):
+                rolling_spillover.fetch_window(rows, 2, 10)
+
+
+class ResidualDiagnosticsTests(SimpleTestCase):
+    """The batched FFT ACF and Durbin-Levinson PACF must match the direct definitions."""
+
+    def test_matches_direct_computation(self):
+        for x, df, expected in ((3.841459, 1, 0.05), (5.991465, 2, 0.05), (18.307038, 10, 0.05), (0.0, 3, 1.0)):
+            self.assertAlmostEqual(float(diagnostics.chi2_sf(x, df)), expected, places=6)
+
+        rng = np.random.default_rng(0)
+        noise = rng.standard_normal(300)
+        series = {'ar': np.zeros(300), 'short': noise[:41]}
+        for t in range(1, 300):
+            series['ar'][t] = 0.6 * series['ar'][t - 1] + noise[t]
+        result = diagnostics.compute({'group': {k: [*v, None] for k, v in series.items()}}, max_lags=10)['group']
+        self.assertEqual(result['short']['lags'], list(range(1, 11)))
+        for name, values in series.items():
+            centered = values - values.mean()
+            n = len(centered)
+            autocov = np.array([centered[:n - k] @ centered[k:] / n for k in range(11)])
+            acf = autocov / autocov[0]
+            np.testing.assert_allclose(result[name]['acf'], acf[1:], atol=1e-12)
+            # Yule-Walker: the PACF at lag k is the last coefficient of the order-k fit
+            pacf = [np.linalg.solve(np.array([[acf[abs(i - j)] for j in range(k)] for i in range(k)]), acf[1:k + 1])[-1]
+                    for k in range(1, 11)]
+            np.testing.assert_allclose(result[name]['pacf'], pacf, atol=1e-10)
+            q = n * (n + 2) * np.cumsum(acf[1:] ** 2 / (n - np.arange(1, 11)))
+            np.testing.assert_allclose(result[name]['ljung_box_q'], q)
+        self.assertLess(result['ar']['ljung_box_p'][0], 1e-6)
+
+
+class PairTablesTests(SimpleTestCase):
+    """Keyset pages walked in either direction must match a full sort of the filtered rows."""
+
+    def test_pages_match_full_sort(self):
+        rng = np.random.default_rng(5)
+        symbols = [f'S{i:02d}' for i in range(12)]
+        tests = {}
+        for cause in symbols:
+            for effect in symbols:
+                if cause != effect:
+                    # Rounded p-values give ties, which the row order breaks
+                    p = None if rng.random() < 0.1 else round(float(rng.random() ** 3), 2)
+                    tests[f'{cause}->{effect}'] = {
+                        'significance_summary': {'min_p_value': p, 'significant_at_5pct': p is not None and p < 0.05},
+                        'optimal_lag_5pct': int(rng.integers(1, 4)),
+                    }
+        table = pair_tables.cached('granger', {'causality_results': tests}, symbols)
+        keep = table.mask(symbol='S03', significance='5pct')
+        kept = [(key, test) for key, test in tests.items()
+                if 'S03' in key.split('->') and test['significance_summary']['significant_at_5pct']]
+        for direction in pair_tables.DIRECTIONS:
+            p_values = [test['significance_summary']['min_p_value'] for _, test in kept]
+            ids = [list(tests).index(key) for key, _ in kept]
+            expected = [key for _, _, key in sorted(zip(p_values, ids, (key for key, _ in kept)),
+                                                     key=lambda row: (row[0] if direction == 'asc' else -row[0], row[1]))]
+            pages, page = [], table.page('min_p_value', direction, keep, size=2)
+            while True:
+                pages.append(page)
+                if page['next'] is None:
+                    break
+                page = table.page('min_p_value', direction, keep, size=2, after=page['next'])
+            self.assertEqual([row['relationship'] for page in pages for row in page['rows']], expected)
+            self.assertEqual([page['first'] for page in pages], list(range(1, len(expected) + 1, 2)))
+            back = table.page('min_p_value', direction, keep, size=2, before=pages[-1]['previous'])
+            self.assertEqual(back['rows'], pages[-2]['rows'])
+
+        # Missing p-values come last in both directions
+        for direction in pair_tables.DIRECTIONS:
+            page = table.page('min_p_value', direction, table.mask(), size=len(tests))
+            p_values = [row['min_p_value'] for row in page['rows']]
+            missing = p_values.index(None)
+            self.assertEqual(p_values[missing:], [None] * (len(p_values) - missing))
+            self.assertEqual(p_values[:missing], sorted(p_values[:missing], reverse=direction == 'desc'))
+        with self.assertRaises(ValueError):
+            pair_tables.page_context('granger', table, {'sort': 'interpretation'})
+
+
+class SparklineTests(SimpleTestCase):
+    """Sparklines keep at most one point per pixel inside the box and skip missing values."""
+
+    def test_points_fit_the_box(self):
+        values = np.sin(np.linspace(0, 20, 5000)).tolist()
+        values[100:200] = [None] * 100
+        markup = sparklines.svg(values, 'A <returns>', '#000', zero_line=True, width=80, height=20)
+        self.assertIn('aria-label="A &lt;returns&gt;"', markup)
+        self.assertIn('<line', markup)
+        points = markup.split('points="')[1].split('"')[0].split()
+        xy = np.array([point.split(',') for point in points], dtype=float)
+        self.assertEqual(len(xy), 80)
+        self.assertTrue((np.diff(xy[:, 0]) > 0).all())
+        self.assertEqual((xy.min(), xy.max()), (2.0, 78.0))
+        self.assertEqual((xy[:, 1].min(), xy[:, 1].max()), (2.0, 18.0))
+        self.assertEqual(sparklines.svg([1.0, None], 'flat', '#000'), '')
+        lines = sparklines.render({'A': {'price': [1.0, 2.0, None], 'volatility': []}})['A']
+        self.assertEqual((lines['price']['last'], lines['volatility']), (2.0, {'svg': '', 'last': None}))
+
+
+class SpilloverEngineTests(SimpleTestCase):
+    """The local Diebold-Yilmaz tables must reproduce the backend's from the same FEVD matrix."""
+
+    def test_matches_backend_and_what_if_is_consistent(self):
+        model = result_model.decode(load_sample_results())
+        symbols = list(model.spillover.net_spillover)
+        fevd = np.array(model.var.fevd_matrix)
+        check = spillover_engine.cross_check(spillover_engine.compute(fevd, symbols), model.spillover)
+        self.assertTrue(check['matches'], check)
+
+        groups = spillover_engine.parse_groups('Tech: MSFT, AAPL', symbols)
+        for kwargs in ({'exclude': ['MSFT']}, {'groups': groups}, {'normalization': 'none', 'exclude': ['AAPL']}):
+            with self.subTest(**kwargs):
+                tables = spillover_engine.compute(fevd, symbols, **kwargs)
+                self.assertEqual(len(tables['labels']), 2)
+                self.assertAlmostEqual(tables['to'].sum(), tables['total'])
+                self.assertAlmostEqual(tables['from'].sum(), tables['total'])
+                self.assertAlmostEqual(tables['net'].sum(), 0)
+        self.assertEqual(spillover_engine.compute(fevd, symbols, groups=groups)['labels'], ['Tech', 'NEM.US'])
+        with self.assertRaises(ValueError):
+            spillover_engine.parse_groups('Tech: MSFT; Other: MSFT', symbols)
+
+
+class PrecisionTests(SimpleTestCase):
+    """float32 storage stays within the documented error bound and shortens the stored JSON."""
+
+    def test_float32_storage_within_bound(self):
+        raw = load_sample_results()
+        with override_settings(RESULT_FLOAT_PRECISION='float64'):
+            self.assertIs(precision.for_storage(raw), raw)
+        with override_settings(RESULT_FLOAT_PRECISION='float32'):
+            stored = precision.for_storage(raw)
+        self.assertLess(len(json.dumps(stored)), len(json.dumps(raw)))
+
+        original = np.array([row['MSFT'] for row in raw['original_data']])
+        kept = np.array([row['MSFT'] for row in stored['original_data']])
+        self.assertTrue(np.all(np.abs(kept - original) <= precision.FLOAT32_MAX_RELATIVE_ERROR * np.abs(original)))
+
+        values = np.array([0.1, 1 / 3, -2.5e-7, 123456.789, 0.0, 3e39])
+        rounded = precision.round_float32(values)
+        np.testing.assert_array_equal(rounded[:5].astype(np.float32), values[:5].astype(np.float32))
+        self.assertEqual([repr(v) for v in rounded.tolist()],
+                         ['0.1', '0.33333334', '-2.5e-07', '123456.79', '0.0', '3e+39'])
+
+
+class ResultModelTests(SimpleTestCase):
+    """The typed model must hold every value of the sample response's analysis sections."""
+
+    def assert_same(self, raw, node, path):
+        if isinstance(raw, dict):
+            for key, value in raw.items():
+                child = node[key] if isinstance(node, dict) else getattr(node, key, None)
+                if isinstance(node, result_model.SeriesMap):
+                    child = node.get(key)
+                self.assert_same(value, child, f'{path}.{key}')
+        else:
+            self.assertEqual(node, raw, path)
+
+    def test_series_map_lookup(self):
+        series = result_model.SeriesMap(('2024-01-01', '2024-01-02'), (1.5, None))
+        self.assertEqual((series.get('2024-01-01'), series.get('2024-01-02', 0), series.get('missing', 0)),
+                         (1.5, None, 0))
+        self.assertEqual(series, result_model.SeriesMap(('2024-01-01', '2024-01-02'), (1.5, None)))
+
+    def test_decode_keeps_sample_values(self):
+        raw = load_sample_results()
+        model = result_model.decode(raw)
+        stationarity = raw['stationarity_results']
+        tests = stationarity['all_symbols_stationarity']['all_symbols_stationarity']
+        self.assert_same(tests, model.stationarity.all_symbols_stationarity, 'stationarity')
+        self.assert_same(stationarity['series_stats'], model.stationarity.series_stats, 'series_stats')
+        self.assert_same(raw['arima_results']['all_symbols_arima'], model.arima, 'arima')
+        self.assert_same(raw['garch_results']['all_symbols_garch'], model.garch, 'garch')
+        self.assert_same(raw['var_results'], model.var, 'var')
+        self.assert_same(raw['granger_causality_results'], model.granger, 'granger')
+        self.assert_same(raw['spillover_results'], model.spillover, 'spillover')
+        self.assertEqual([row.symbol for row in model.spillover.spillover_table_data],
+                         list(raw['spillover_results']['net_spillover']))
+
+
+class TradingCalendarTests(SimpleTestCase):
+
+    @override_settings(TRADING_CALENDAR_WEEKMASK='1111100', TRADING_CALENDAR_HOLIDAYS=['2023-02-20'])
+    def test_forecast_axis_skips_weekends_and_holidays(self):
+        self.assertEqual(trading_calendar.forecast_axis('2023-02-16', 3), ['2023-02-17', '2023-02-21', '2023-02-22'])
+        # A weekend close continues from the following Monday; the input format is kept
+        self.assertEqual(trading_calendar.forecast_axis('2023-02-11T00:00:00', 1), ['2023-02-13T00:00:00'])
+        with self.assertRaises(ValueError):
+            trading_calendar.forecast_axis('Forecast_1', 1)
+
+
+class LoggingTests(SimpleTestCase):
+    """Queued records keep their message and emit the traceback in the 'exception' field."""
+
+    def test_exception_survives_the_queue(self):
+        target = logging.handlers.BufferingHandler(10)
+        target.setFormatter(logging_utils.JsonFormatter())
+        handler = logging_utils.QueueListenerHandler([target])
+        logger = logging.Logger('timeseries.tests.logging')
+        logger.addHandler(handler)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception("Failed for %s", 'AAPL')
+        handler._stop()
+        entry = json.loads(target.format(target.buffer[0]))
+        self.assertEqual(entry['message'], "Failed for AAPL")
+        self.assertIn('ValueError: boom', entry['exception'])
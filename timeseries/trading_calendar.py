@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# timeseries-frontend/timeseries/trading_calendar.py
+
+"""
+Vectorized date handling for plot axes.
+Timestamp columns are parsed once into datetime64 arrays, and forecast
+horizons are laid out on a business-day calendar (weekmask plus optional
+holidays from settings) with a single numpy.busday_offset call. Calendars
+are built once per configuration and reused.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+DEFAULT_WEEKMASK = '1111100'  # Monday to Friday
+
+
+@lru_cache(maxsize=16)
+def _calendar(weekmask: str, holidays: Tuple[str, ...]) -> np.busdaycalendar:
+    return np.busdaycalendar(weekmask=weekmask, holidays=list(holidays))
+
+
+def calendar_options() -> Tuple[str, Tuple[str, ...]]:
+    """The configured (weekmask, holidays), normalized so equal settings share a calendar."""
+    weekmask = getattr(settings, 'TRADING_CALENDAR_WEEKMASK', DEFAULT_WEEKMASK) or DEFAULT_WEEKMASK
+    holidays = getattr(settings, 'TRADING_CALENDAR_HOLIDAYS', ()) or ()
+    return weekmask, tuple(sorted(str(day) for day in holidays))
+
+
+def trading_calendar(weekmask: Optional[str] = None,
+                     holidays: Optional[Iterable[str]] = None) -> np.busdaycalendar:
+    """
+    Return a cached business-day calendar.
+
+    Args:
+        weekmask: numpy weekmask ('1111100' or 'Mon Tue Wed Thu Fri');
+            defaults to settings.TRADING_CALENDAR_WEEKMASK
+        holidays: ISO dates that are not trading days; defaults to
+            settings.TRADING_CALENDAR_HOLIDAYS
+    """
+    default_weekmask, default_holidays = calendar_options()
+    holidays = default_holidays if holidays is None else tuple(sorted(str(day) for day in holidays))
+    return _calendar(weekmask or default_weekmask, holidays)
+
+
+def to_datetime64(timestamps: Sequence[Any]) -> np.ndarray:
+    """Parse a timestamp column into a datetime64[ns] array in one call."""
+    return pd.to_datetime(pd.Index(timestamps)).values.astype('datetime64[ns]')
+
+
+def next_trading_days(last: Any, periods: int,
+                      calendar: Optional[np.busdaycalendar] = None) -> np.ndarray:
+    """
+    The periods trading days after last, as datetime64[D].
+
+    A last date that is not itself a trading day counts from the trading day
+    before it, so a Saturday close is followed by Monday.
+    """
+    day = np.datetime64(pd.Timestamp(last).date(), 'D')
+    return np.busday_offset(day, np.arange(1, periods + 1), roll='backward',
+                            busdaycal=calendar or trading_calendar())
+
+
+def trading_days(start: Any, periods: int, calendar: Optional[np.busdaycalendar] = None) -> np.ndarray:
+    """periods trading days starting at start (or the next trading day), as datetime64[D]."""
+    day = np.datetime64(pd.Timestamp(start).date(), 'D')
+    return np.busday_offset(day, np.arange(periods), roll='forward',
+                            busdaycal=calendar or trading_calendar())
+
+
+def format_dates(dates: np.ndarray, like: Optional[str] = None) -> List[str]:
+    """
+    Format datetime64 values as strings in the style of an existing timestamp.
+
+    'YYYY-MM-DD' by default; 'YYYY-MM-DDTHH:MM:SS' when like carries a time.
+    """
+    unit = 's' if like and 'T' in like else 'D'
+    return np.datetime_as_string(dates.astype(f'datetime64[{unit}]'), unit=unit).tolist()
+
+
+def forecast_axis(last_timestamp: Any, periods: int,
+                  calendar: Optional[np.busdaycalendar] = None) -> List[str]:
+    """
+    x values for a forecast that continues a series ending at last_timestamp.
+
+    Raises:
+        ValueError: last_timestamp is not a date
+    """
+    try:
+        dates = next_trading_days(last_timestamp, periods, calendar)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f"Cannot extend non-date axis value {last_timestamp!r}") from e
+    return format_dates(dates, last_timestamp if isinstance(last_timestamp, str) else None)
@@ -21,10 +21,28 @@ urlpatterns = [
     path('view-api-response/', views.view_api_response_popup, name='view_api_response_popup'),
     # CSV export functionality
     path('export-csv/<str:data_type>/', views.export_csv, name='export_csv'),
+    # Full-resolution points for the visible range of a downsampled plot
+    path('plots/range/<str:plot_key>/', views.plot_range, name='plot_range'),
+    # Return correlation matrix of any date window, from the prefix-sum index
+    path('correlation/window/', views.correlation_window, name='correlation_window'),
+    # ARIMA forecasts extended to any horizon from the fitted parameters
+    path('arima/forecast/', views.arima_forecast_horizon, name='arima_forecast_horizon'),
+    # Monte Carlo forecast fan charts from the fitted ARIMA-GARCH parameters (HTMX partial)
+    path('forecast/fan/', views.forecast_fan, name='forecast_fan'),
+    # GARCH volatility forecasts extended to any horizon in closed form
+    path('garch/forecast/', views.garch_forecast_horizon, name='garch_forecast_horizon'),
+    # What-if spillover tables recomputed locally from the FEVD matrix (HTMX partial)
+    path('spillover/what-if/', views.spillover_what_if, name='spillover_what_if'),
+    # Rolling spillover from the backend, cached per window (HTMX partial)
+    path('spillover/rolling/', views.spillover_rolling, name='spillover_rolling'),
+    # Pairwise spillover and Granger tables, sorted, filtered and paged on the server (HTMX partial)
+    path('tables/<str:table>/', views.pair_table, name='pair_table'),
     # Generic API proxy - captures the rest of the path and passes it to the view
     path('api_proxy/<path:api_path>', views.api_proxy, name='api_proxy'),
     # HTMX analysis endpoint
     path('api/run_pipeline_htmx', views.run_pipeline_htmx, name='run_pipeline_htmx'),
     # Debug endpoints
     path('debug/api-data', views.debug_data, name='debug_data'),
+    path('debug/plot-benchmark', views.plot_benchmark, name='plot_benchmark'),
+    path('debug/plot-cache', views.plot_cache_status, name='plot_cache_status'),
 ]
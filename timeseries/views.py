@@ -1,5 +1,5 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, QueryDict
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
@@ -13,8 +13,19 @@ import logging
 import hashlib
 import os
 
+from . import (arima_forecast, correlation_index, descriptive_stats, figure_builder, garch_forecast, monte_carlo,
+               pair_tables, pipeline_stages, plot_cache, precision, price_analytics, resampling, result_model,
+               rolling_spillover, spillover_engine)
+from .streaming import restore_rows
+
 logger = logging.getLogger(__name__)
 
+# Bump when the model-derived results page context changes so contexts cached by older code are not reused
+RESULTS_CONTEXT_CACHE_VERSION = 1
+
+# Query params of the what-if spillover tables
+WHAT_IF_PARAMS = ('normalization', 'exclude', 'groups')
+
 def index(request):
     """
     Home page.
@@ -31,24 +42,367 @@ def results(request):
     """
     Results page.
     """
-    # Debug: Check what's in the session
-    print("DEBUG: Session keys:", list(request.session.keys()))
-    print("DEBUG: Session analysis_results exists:", 'analysis_results' in request.session)
-    print("DEBUG: Session raw results exist:", 'analysis_raw_results' in request.session)
-    
     # Retrieve processed results from session if available
     processed_results = request.session.get('analysis_results', {})
-    print("DEBUG: Processed results keys:", list(processed_results.keys()) if processed_results else "None")
+    logger.debug("Results page session state", extra={
+        'session_keys': list(request.session.keys()),
+        'processed_keys': list(processed_results.keys()),
+    })
+    try:
+        frequency = resampling.parse_frequency(request.GET.get('freq'))
+    except ValueError as e:
+        return HttpResponse(str(e), status=400, content_type='text/plain')
+    
+    # Analysis sections are decoded from the raw response into the typed model (cached per result)
+    raw_results = request.session.get('analysis_raw_results')
+    result_hash = request.session.get('analysis_result_hash')
+    model_context = _model_context(processed_results, raw_results, result_hash, request.GET) if raw_results else {}
+
+    if frequency and raw_results and processed_results.get('data_arrays'):
+        # Series plots and lineage tables at the selected calendar frequency
+        from .results_processor import ResultsProcessor
+        processor = ResultsProcessor(raw_results, data_arrays=processed_results['data_arrays'],
+                                     frequency=frequency, content_hash=result_hash)
+        processed_results = {
+            **processed_results,
+            'plots': processor.create_plots(),
+            'plot_dataset': processor.plot_dataset.to_json(),
+            'data_arrays': processor.display_arrays,
+        }
     
     param_list = ['ar.L1', 'ar.L2', 'ma.L1', 'ma.L2', 'sigma2']
-    # Always set active_tab to 'overview' for best practice
+    # Open on the overview, or on the series plots after picking a frequency
     context = {
-        'active_tab': 'overview',
+        'active_tab': 'time-series' if 'freq' in request.GET else 'overview',
+        'frequency': frequency,
+        'frequency_choices': [(resampling.NATIVE_FREQUENCY, 'Daily'), *resampling.FREQUENCIES.items()],
         'param_list': param_list,
-        **processed_results
+        'pipeline_stages': request.session.get('pipeline_stages', []),
+        'descriptive_stats_rows': descriptive_stats.table_rows(processed_results.get('descriptive_stats', {})),
+        **processed_results,
+        **model_context,
     }
+    if model_context:
+        if 'fan_form' in context:
+            context['fan_max_paths'] = _fan_max_paths(request)
+        if context['spillover_enabled']:
+            context.update(_rolling_spillover_context(processed_results, {}))
+        symbols = processed_results.get('symbols', [])
+        context['pairwise_matrix_enabled'] = len(symbols) <= getattr(settings, 'PAIRWISE_MATRIX_MAX_SYMBOLS', 12)
     return render(request, 'timeseries/results.html', context)
 
+def _model_context(processed_results, raw_results, result_hash, params):
+    """
+    The results page context derived from the analysis model, cached per result.
+
+    The decoded sections, the ARIMA and GARCH cross-checks, the default
+    what-if tables and the first page of each pair table are built on the
+    first load of a result only, so later page loads fit no models. The
+    cache is keyed on the result hash stored with the session's results
+    (sessions without one are built uncached). What-if params in the query
+    recompute just the what-if tables.
+    """
+    symbols = processed_results.get('symbols', [])
+    key = f'results_context:v{RESULTS_CONTEXT_CACHE_VERSION}:{result_hash}' if result_hash else None
+    context = cache.get(key) if key else None
+    if context is None:
+        model = result_model.decode(raw_results, symbols)
+        context = {
+            **model.template_context(),
+            # The Spillover tab (with the what-if tables) is shown whenever the run produced spillovers
+            'spillover_enabled': model.spillover is not None,
+            **_what_if_context(model, symbols, QueryDict()),
+            **_forecast_horizon_context(model),
+        }
+        # First page of each pair table; further pages come from the pair_table partial
+        for name in pair_tables.TABLES:
+            context[f'{name}_pair_table'] = _pair_table_context(raw_results, symbols, name, {})
+        if key:
+            cache.set(key, context)
+    if any(param in params for param in WHAT_IF_PARAMS):
+        model = result_model.decode(raw_results, symbols)
+        context = {**context, **_what_if_context(model, symbols, params)}
+    return context
+
+def _what_if_context(model, symbols, params):
+    """Context of the what-if spillover partial for the requested normalization, exclusions and groups."""
+    form = {
+        'normalization': params.get('normalization') or spillover_engine.DEFAULT_NORMALIZATION,
+        'exclude': params.getlist('exclude'),
+        'groups': (params.get('groups') or '').strip(),
+    }
+    context = {
+        'symbols': symbols,
+        'what_if_form': form,
+        'what_if_normalizations': list(spillover_engine.NORMALIZATIONS.items()),
+    }
+    if not model.var:
+        return context
+    try:
+        context['what_if'] = spillover_engine.scenario(
+            model.var.fevd_matrix, symbols, model.spillover,
+            form['normalization'], form['exclude'], form['groups'])
+    except ValueError as e:
+        context['what_if'] = {}
+        context['what_if_error'] = str(e)
+    return context
+
+def _staff_or_debug(request):
+    """Whether the request may use the heavier tools: staff users, or any user in DEBUG."""
+    return settings.DEBUG or request.user.is_staff
+
+def _fan_max_paths(request):
+    """Most fan chart paths per request; staff users (and DEBUG) get the higher limit."""
+    if _staff_or_debug(request):
+        return getattr(settings, 'MONTE_CARLO_STAFF_MAX_PATHS', monte_carlo.DEFAULT_STAFF_MAX_PATHS)
+    return getattr(settings, 'MONTE_CARLO_MAX_PATHS', monte_carlo.DEFAULT_MAX_PATHS)
+
+def _forecast_horizon_context(model):
+    """
+    Bounds of the forecast sliders and fan chart form, and the cross-checks of the local forecasters.
+
+    The fan chart path limit depends on the user, so results() adds fan_max_paths.
+    """
+    context = {}
+    arima_models = [m for m in (arima_forecast.model_from(symbol, result) for symbol, result in model.arima.items())
+                    if m]
+    if arima_models:
+        context['forecast_horizon'] = {
+            'steps': max(len(result.forecast.point_forecasts or []) for result in model.arima.values()) or 1,
+            'max_steps': getattr(settings, 'ARIMA_FORECAST_MAX_STEPS', arima_forecast.DEFAULT_MAX_STEPS),
+            'cross_check': arima_forecast.cross_check(arima_models, model.arima),
+        }
+        # The fan chart is simulated on request; the page only shows its form
+        context.update({
+            'fan_form': {'paths': monte_carlo.DEFAULT_PATHS, 'steps': monte_carlo.DEFAULT_STEPS,
+                         'seed': monte_carlo.DEFAULT_SEED},
+            'fan_max_steps': context['forecast_horizon']['max_steps'],
+        })
+    garch_models = garch_forecast.models_from(model.garch)
+    if garch_models:
+        context['volatility_horizon'] = {
+            'steps': garch_forecast.DEFAULT_STEPS,
+            'max_steps': getattr(settings, 'GARCH_FORECAST_MAX_STEPS', garch_forecast.DEFAULT_MAX_STEPS),
+            'cross_check': garch_forecast.cross_check(garch_models, model.garch),
+        }
+    return context
+
+def arima_forecast_horizon(request):
+    """
+    Extend the ARIMA forecasts and confidence intervals to any horizon.
+
+    Computed locally from the fitted parameters, so moving the horizon
+    slider does not rerun the pipeline. Query param: steps (1 to
+    settings.ARIMA_FORECAST_MAX_STEPS). Returns the forecast and 95%
+    confidence band traces of each ARIMA plot.
+    """
+    processed_results = request.session.get('analysis_results', {})
+    raw_results = request.session.get('analysis_raw_results')
+    if not processed_results or not raw_results:
+        return JsonResponse({"detail": "No analysis results found in session."}, status=404)
+
+    max_steps = getattr(settings, 'ARIMA_FORECAST_MAX_STEPS', arima_forecast.DEFAULT_MAX_STEPS)
+    try:
+        steps = int(request.GET.get('steps', ''))
+    except ValueError:
+        return JsonResponse({"detail": "steps must be an integer."}, status=400)
+    if not 1 <= steps <= max_steps:
+        return JsonResponse({"detail": f"steps must be between 1 and {max_steps}."}, status=400)
+
+    model = result_model.decode(raw_results, processed_results.get('symbols'))
+    plots = {}
+    for symbol, forecast in arima_forecast.extend(model.arima, steps).items():
+        # Trace names match those of the ARIMA plots so the client can swap the data in place;
+        # the band is added to plots drawn without one
+        plots[f'arima-plot-{symbol.lower()}'] = [
+            {"name": f"{symbol} Forecast", "x": forecast['x'], "y": forecast['point']},
+            figure_builder.band_trace(forecast['x'], forecast['upper'], forecast['lower'], f"{symbol} 95% CI",
+                                      fillcolor=figure_builder.CONFIDENCE_BAND_FILL, hoverinfo='skip',
+                                      showlegend=True),
+        ]
+    return JsonResponse({"steps": steps, "plots": plots})
+
+def garch_forecast_horizon(request):
+    """
+    Extend the GARCH volatility forecasts of every symbol to any horizon.
+
+    Closed-form multi-step variance forecasts from each symbol's fitted
+    parameters, without a backend call. Query param: steps (1 to
+    settings.GARCH_FORECAST_MAX_STEPS). Returns the traces of the volatility
+    forecast plot.
+    """
+    processed_results = request.session.get('analysis_results', {})
+    raw_results = request.session.get('analysis_raw_results')
+    if not processed_results or not raw_results:
+        return JsonResponse({"detail": "No analysis results found in session."}, status=404)
+
+    max_steps = getattr(settings, 'GARCH_FORECAST_MAX_STEPS', garch_forecast.DEFAULT_MAX_STEPS)
+    try:
+        steps = int(request.GET.get('steps', ''))
+    except ValueError:
+        return JsonResponse({"detail": "steps must be an integer."}, status=400)
+    if not 1 <= steps <= max_steps:
+        return JsonResponse({"detail": f"steps must be between 1 and {max_steps}."}, status=400)
+
+    model = result_model.decode(raw_results, processed_results.get('symbols'))
+    timestamps = processed_results.get('data_arrays', {}).get('returns_data', {}).get('timestamps') or [None]
+    extended = garch_forecast.extend(model.garch, steps, timestamps[-1])
+    traces = [{"name": symbol, "x": extended['x'], "y": volatility}
+              for symbol, volatility in extended['volatility'].items()]
+    return JsonResponse({"steps": steps, "plots": {"garch-forecast-plot": traces}})
+
+def forecast_fan(request):
+    """
+    Simulate forecast fan charts from the fitted ARIMA-GARCH parameters (HTMX partial).
+
+    Query params: paths (up to settings.MONTE_CARLO_MAX_PATHS, or
+    MONTE_CARLO_STAFF_MAX_PATHS for staff users and in DEBUG), steps (up to
+    settings.ARIMA_FORECAST_MAX_STEPS), seed. Results are cached per dataset
+    and parameters; the partial reports the simulation throughput.
+    """
+    processed_results = request.session.get('analysis_results', {})
+    raw_results = request.session.get('analysis_raw_results')
+    if not processed_results or not raw_results:
+        return HttpResponse(
+            '<div class="alert alert-danger">No analysis results found in session. Please run an analysis first.</div>',
+            content_type='text/html'
+        )
+
+    max_paths = _fan_max_paths(request)
+    max_steps = getattr(settings, 'ARIMA_FORECAST_MAX_STEPS', arima_forecast.DEFAULT_MAX_STEPS)
+    form = {
+        'paths': request.GET.get('paths') or monte_carlo.DEFAULT_PATHS,
+        'steps': request.GET.get('steps') or monte_carlo.DEFAULT_STEPS,
+        'seed': request.GET.get('seed') or monte_carlo.DEFAULT_SEED,
+    }
+    context = {'fan_form': form, 'fan_max_paths': max_paths, 'fan_max_steps': max_steps}
+    try:
+        paths, steps, seed = int(form['paths']), int(form['steps']), int(form['seed'])
+        if not 1 <= paths <= max_paths or not 1 <= steps <= max_steps or seed < 0:
+            raise ValueError
+    except ValueError:
+        context['fan_error'] = (f"Paths must be between 1 and {max_paths}, steps between 1 and {max_steps} "
+                                f"and the seed a non-negative integer.")
+        return render(request, 'timeseries/forecast_fan.html', context)
+
+    model = result_model.decode(raw_results, processed_results.get('symbols'))
+    garch_dist = (processed_results.get('execution_configuration', {}).get('model_configurations', {})
+                  .get('garch_params', {}).get('dist'))
+    # The paths depend only on the model sections, so they key the cache
+    models_hash = plot_cache.content_hash([raw_results.get('arima_results'), raw_results.get('garch_results'),
+                                           garch_dist])
+    chart = monte_carlo.fan_chart(model, models_hash, paths, steps, seed, garch_dist)
+    context.update({
+        'fan_figures': monte_carlo.fan_figures(chart),
+        'fan_throughput': chart['throughput'],
+        'fan_cached': chart['cached'],
+    })
+    return render(request, 'timeseries/forecast_fan.html', context)
+
+def _rolling_spillover_context(processed_results, params):
+    """Form of the rolling spillover partial, defaulting to the run's spillover window and horizon."""
+    spillover_config = processed_results.get('execution_configuration', {}).get('spillover_configuration', {})
+    form = {
+        'window': (params.get('window') or spillover_config.get('spillover_window_size')
+                   or rolling_spillover.DEFAULT_WINDOW),
+        'step': params.get('step') or rolling_spillover.DEFAULT_STEP,
+        'horizon': (params.get('horizon') or spillover_config.get('spillover_forecast_horizon')
+                    or rolling_spillover.DEFAULT_HORIZON),
+        'start': params.get('start') or '',
+        'end': params.get('end') or '',
+    }
+    return {'rolling_form': form, 'rolling_max_window': rolling_spillover.MAX_WINDOW}
+
+def spillover_rolling(request):
+    """
+    Rolling total and net spillover from the backend, one cached request per window (HTMX partial).
+
+    Query params: window (rows, up to rolling_spillover.MAX_WINDOW), step
+    (trading days between windows), horizon, start and end (dates). Only
+    the windows not cached yet are sent to the backend, each cached as it
+    returns; windows not started within the time budget are left pending.
+    """
+    processed_results = request.session.get('analysis_results', {})
+    returns = processed_results.get('data_arrays', {}).get('returns_data')
+    if not returns:
+        return HttpResponse(
+            '<div class="alert alert-danger">No analysis results found in session. Please run an analysis first.</div>',
+            content_type='text/html'
+        )
+    context = _rolling_spillover_context(processed_results, request.GET)
+    form = context['rolling_form']
+    try:
+        window, step, horizon = int(form['window']), int(form['step']), int(form['horizon'])
+        if not 2 <= window <= rolling_spillover.MAX_WINDOW or step < 1 or horizon < 1:
+            raise ValueError(f"The window must be between 2 and {rolling_spillover.MAX_WINDOW} rows, "
+                             f"the step and horizon positive integers.")
+        series = rolling_spillover.compute(
+            returns, processed_results.get('symbols', []), window, step, horizon,
+            start=form['start'] or None, end=form['end'] or None,
+            max_windows=getattr(settings, 'ROLLING_SPILLOVER_MAX_WINDOWS', rolling_spillover.DEFAULT_MAX_WINDOWS),
+            workers=getattr(settings, 'ROLLING_SPILLOVER_WORKERS', rolling_spillover.DEFAULT_WORKERS),
+            budget=getattr(settings, 'ROLLING_SPILLOVER_TIME_BUDGET', rolling_spillover.DEFAULT_TIME_BUDGET),
+        )
+    except ValueError as e:
+        context['rolling_error'] = str(e) if str(e).strip() else "Window, step and horizon must be integers."
+        return render(request, 'timeseries/rolling_spillover.html', context)
+
+    context['rolling'] = series
+    if series['failed'] + series['pending'] < series['windows']:
+        context['rolling_figure'] = rolling_spillover.figure(series, window)
+    return render(request, 'timeseries/rolling_spillover.html', context)
+
+def _pair_table_context(raw_results, symbols, name, params):
+    """Context of one pair table page, with the parameter error instead of the page if params are invalid."""
+    table = pair_tables.cached(name, raw_results.get(pair_tables.TABLES[name]['section']), symbols)
+    page_size = getattr(settings, 'PAIR_TABLE_PAGE_SIZE', pair_tables.DEFAULT_PAGE_SIZE)
+    try:
+        return pair_tables.page_context(name, table, params, page_size)
+    except ValueError as e:
+        context = pair_tables.page_context(name, None, {}, page_size)
+        context['error'] = str(e)
+        return context
+
+def pair_table(request, table):
+    """
+    One page of the pairwise spillover or Granger causality table (HTMX partial).
+
+    Query params: sort, dir (asc or desc), symbol (pairs involving it),
+    significance (granger: 5pct or 1pct), min_value (spillover, in %), size,
+    and after or before (keyset cursors of the neighbouring page). Rows are
+    sorted and filtered on the server, so the page holds one page of rows
+    however many symbol pairs the run has.
+    """
+    if table not in pair_tables.TABLES:
+        return HttpResponse(f"Unknown table: {table}", status=404, content_type='text/plain')
+    processed_results = request.session.get('analysis_results', {})
+    raw_results = request.session.get('analysis_raw_results')
+    if not processed_results or not raw_results:
+        return HttpResponse(
+            '<div class="alert alert-danger">No analysis results found in session. Please run an analysis first.</div>',
+            content_type='text/html'
+        )
+    context = _pair_table_context(raw_results, processed_results.get('symbols', []), table, request.GET)
+    return render(request, 'timeseries/pair_table.html', {'pair_table': context})
+
+def spillover_what_if(request):
+    """
+    Recompute the spillover tables locally from the FEVD matrix (HTMX partial).
+
+    Query params: normalization, exclude (repeatable), groups
+    ("Name: SYM1, SYM2; Name: SYM3").
+    """
+    processed_results = request.session.get('analysis_results', {})
+    raw_results = request.session.get('analysis_raw_results')
+    if not processed_results or not raw_results:
+        return HttpResponse(
+            '<div class="alert alert-danger">No analysis results found in session. Please run an analysis first.</div>',
+            content_type='text/html'
+        )
+    symbols = processed_results.get('symbols', [])
+    model = result_model.decode(raw_results, symbols)
+    return render(request, 'timeseries/spillover_what_if.html', _what_if_context(model, symbols, request.GET))
+
 def results_test(request):
     """
     Results test page.
@@ -71,18 +425,15 @@ def view_api_response_popup(request):
     """
     View API response in popup - FIXED to not delete session data.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    logger.info(f"Session keys available: {list(request.session.keys())}")
-    logger.info(f"Session has raw results: {'analysis_raw_results' in request.session}")
+    logger.debug("Session keys available: %s", list(request.session.keys()))
     
     # Use .get() to read without deleting session data
     raw_results = request.session.get('analysis_raw_results', None)
         
     if raw_results is not None:
-        logger.info(f"Raw results found, size: {len(str(raw_results))}")
+        raw_results = restore_rows(raw_results, request.session.get('analysis_results', {}).get('data_arrays', {}))
         raw_results_json = json.dumps(raw_results, indent=2)
+        logger.debug("Raw results found", extra={'json_chars': len(raw_results_json)})
     else:
         logger.warning("No raw results found in session")
         raw_results_json = 'No API response available.'
@@ -100,6 +451,8 @@ def download_api_response(request):
         import json
         from django.utils import timezone
         
+        raw_results = restore_rows(raw_results, request.session.get('analysis_results', {}).get('data_arrays', {}))
+        
         # Generate filename with timestamp (same format as CSV exports)
         current_time = timezone.now().strftime('%Y%m%d_%H%M%S')
         filename = f"api_response_{current_time}.json"
@@ -118,16 +471,14 @@ def export_csv(request, data_type):
     import io
     from django.utils import timezone
     
-    # Debug session state
-    print(f"DEBUG: export_csv called for {data_type}")
-    print(f"DEBUG: Session keys: {list(request.session.keys())}")
-    print(f"DEBUG: Has analysis_results: {'analysis_results' in request.session}")
+    logger.debug("export_csv called", extra={'data_type': data_type,
+                                             'session_keys': list(request.session.keys())})
     
     # Use .get() to read without deleting session data
     processed_results = request.session.get('analysis_results', {})
     
     if not processed_results:
-        print("DEBUG: No processed results found in session")
+        logger.debug("No processed results found in session")
         if request.headers.get('HX-Request'):
             return HttpResponse(
                 '<div class="alert alert-danger">No analysis results found in session. Please run an analysis first.</div>',
@@ -138,13 +489,40 @@ def export_csv(request, data_type):
     
     data_arrays = processed_results.get('data_arrays', {})
     symbols = processed_results.get('symbols', [])
+    try:
+        frequency = resampling.parse_frequency(request.GET.get('freq'))
+    except ValueError as e:
+        return HttpResponse(str(e), status=400, content_type='text/plain')
     
-    print(f"DEBUG: Data arrays available: {list(data_arrays.keys())}")
-    print(f"DEBUG: Symbols: {symbols}")
+    # Result tables (series statistics, spillover) come from the typed model,
+    # descriptive statistics from the processed results
+    result_table = None
+    if data_type == 'descriptive_stats':
+        result_table = descriptive_stats.table(processed_results.get('descriptive_stats', {}))
+    elif data_type in price_analytics.EXPORTS:
+        windows = getattr(settings, 'ROLLING_VOLATILITY_WINDOWS', price_analytics.DEFAULT_WINDOWS)
+        analytics = price_analytics.cached(_data_hash(processed_results),
+                                           _resampled_arrays(processed_results, frequency), symbols, frequency, windows)
+        result_table = price_analytics.table(analytics, data_type)
+    elif data_type in result_model.RESULT_TABLES:
+        model = result_model.decode(request.session.get('analysis_raw_results') or {}, symbols)
+        result_table = result_model.RESULT_TABLES[data_type](model)
+    if result_table is not None:
+        header, rows = result_table
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(header)
+        writer.writerows([['' if value is None else value for value in row] for row in rows])
+        current_time = timezone.now().strftime('%Y%m%d_%H%M%S')
+        response = HttpResponse(output.getvalue(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="timeseries_{data_type}_{current_time}.csv"'
+        return response
+    
+    logger.debug("Data arrays available: %s, symbols: %s", list(data_arrays.keys()), symbols)
     
     # Check if the requested data type exists
     if data_type not in data_arrays:
-        print(f"DEBUG: Requested data type '{data_type}' not found in data_arrays")
+        logger.debug("Requested data type %r not found in data_arrays", data_type)
         if request.headers.get('HX-Request'):
             return HttpResponse(
                 f'<div class="alert alert-danger">No {data_type.replace("_", " ")} data available for export.</div>',
@@ -153,15 +531,17 @@ def export_csv(request, data_type):
         else:
             return HttpResponse(f"No {data_type} data available for export.", content_type="text/plain")
     
-    data_info = data_arrays[data_type]
+    if frequency is None:
+        data_info = data_arrays[data_type]
+    elif data_type == 'original_data':
+        data_info = resampling.resample_ohlc(data_arrays[data_type], frequency)
+    else:
+        data_info = _resampled_arrays(processed_results, frequency)[data_type]
     timestamps = data_info.get('timestamps', [])
     symbol_data = data_info.get('symbol_data', {})
     
-    print(f"DEBUG: Timestamps count: {len(timestamps)}")
-    print(f"DEBUG: Symbol data keys: {list(symbol_data.keys())}")
-    
     if not timestamps or not symbol_data:
-        print(f"DEBUG: Missing data - timestamps: {len(timestamps)}, symbol_data: {len(symbol_data)}")
+        logger.debug("Missing data - timestamps: %d, symbol_data: %d", len(timestamps), len(symbol_data))
         if request.headers.get('HX-Request'):
             return HttpResponse(
                 f'<div class="alert alert-warning">No data rows available for {data_type.replace("_", " ")}.</div>',
@@ -174,15 +554,21 @@ def export_csv(request, data_type):
     output = io.StringIO()
     writer = csv.writer(output)
     
+    # Resampled prices are exported as open/high/low/close columns per symbol
+    if frequency and data_type == 'original_data':
+        columns = [(f'{symbol}_{field}', symbol_data.get(symbol, {}).get(field, []))
+                   for symbol in symbols for field in resampling.OHLC]
+    else:
+        columns = [(symbol, symbol_data.get(symbol, [])) for symbol in symbols]
+
     # Write header
-    header = ['Date'] + symbols
+    header = ['Date'] + [name for name, _ in columns]
     writer.writerow(header)
     
     # Write data rows
     for i, timestamp in enumerate(timestamps):
         row = [timestamp]
-        for symbol in symbols:
-            symbol_values = symbol_data.get(symbol, [])
+        for _, symbol_values in columns:
             if i < len(symbol_values) and symbol_values[i] is not None:
                 row.append(symbol_values[i])
             else:
@@ -195,15 +581,89 @@ def export_csv(request, data_type):
     
     # Generate filename with timestamp
     current_time = timezone.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"timeseries_{data_type}_{current_time}.csv"
+    suffix = f"_{frequency}" if frequency else ""
+    filename = f"timeseries_{data_type}{suffix}_{current_time}.csv"
     
-    print(f"DEBUG: Generated CSV with {len(csv_content)} characters")
+    logger.debug("Generated CSV", extra={'data_type': data_type, 'rows': len(timestamps),
+                                         'chars': len(csv_content)})
     
     # Return CSV file
     response = HttpResponse(csv_content, content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
+def _data_hash(processed_results):
+    """Hash of the session's data arrays, which keys the caches derived from them."""
+    return processed_results.get('data_hash') or plot_cache.content_hash(processed_results.get('data_arrays', {}))
+
+def _resampled_arrays(processed_results, frequency):
+    """The session's data arrays at a calendar frequency, cached per result and frequency."""
+    data_arrays = processed_results.get('data_arrays', {})
+    if not frequency:
+        return data_arrays
+    return resampling.cached(_data_hash(processed_results), data_arrays, frequency)
+
+def plot_range(request, plot_key):
+    """
+    Return the points of a series plot inside the visible x range.
+
+    Called from the browser on plotly_relayout so that zooming into a
+    downsampled plot shows the full-resolution data for that window.
+    Query params: start, end (x axis range; omit both to reset), freq
+    (W, M or Q for a resampled plot).
+    """
+    from .results_processor import ResultsProcessor
+
+    spec = ResultsProcessor.SERIES_PLOTS.get(plot_key)
+    if spec is None:
+        return JsonResponse({"detail": f"Unknown plot: {plot_key}"}, status=404)
+
+    processed_results = request.session.get('analysis_results', {})
+    if not processed_results:
+        return JsonResponse({"detail": "No analysis results found in session."}, status=404)
+
+    start = request.GET.get('start') or None
+    end = request.GET.get('end') or None
+    max_points = getattr(settings, 'PLOT_MAX_POINTS_PER_TRACE', 2000)
+    try:
+        frequency = resampling.parse_frequency(request.GET.get('freq'))
+        series = ResultsProcessor.series_window(
+            _resampled_arrays(processed_results, frequency),
+            processed_results.get('symbols', []),
+            spec['data_type'], max_points, start=start, end=end,
+        )
+    except ValueError as e:
+        return JsonResponse({"detail": f"Invalid range: {e}"}, status=400)
+
+    return JsonResponse({
+        "plot_key": plot_key,
+        "frequency": frequency or resampling.NATIVE_FREQUENCY,
+        "start": start,
+        "end": end,
+        "traces": [{"name": name, "x": x, "y": y} for name, x, y in series if x],
+    })
+
+def correlation_window(request):
+    """
+    Return the return-correlation matrix of a date window.
+
+    Answered from the prefix-sum correlation index, so every window costs
+    the same however long it is. Query params: start, end (inclusive;
+    omit both for the full period).
+    """
+    processed_results = request.session.get('analysis_results', {})
+    if not processed_results:
+        return JsonResponse({"detail": "No analysis results found in session."}, status=404)
+
+    try:
+        index = correlation_index.cached(_data_hash(processed_results), processed_results.get('data_arrays', {}),
+                                         processed_results.get('symbols', []))
+        window = index.window(request.GET.get('start') or None, request.GET.get('end') or None)
+    except ValueError as e:
+        return JsonResponse({"detail": f"Invalid range: {e}"}, status=400)
+
+    return JsonResponse(window)
+
 def api_proxy(request, api_path):
     """
     Generic server-side API proxy to avoid browser CORS/corporate proxy issues.
@@ -284,6 +744,56 @@ def debug_data(request):
     
     return JsonResponse(debug_info, indent=2)
 
+def plot_cache_status(request):
+    """
+    Figure cache metrics (GET) and explicit invalidation (POST).
+
+    POST with result_hash invalidates that result's figures; without it the
+    whole plot cache is cleared. POST needs a CSRF token and is only allowed
+    for staff users (any user in DEBUG), as the cache is shared by all users.
+    """
+    from . import plot_cache
+
+    if request.method == 'POST':
+        if not _staff_or_debug(request):
+            return JsonResponse({"detail": "Only staff users can invalidate the plot cache"}, status=403)
+        result_hash = request.POST.get('result_hash') or None
+        plot_cache.invalidate(result_hash)
+        return JsonResponse({"invalidated": result_hash or "all", **plot_cache.stats()})
+    if request.method != 'GET':
+        return JsonResponse({"detail": "Method not allowed"}, status=405)
+    return JsonResponse(plot_cache.stats())
+
+def plot_benchmark(request):
+    """
+    Benchmark page comparing plot payload encodings.
+
+    Serializes one synthetic figure as decimal text and as f8/f4 typed arrays,
+    and with SVG and WebGL traces; the page then times JSON.parse and
+    Plotly.newPlot for each in the browser.
+    Query params: points (per trace), traces. Served to staff users, or to
+    anyone in DEBUG, since each request builds figures of up to 4M points.
+    """
+    if not _staff_or_debug(request):
+        return HttpResponse("Only staff users can run the plot benchmark.", status=403, content_type="text/plain")
+    from .benchmarks import encoding_benchmark, renderer_benchmark
+    from .figure_builder import default_webgl_threshold
+
+    try:
+        points = min(max(int(request.GET.get('points', 5000)), 10), 200000)
+        traces = min(max(int(request.GET.get('traces', 3)), 1), 20)
+    except ValueError:
+        return HttpResponse("points and traces must be integers.", status=400, content_type="text/plain")
+
+    context = {
+        'points': points,
+        'traces': traces,
+        'encodings': encoding_benchmark(points, traces),
+        'renderers': renderer_benchmark(points, traces),
+        'webgl_threshold': default_webgl_threshold(),
+    }
+    return render(request, 'timeseries/plot_benchmark.html', context)
+
 # Add enhanced error handling and logging to the API call
 @csrf_exempt
 def run_pipeline_htmx(request):
@@ -316,7 +826,7 @@ def run_pipeline_htmx(request):
         else:
             symbols = ["MSFT", "AAPL", "GOOGL"]  # fallback
             
-        print(f"DEBUG: Processing symbols: {symbols}")
+        logger.debug("Processing symbols: %s", symbols)
         
         payload = {
             "source_actual_or_synthetic_data": data.get("source_actual_or_synthetic_data", "synthetic"),
@@ -349,7 +859,6 @@ def run_pipeline_htmx(request):
             })
         }
         
-        print(f"DEBUG: API payload prepared with symbols: {payload['symbols']}")
         
         # Backend date range validation (security)
         from datetime import datetime
@@ -379,71 +888,66 @@ def run_pipeline_htmx(request):
         # Log API configuration
         api_url = settings.TIMESERIES_API_URL
         logger.info(f"[HTMX] Calling API at: {api_url}")
-        print(f"DEBUG: Calling API at: {api_url}")
         
-        # Call the API using requests
-        print("DEBUG: About to call API")
-        response = requests.post(f"{settings.TIMESERIES_API_URL}/api/v1/run_pipeline", json=payload, timeout=120)
+        # Reuse the stages whose parameters (and upstream stages) did not change
+        stream_parse = getattr(settings, 'PIPELINE_STREAM_PARSE', False)
+        stage_plan = pipeline_stages.plan(payload) if getattr(settings, 'PIPELINE_STAGE_CACHE', False) else None
+        
+        if stage_plan is not None and stage_plan.complete:
+            logger.info("[HTMX] All pipeline stages reused from the stage cache, skipping the API call")
+            api_results, data_arrays = stage_plan.assemble(streamed=stream_parse)
+            response = None
+        else:
+            # Call the API using requests
+            request_payload = stage_plan.request_payload() if stage_plan is not None else payload
+            response = requests.post(f"{settings.TIMESERIES_API_URL}/api/v1/run_pipeline", json=request_payload,
+                                     timeout=120, stream=stream_parse)
+            if response.status_code != 200 and stage_plan is not None and stage_plan.reduced:
+                # Fall back to the full pipeline if the API rejects the stage switches
+                logger.warning(f"[HTMX] Reduced pipeline request failed with status {response.status_code}, "
+                               f"retrying with all stages")
+                stage_plan = pipeline_stages.plan(payload, use_cache=False)
+                response = requests.post(f"{settings.TIMESERIES_API_URL}/api/v1/run_pipeline", json=payload,
+                                         timeout=120, stream=stream_parse)
         
-        if response.status_code == 200:
+        if response is None or response.status_code == 200:
             # Parse and process the API response
-            api_results = response.json()
-            print(f"DEBUG: API call successful, got {len(api_results)} top-level keys", flush=True)
-            print(f"DEBUG: API response keys: {list(api_results.keys())}", flush=True)
-            
-            # Write to debug file immediately
-            try:
-                with open('./logs/debug_view.log', 'a') as f:
-                    f.write(f"DEBUG: API call successful, got {len(api_results)} top-level keys\n")
-                    f.write(f"DEBUG: API response keys: {list(api_results.keys())}\n")
-                    f.flush()
-            except Exception as e:
-                print(f"DEBUG: Could not write to debug file: {e}")
-            
-            logger.info("[HTMX] API call successful, processing results")
+            if response is not None:
+                if stream_parse:
+                    # Fill the columnar data arrays while reading, without building the row dicts
+                    from .streaming import parse_pipeline_response
+                    api_results, data_arrays = parse_pipeline_response(
+                        response.iter_content(chunk_size=getattr(settings, 'PIPELINE_STREAM_CHUNK_BYTES', 1 << 16)))
+                else:
+                    api_results, data_arrays = response.json(), None
+                if stage_plan is not None:
+                    # Fill in the stages the API skipped and cache the ones it ran
+                    stage_plan.merge(api_results, data_arrays)
+                    stage_plan.store(api_results, data_arrays)
+            logger.info("[HTMX] API call successful, processing results",
+                        extra={'top_level_keys': list(api_results.keys()), 'streamed': stream_parse,
+                               'reused_stages': stage_plan.reused if stage_plan is not None else []})
             
             # Import and use the ResultsProcessor
             from .results_processor import ResultsProcessor
-            print("DEBUG: About to create ResultsProcessor", flush=True)
-            
-            try:
-                with open('./logs/debug_view.log', 'a') as f:
-                    f.write("DEBUG: About to create ResultsProcessor\n")
-                    f.flush()
-            except:
-                pass
             
-            processor = ResultsProcessor(api_results)
-            print("DEBUG: About to call process_all()", flush=True)
-            
-            try:
-                with open('./logs/debug_view.log', 'a') as f:
-                    f.write("DEBUG: About to call process_all()\n")
-                    f.flush()
-            except:
-                pass
-                    
+            processor = ResultsProcessor(api_results, data_arrays=data_arrays)
             processed_results = processor.process_all()
-            print("DEBUG: process_all() completed successfully", flush=True)
-            
-            try:
-                with open('./logs/debug_view.log', 'a') as f:
-                    f.write("DEBUG: process_all() completed successfully\n")
-                    f.flush()
-            except:
-                pass
+            logger.debug("process_all() completed successfully")
             
-            # Store both raw and processed results in session (database-backed)
-            request.session['analysis_raw_results'] = api_results
-            request.session['analysis_results'] = processed_results
+            # Store both raw and processed results in session (database-backed),
+            # reduced to float32 precision when that mode is enabled
+            request.session['analysis_raw_results'] = precision.for_storage(api_results)
+            request.session['analysis_results'] = precision.for_storage(processed_results)
+            # Keys the caches derived from these results, so pages need not hash them again
+            request.session['analysis_result_hash'] = processor.content_hash
             request.session['has_api_results'] = True  # Flag to check if results exist
+            request.session['pipeline_stages'] = stage_plan.statuses() if stage_plan is not None else []
             
             # Explicitly save the session to ensure it's persisted
             request.session.save()
             
-            print(f"DEBUG: Session saved with keys: {list(request.session.keys())}")
-            print(f"DEBUG: Session contains analysis_results: {'analysis_results' in request.session}")
-            print(f"DEBUG: Session contains raw results: {'analysis_raw_results' in request.session}")
+            logger.debug("Session saved with keys: %s", list(request.session.keys()))
             
             # Return JSON response with redirect URL for JavaScript
             return JsonResponse({
@@ -452,8 +956,6 @@ def run_pipeline_htmx(request):
                 "message": "Analysis completed successfully"
             })
         else:
-            print(f"DEBUG: API call failed with status {response.status_code}")
-            print(f"DEBUG: API response text: {response.text}")
             logger.error(f"[HTMX] API call failed with status {response.status_code}")
             logger.error(f"[HTMX] API response: {response.text}")
             
@@ -473,7 +975,6 @@ def run_pipeline_htmx(request):
             }, status=500)
             
     except requests.exceptions.Timeout:
-        print("DEBUG: API request timed out")
         logger.error("[HTMX] API request timed out")
         return JsonResponse({
             "success": False,
@@ -481,7 +982,6 @@ def run_pipeline_htmx(request):
         }, status=408)
         
     except requests.exceptions.ConnectionError as e:
-        print(f"DEBUG: API connection error: {e}")
         logger.error(f"[HTMX] API connection error: {e}")
         logger.error(f"[HTMX] Attempted to connect to: {settings.TIMESERIES_API_URL}")
         
@@ -491,7 +991,6 @@ def run_pipeline_htmx(request):
         }, status=503)
         
     except requests.exceptions.RequestException as e:
-        print(f"DEBUG: API request exception: {e}")
         logger.error(f"[HTMX] API request exception: {e}")
         return JsonResponse({
             "success": False,
@@ -506,7 +1005,6 @@ def run_pipeline_htmx(request):
         }, status=400)
         
     except Exception as e:
-        print(f"DEBUG: Unexpected error: {e}")
         logger.error(f"[HTMX] Unexpected error: {e}")
         import traceback
         logger.error(f"[HTMX] Traceback: {traceback.format_exc()}")